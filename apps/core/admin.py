@@ -0,0 +1,213 @@
+"""
+Piezas para changelists del admin sobre tablas muy grandes.
+
+``ScalableAdminMixin`` evita lo que cuesta segundos por página con millones de
+filas:
+
+- ``COUNT(*)`` exacto: sin filtros se usa la estimación de ``pg_class``
+  (``reltuples``); con filtros se cuenta hasta ``ADMIN_COUNT_LIMIT`` filas.
+  Tampoco se cuenta la tabla entera para el "(N en total)".
+- ``OFFSET``: ordenando por pk la paginación es por cursor (``?cursor=<pk>``,
+  ``WHERE pk > cursor LIMIT n``). Ordenando por otra columna se vuelve a la
+  paginación por número de página.
+- Búsquedas ``icontains`` sin índice: los términos cortos buscan por prefijo
+  (``istartswith`` en ``prefix_search_fields``) y los demás usan
+  ``search_fields``, que deberían tener índices trigram sobre ``UPPER()``.
+- Acciones masivas: ``run_in_background`` las corre por tandas en segundo
+  plano (`apps.core.bulk`); el mensaje enlaza al progreso de la tarea
+  (``<changelist>/bulk-jobs/<id>/``, JSON).
+"""
+
+from functools import cached_property
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.http import Http404
+from django.http import JsonResponse
+from django.urls import path
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.translation import gettext as _
+
+from apps.core.bulk import get_job
+from apps.core.bulk import run_in_chunks
+
+CURSOR_VAR = "cursor"
+
+
+def estimated_count(queryset) -> int | None:
+    """Filas de la tabla según las estadísticas de PostgreSQL, si las hay."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [connection.ops.quote_name(queryset.model._meta.db_table)],  # noqa: SLF001
+        )
+        row = cursor.fetchone()
+    # -1: la tabla nunca se analizó.
+    return row[0] if row and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """``count`` estimado (tabla entera) o acotado (con filtros)."""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        self.is_estimate = False
+        threshold = getattr(settings, "ADMIN_ESTIMATED_COUNT_THRESHOLD", 100_000)
+        if not queryset.query.has_filters():
+            estimate = estimated_count(queryset)
+            if estimate is not None and estimate >= threshold:
+                self.is_estimate = True
+                return estimate
+        limit = getattr(settings, "ADMIN_COUNT_LIMIT", 10_000)
+        count = queryset.order_by()[: limit + 1].count()
+        if count > limit:
+            self.is_estimate = True
+            return limit
+        return count
+
+
+class KeysetChangeList(ChangeList):
+    """``ChangeList`` que pagina por cursor cuando el orden es por pk."""
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Cambiar filtros u orden vuelve a la primera página.
+        new_params = {CURSOR_VAR: None, **(new_params or {})}
+        return super().get_query_string(new_params, remove)
+
+    def _keyset_field(self) -> str | None:
+        # El admin puede repetir el campo (p. ej. ``("id", "id")``).
+        order_by = list(dict.fromkeys(self.queryset.query.order_by))
+        if len(order_by) == 1 and order_by[0].lstrip("-") in ("pk", self.opts.pk.name):
+            return order_by[0]
+        return None
+
+    def get_results(self, request):
+        self.keyset = False
+        self.cursor = None
+        self.next_cursor = None
+        field = self._keyset_field()
+        if field is None or self.show_all:
+            super().get_results(request)
+        else:
+            self._get_keyset_results(request, descending=field.startswith("-"))
+        self.result_count_is_estimate = getattr(self.paginator, "is_estimate", False)
+
+    def _get_keyset_results(self, request, *, descending: bool):
+        cursor = request.GET.get(CURSOR_VAR)
+        queryset = self.queryset
+        if cursor:
+            try:
+                cursor = self.opts.pk.to_python(cursor)
+            except ValidationError as exc:
+                raise IncorrectLookupParameters from exc
+            lookup = "pk__lt" if descending else "pk__gt"
+            queryset = queryset.filter(**{lookup: cursor})
+        rows = list(queryset[: self.list_per_page + 1])
+
+        self.paginator = self.model_admin.get_paginator(
+            request,
+            self.queryset,
+            self.list_per_page,
+        )
+        self.keyset = True
+        self.cursor = cursor
+        self.result_list = rows[: self.list_per_page]
+        if len(rows) > self.list_per_page:
+            self.next_cursor = self.result_list[-1].pk
+        self.result_count = self.paginator.count
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.multi_page = bool(cursor or self.next_cursor)
+
+    @property
+    def next_page_url(self) -> str:
+        return self.get_query_string({CURSOR_VAR: self.next_cursor})
+
+    @property
+    def first_page_url(self) -> str:
+        return self.get_query_string()
+
+
+class ScalableAdminMixin:
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    change_list_template = "admin/core/keyset_change_list.html"
+    # Campos buscados por prefijo cuando el término es corto para trigramas.
+    prefix_search_fields: tuple[str, ...] = ()
+    min_trigram_search_length = 3
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if term and len(term) < self.min_trigram_search_length:
+            if self.prefix_search_fields:
+                condition = reduce(
+                    or_,
+                    (
+                        Q(**{f"{field}__istartswith": term})
+                        for field in self.prefix_search_fields
+                    ),
+                )
+                return queryset.filter(condition), False
+        return super().get_search_results(request, queryset, search_term)
+
+    def _bulk_job_url_name(self) -> str:
+        return f"{self.opts.app_label}_{self.opts.model_name}_bulk_job"
+
+    def get_urls(self):
+        return [
+            path(
+                "bulk-jobs/<str:job_id>/",
+                self.admin_site.admin_view(self.bulk_job_view),
+                name=self._bulk_job_url_name(),
+            ),
+            *super().get_urls(),
+        ]
+
+    def bulk_job_view(self, request, job_id):
+        """Progreso de una acción masiva: ``{"status", "done"}``."""
+        if not self.has_view_or_change_permission(request):
+            raise Http404
+        job = get_job(job_id)
+        if job is None:
+            raise Http404
+        return JsonResponse(job)
+
+    def run_in_background(self, request, queryset, func, description: str) -> str:
+        job_id = run_in_chunks(queryset, func)
+        url = reverse(
+            f"{self.admin_site.name}:{self._bulk_job_url_name()}",
+            args=[job_id],
+        )
+        self.message_user(
+            request,
+            format_html(
+                _('{}: running in the background in chunks. <a href="{}">Progress</a>'),
+                description,
+                url,
+            ),
+            messages.SUCCESS,
+        )
+        return job_id
@@ -0,0 +1,119 @@
+"""
+Acciones masivas en segundo plano y por tandas.
+
+``run_in_chunks`` recorre un queryset por pk (keyset, sin OFFSET) en tandas de
+``ADMIN_BULK_CHUNK_SIZE`` filas y aplica una función a cada tanda en su
+propia transacción. Así una acción sobre millones de filas no bloquea el
+request ni mantiene una transacción y sus locks abiertos durante minutos.
+
+El trabajo corre en un pool de ``ADMIN_BULK_WORKERS`` hilos del proceso web
+(``0`` lo corre en el mismo request, como en los tests) y arranca recién
+cuando el request hace commit. El progreso queda en el cache
+(``core:bulk:<id>``).
+"""
+
+import logging
+import threading
+import uuid
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+JOB_KEY = "core:bulk:{job_id}"
+JOB_TTL = 24 * 60 * 60
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor  # noqa: PLW0603
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "ADMIN_BULK_WORKERS", 1),
+                    thread_name_prefix="admin-bulk",
+                )
+    return _executor
+
+
+def get_job(job_id: str) -> dict | None:
+    return cache.get(JOB_KEY.format(job_id=job_id))
+
+
+def _save_job(job_id: str, job: dict) -> None:
+    cache.set(JOB_KEY.format(job_id=job_id), job, timeout=JOB_TTL)
+
+
+def process_in_chunks(
+    queryset,
+    func: Callable,
+    *,
+    chunk_size: int,
+    job_id: str | None = None,
+) -> int:
+    """Aplica ``func`` a tandas del queryset ordenadas por pk; devuelve filas."""
+    model = queryset.model
+    queryset = queryset.order_by("pk")
+    job = {"status": "running", "done": 0}
+    last_pk = None
+    while True:
+        page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        pks = list(page.values_list("pk", flat=True)[:chunk_size])
+        if not pks:
+            break
+        with transaction.atomic():
+            func(model._default_manager.filter(pk__in=pks))  # noqa: SLF001
+        last_pk = pks[-1]
+        job["done"] += len(pks)
+        if job_id:
+            _save_job(job_id, job)
+    job["status"] = "done"
+    if job_id:
+        _save_job(job_id, job)
+    return job["done"]
+
+
+def _run(job_id: str, queryset, func: Callable, chunk_size: int) -> None:
+    try:
+        process_in_chunks(queryset, func, chunk_size=chunk_size, job_id=job_id)
+    except Exception:
+        logger.exception("Acción masiva %s falló", job_id)
+        job = get_job(job_id) or {"done": 0}
+        _save_job(job_id, {**job, "status": "error"})
+
+
+def _run_in_thread(*args) -> None:
+    # Cada hilo del pool tiene su conexión; se trata como la de un request.
+    close_old_connections()
+    try:
+        _run(*args)
+    finally:
+        close_old_connections()
+
+
+def run_in_chunks(queryset, func: Callable, *, chunk_size: int | None = None) -> str:
+    """Programa ``func`` sobre ``queryset`` en segundo plano; devuelve el id."""
+    job_id = uuid.uuid4().hex
+    chunk_size = chunk_size or getattr(settings, "ADMIN_BULK_CHUNK_SIZE", 1000)
+    _save_job(job_id, {"status": "pending", "done": 0})
+    if getattr(settings, "ADMIN_BULK_WORKERS", 1) == 0:
+        transaction.on_commit(lambda: _run(job_id, queryset, func, chunk_size))
+    else:
+        transaction.on_commit(
+            lambda: _get_executor().submit(
+                _run_in_thread,
+                job_id,
+                queryset,
+                func,
+                chunk_size,
+            ),
+        )
+    return job_id
@@ -0,0 +1,432 @@
+"""
+Cachés en memoria del proceso, para usar delante del caché compartido.
+"""
+
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django_redis.cache import RedisCache
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+# Marca de "no está en Redis" (None puede ser un valor guardado).
+MISSING = object()
+# Cada cuánto el hilo de invalidaciones comprueba su conexión (segundos).
+LISTENER_PING_INTERVAL = 30
+
+
+class LRUCache:
+    """LRU con vencimiento por entrada; seguro entre hilos."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < time.monotonic():
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: str, value, ttl: float | None = None) -> None:
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Valores que se guardan tal cual en el L1; el resto se guarda serializado
+# para que quien lo lea no modifique la copia compartida.
+IMMUTABLE_TYPES = (str, bytes, int, float, bool)
+
+
+def _wrap(value):
+    if type(value) in IMMUTABLE_TYPES:
+        return (False, value)
+    return (True, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+
+def _unwrap(item):
+    pickled, value = item
+    return pickle.loads(value) if pickled else value  # noqa: S301
+
+
+class TieredRedisCache(RedisCache):
+    """
+    ``django_redis`` con un L1 en memoria del proceso (``LRUCache``) delante.
+
+    Opciones, en ``OPTIONS`` junto a las de ``django_redis``:
+
+    - ``L1_MAX_SIZE`` (1024) y ``L1_TTL`` (5 s): tamaño y vida máxima de una
+      entrada en el L1. El TTL acota lo que puede durar un valor viejo si se
+      pierde una invalidación.
+    - ``L1_KEY_PREFIXES``: las claves (sin versión ni ``KEY_PREFIX``) que
+      pasan por el L1. ``None`` (por defecto) son todas. Conviene limitarlo a
+      claves chicas, leídas seguido y que cambian poco: contadores, locks y
+      estados de jobs sólo tienen sentido en Redis.
+    - ``L1_CHANNEL``: canal de pub/sub de invalidaciones.
+
+    Cada escritura (``set``, ``add``, ``delete``, ``incr``...) de una clave
+    del L1 la borra del L1 propio y publica la clave en el canal; un hilo por
+    proceso escucha el canal y la borra del L1 de los demás workers. Mientras
+    ese hilo no está suscripto (al arrancar, o si se cae la conexión) el L1
+    no se usa y se vacía. ``tier_stats()`` da los aciertos de cada nivel.
+    """
+
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        options = params.get("OPTIONS", {})
+        self.l1 = LRUCache(
+            max_size=options.get("L1_MAX_SIZE", 1024),
+            ttl=options.get("L1_TTL", 5),
+        )
+        prefixes = options.get("L1_KEY_PREFIXES")
+        self.l1_prefixes = None if prefixes is None else tuple(prefixes)
+        self.channel = options.get("L1_CHANNEL", f"{self.key_prefix}:cache:l1")
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.invalidations_sent = 0
+        self.invalidations_received = 0
+        self._stats_lock = threading.Lock()
+        self._sender = uuid.uuid4().hex
+        self._subscribed = threading.Event()
+        self._stopped = threading.Event()
+        self._listener: threading.Thread | None = None
+        self._listener_pid = 0
+        # Sube con cada invalidación: un valor leído de Redis antes de una
+        # invalidación no entra al L1.
+        self._generation = 0
+
+    # L1
+
+    def _in_l1(self, key) -> bool:
+        return self.l1_prefixes is None or str(key).startswith(self.l1_prefixes)
+
+    def _l1_ready(self) -> bool:
+        if self._listener_pid != os.getpid() and not self._stopped.is_set():
+            self._start_listener()
+        return self._subscribed.is_set()
+
+    def _count_l2(self, hits: int, misses: int) -> None:
+        with self._stats_lock:
+            self.l2_hits += hits
+            self.l2_misses += misses
+
+    def _bump(self) -> None:
+        with self._stats_lock:
+            self._generation += 1
+
+    def _fill(self, full_key: str, value, generation: int) -> None:
+        with self._stats_lock:
+            if self._generation == generation:
+                self.l1.set(full_key, _wrap(value))
+
+    def _invalidate(self, keys) -> None:
+        """Saca ``keys`` (ya armadas con ``make_key``) de todos los L1."""
+        if not keys:
+            return
+        self._bump()
+        for key in keys:
+            self.l1.delete(key)
+        self._publish({"keys": keys})
+
+    def _invalidate_all(self) -> None:
+        self._bump()
+        self.l1.clear()
+        self._publish({"clear": True})
+
+    def _publish(self, message: dict) -> None:
+        message["sender"] = self._sender
+        try:
+            self.client.get_client(write=True).publish(
+                self.channel,
+                json.dumps(message),
+            )
+        except (RedisError, OSError):
+            # Los demás L1 se quedan con el valor viejo hasta su TTL.
+            logger.warning("No se pudo publicar una invalidación del L1")
+            return
+        with self._stats_lock:
+            self.invalidations_sent += 1
+
+    # Listener
+
+    def _start_listener(self) -> None:
+        # Un hilo por proceso; después de un fork el del padre no existe.
+        with self._stats_lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+            self._subscribed.clear()
+            self.l1.clear()
+            self._listener = threading.Thread(
+                target=self._listen,
+                name="cache-l1-invalidation",
+                daemon=True,
+            )
+            self._listener.start()
+
+    def _listen(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self._consume()
+            except (RedisError, OSError):
+                logger.warning("Se perdió la suscripción del L1; se vacía")
+            self._subscribed.clear()
+            self._bump()
+            self.l1.clear()
+            self._stopped.wait(1)
+
+    def _consume(self) -> None:
+        pubsub = self.client.get_client(write=True).pubsub()
+        try:
+            pubsub.subscribe(self.channel)
+            last_ping = time.monotonic()
+            while not self._stopped.is_set():
+                message = pubsub.get_message(timeout=1.0)
+                if message is None:
+                    pass
+                elif message["type"] == "subscribe" and not self._stopped.is_set():
+                    # Desde acá no se pierde ninguna invalidación.
+                    self._subscribed.set()
+                elif message["type"] == "message":
+                    self._receive(message["data"])
+                if time.monotonic() - last_ping > LISTENER_PING_INTERVAL:
+                    pubsub.ping()
+                    last_ping = time.monotonic()
+        finally:
+            pubsub.close()
+
+    def stop_listener(self) -> None:
+        """Corta el hilo de invalidaciones; el L1 deja de usarse."""
+        self._stopped.set()
+        self._subscribed.clear()
+        self._bump()
+        self.l1.clear()
+
+    def _receive(self, data) -> None:
+        message = json.loads(data)
+        if message.get("sender") == self._sender:
+            return
+        with self._stats_lock:
+            self._generation += 1
+            self.invalidations_received += 1
+        if message.get("clear"):
+            self.l1.clear()
+            return
+        for key in message.get("keys", ()):
+            self.l1.delete(key)
+
+    # Lecturas
+
+    def get(self, key, default=None, version=None, client=None):
+        if client is not None or not self._in_l1(key) or not self._l1_ready():
+            value = super().get(key, MISSING, version=version, client=client)
+            self._count_l2(value is not MISSING, value is MISSING)
+            return default if value is MISSING else value
+
+        full_key = self.make_key(key, version=version)
+        item = self.l1.get(full_key)
+        if item is not None:
+            return _unwrap(item)
+        generation = self._generation
+        value = super().get(key, MISSING, version=version)
+        if value is MISSING:
+            self._count_l2(0, 1)
+            return default
+        self._count_l2(1, 0)
+        self._fill(full_key, value, generation)
+        return value
+
+    def get_shared(self, key, default=None, version=None):
+        """``get`` directo de Redis: no lee ni llena el L1."""
+        value = super().get(key, MISSING, version=version)
+        self._count_l2(value is not MISSING, value is MISSING)
+        return default if value is MISSING else value
+
+    def get_many(self, keys, version=None, client=None):
+        keys = list(keys)
+        found = {}
+        pending = keys
+        use_l1 = client is None and self._l1_ready()
+        if use_l1:
+            pending = []
+            for key in keys:
+                item = (
+                    self.l1.get(self.make_key(key, version=version))
+                    if self._in_l1(key)
+                    else None
+                )
+                if item is None:
+                    pending.append(key)
+                else:
+                    found[key] = _unwrap(item)
+        generation = self._generation
+        if pending:
+            fetched = super().get_many(pending, version=version, client=client)
+            self._count_l2(len(fetched), len(pending) - len(fetched))
+            for key, value in fetched.items():
+                found[key] = value
+                if use_l1 and self._in_l1(key):
+                    self._fill(self.make_key(key, version=version), value, generation)
+        return {key: found[key] for key in keys if key in found}
+
+    # Escrituras
+
+    def _l1_keys(self, keys, version=None) -> list[str]:
+        return [self.make_key(key, version=version) for key in keys if self._in_l1(key)]
+
+    def set(  # noqa: PLR0913
+        self,
+        key,
+        value,
+        timeout=DEFAULT_TIMEOUT,
+        version=None,
+        client=None,
+        *,
+        nx=False,
+        xx=False,
+    ):
+        result = super().set(
+            key,
+            value,
+            timeout=timeout,
+            version=version,
+            client=client,
+            nx=nx,
+            xx=xx,
+        )
+        if result or not (nx or xx):
+            self._invalidate(self._l1_keys([key], version))
+        return result
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        result = super().add(
+            key,
+            value,
+            timeout=timeout,
+            version=version,
+            client=client,
+        )
+        if result:
+            self._invalidate(self._l1_keys([key], version))
+        return result
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        result = super().set_many(data, timeout=timeout, version=version, client=client)
+        self._invalidate(self._l1_keys(data, version))
+        return result
+
+    def delete(self, key, version=None, prefix=None, client=None):
+        result = super().delete(key, version=version, prefix=prefix, client=client)
+        self._invalidate(self._l1_keys([key], version))
+        return result
+
+    def delete_many(self, keys, version=None, client=None):
+        keys = list(keys)
+        result = super().delete_many(keys, version=version, client=client)
+        self._invalidate(self._l1_keys(keys, version))
+        return result
+
+    def delete_pattern(self, *args, **kwargs):
+        result = super().delete_pattern(*args, **kwargs)
+        self._invalidate_all()
+        return result
+
+    def clear(self):
+        result = super().clear()
+        self._invalidate_all()
+        return result
+
+    def incr(self, key, delta=1, version=None, client=None, **kwargs):
+        result = super().incr(
+            key,
+            delta=delta,
+            version=version,
+            client=client,
+            **kwargs,
+        )
+        self._invalidate(self._l1_keys([key], version))
+        return result
+
+    def decr(self, key, delta=1, version=None, client=None):
+        result = super().decr(key, delta=delta, version=version, client=client)
+        self._invalidate(self._l1_keys([key], version))
+        return result
+
+    def incr_version(self, key, delta=1, version=None, client=None):
+        if version is None:
+            version = self.version
+        result = super().incr_version(key, delta=delta, version=version, client=client)
+        self._invalidate(
+            self._l1_keys([key], version) + self._l1_keys([key], version + delta),
+        )
+        return result
+
+    def tier_stats(self) -> dict:
+        """Aciertos de cada nivel en este proceso."""
+        with self._stats_lock:
+            l2_hits, l2_misses = self.l2_hits, self.l2_misses
+            sent, received = self.invalidations_sent, self.invalidations_received
+        l1_hits, l1_misses = self.l1.hits, self.l1.misses
+        return {
+            "l1": {
+                "hits": l1_hits,
+                "misses": l1_misses,
+                "hit_rate": _rate(l1_hits, l1_misses),
+                "size": len(self.l1),
+                "max_size": self.l1.max_size,
+                "subscribed": self._subscribed.is_set(),
+            },
+            "l2": {
+                "hits": l2_hits,
+                "misses": l2_misses,
+                "hit_rate": _rate(l2_hits, l2_misses),
+            },
+            # Fracción de lecturas que no salieron del proceso.
+            "local_rate": _rate(l1_hits, l2_hits + l2_misses),
+            "invalidations": {"sent": sent, "received": received},
+        }
+
+
+def shared_get(cache, key, default=None):
+    """
+    Lee ``key`` del caché compartido aunque ``cache`` tenga un L1: para los
+    read-modify-write y las claves que tienen que leerse coherentes entre sí.
+    Con cualquier otro backend es ``cache.get``.
+    """
+    get = getattr(cache, "get_shared", cache.get)
+    return get(key, default)
+
+
+def _rate(hits: int, misses: int) -> float:
+    return round(hits / (hits + misses), 4) if hits + misses else 0.0
@@ -0,0 +1,47 @@
+"""System checks de ``apps.core``."""
+
+from django.conf import settings
+from django.core.checks import Tags
+from django.core.checks import Warning  # noqa: A004
+from django.core.checks import register
+from django.db import DEFAULT_DB_ALIAS
+from django.urls import URLPattern
+from django.urls import URLResolver
+from django.urls import get_resolver
+
+
+def _iter_patterns(resolver: URLResolver, prefix: str = ""):
+    for pattern in resolver.url_patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from _iter_patterns(pattern, route)
+        elif isinstance(pattern, URLPattern):
+            yield route, pattern
+
+
+@register(Tags.urls, Tags.database)
+def check_transaction_policies(app_configs, **kwargs):
+    """
+    Las vistas que salen de ``ATOMIC_REQUESTS`` sin declarar una política
+    pueden escribir sin transacción (ver ``apps.core.transactions``).
+    """
+    if not settings.DATABASES[DEFAULT_DB_ALIAS].get("ATOMIC_REQUESTS"):
+        return []
+    errors = []
+    for route, pattern in _iter_patterns(get_resolver()):
+        view = pattern.callback
+        opted_out = DEFAULT_DB_ALIAS in getattr(view, "_non_atomic_requests", ())
+        if opted_out and getattr(view, "transaction_policy", None) is None:
+            errors.append(
+                Warning(
+                    f"{route} sale de ATOMIC_REQUESTS sin declarar una política "
+                    "de transacción.",
+                    hint=(
+                        "Usa transaction_policy(READ_ONLY) si sólo lee, o "
+                        "transaction_policy(NONE) si maneja sus transacciones."
+                    ),
+                    obj=pattern.lookup_str,
+                    id="core.W001",
+                ),
+            )
+    return errors
@@ -0,0 +1,147 @@
+"""
+Compresión de respuestas dinámicas (ver ``CompressionMiddleware``).
+
+Los encoders comprimen de a partes: ``process`` devuelve lo que ya se puede
+mandar (hace flush, así un streaming no queda esperando al compresor) y
+``finish`` cierra el stream. ``compress`` comprime un cuerpo entero de una vez.
+"""
+
+import secrets
+import zlib
+from gzip import GzipFile
+
+import brotli
+from django.conf import settings
+from django.utils.crypto import get_random_string
+from django.utils.http import parse_etags
+from django.utils.text import StreamingBuffer
+
+# Lo que ya viene comprimido (imágenes, zip, fuentes woff2) no gana nada.
+COMPRESSIBLE_TYPES = frozenset(
+    {
+        "application/javascript",
+        "application/json",
+        "application/manifest+json",
+        "application/xml",
+        "image/svg+xml",
+    },
+)
+# En el orden en que se prefieren a igual q.
+ENCODINGS = ("br", "gzip")
+
+
+def is_compressible(content_type: str) -> bool:
+    mime = content_type.split(";", 1)[0].strip().lower()
+    return (
+        mime.startswith("text/")
+        or mime in COMPRESSIBLE_TYPES
+        or mime.endswith(("+json", "+xml"))
+    )
+
+
+def negotiate(accept_encoding: str, encodings=ENCODINGS) -> str | None:
+    """Encoding de ``encodings`` con mayor q en ``Accept-Encoding``, o ``None``."""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name := name.strip().lower():
+            accepted[name] = quality
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Comparación débil de ``If-None-Match`` (RFC 9110): ``W/"x"`` coincide con
+    ``"x"``. ``CompressionMiddleware`` debilita el ETag de lo que comprime y
+    el cliente lo devuelve así.
+    """
+    tags = parse_etags(if_none_match)
+    if tags == ["*"]:
+        return True
+    return etag.removeprefix("W/") in {tag.removeprefix("W/") for tag in tags}
+
+
+class GzipEncoder:
+    """
+    gzip con un nombre de archivo de largo aleatorio en el header, como
+    ``GZipMiddleware`` (mitigación "Heal the Breach" contra BREACH).
+    """
+
+    def __init__(self, level: int = 6, max_random_bytes: int = 100):
+        self.buffer = StreamingBuffer()
+        filename = None
+        if max_random_bytes:
+            filename = get_random_string(secrets.randbelow(max_random_bytes) + 1)
+        self.file = GzipFile(
+            filename=filename,
+            mode="wb",
+            compresslevel=level,
+            fileobj=self.buffer,
+            mtime=0,
+        )
+
+    def process(self, data: bytes) -> bytes:
+        self.file.write(data)
+        self.file.flush(zlib.Z_SYNC_FLUSH)
+        return self.buffer.read()
+
+    def finish(self) -> bytes:
+        self.file.close()
+        return self.buffer.read()
+
+    def compress(self, data: bytes) -> bytes:
+        self.file.write(data)
+        return self.finish()
+
+
+class BrotliEncoder:
+    def __init__(self, quality: int = 4):
+        self.compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=quality)
+
+    def process(self, data: bytes) -> bytes:
+        return self.compressor.process(data) + self.compressor.flush()
+
+    def finish(self) -> bytes:
+        return self.compressor.finish()
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.process(data) + self.compressor.finish()
+
+
+def get_encoder(encoding: str):
+    if encoding == "br":
+        return BrotliEncoder(
+            getattr(settings, "RESPONSE_COMPRESSION_BROTLI_QUALITY", 4),
+        )
+    return GzipEncoder(getattr(settings, "RESPONSE_COMPRESSION_GZIP_LEVEL", 6))
+
+
+def compress_sequence(encoder, chunks):
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if data := encoder.process(chunk):
+            yield data
+    yield encoder.finish()
+
+
+async def acompress_sequence(encoder, chunks):
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        if data := encoder.process(chunk):
+            yield data
+    yield encoder.finish()
@@ -0,0 +1,50 @@
+"""
+Métricas de los pools de conexiones de psycopg (``OPTIONS["pool"]``).
+
+Cada proceso tiene su pool por base; ``pool_stats`` devuelve los de este
+proceso. Los contadores son los de ``psycopg_pool`` desde que el pool abrió:
+
+- ``pool_size`` / ``pool_available``: conexiones abiertas y libres.
+- ``requests_num``, ``requests_queued``, ``requests_wait_ms``: pedidos de
+  conexión, los que tuvieron que esperar y el tiempo total de espera.
+- ``requests_errors``: pedidos que agotaron ``timeout`` sin conexión (pool
+  agotado).
+- ``connections_num``, ``connections_ms``: conexiones abiertas y lo que
+  tardaron; ``connections_lost`` y ``returns_bad``: las que fallaron el
+  chequeo o volvieron rotas.
+
+A eso se suma ``requests_wait_ms_avg``, la espera media por pedido.
+"""
+
+from django.db import connections
+
+COUNTERS = (
+    "requests_num",
+    "requests_queued",
+    "requests_wait_ms",
+    "requests_waiting",
+    "requests_errors",
+    "usage_ms",
+    "returns_bad",
+    "connections_num",
+    "connections_ms",
+    "connections_errors",
+    "connections_lost",
+)
+
+
+def pool_stats() -> dict[str, dict[str, float]]:
+    """Estadísticas de los pools de este proceso, por alias de base."""
+    stats = {}
+    for alias in connections:
+        pool = getattr(connections[alias], "pool", None)
+        if pool is None:
+            continue
+        # psycopg_pool omite los contadores que siguen en cero.
+        values = dict.fromkeys(COUNTERS, 0) | pool.get_stats()
+        values["requests_wait_ms_avg"] = round(
+            values["requests_wait_ms"] / max(values["requests_num"], 1),
+            3,
+        )
+        stats[alias] = values
+    return stats
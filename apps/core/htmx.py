@@ -0,0 +1,131 @@
+"""
+Respuestas parciales para HTMX.
+
+Con ``hx-boost`` cada navegación pide la página entera y htmx reemplaza el
+``<body>``. Los links que apuntan a ``#main-content`` (``hx-target``) mandan
+``HX-Request`` y ``HX-Target: main-content``; ``HtmxPartialMixin`` responde
+sólo con ese bloque del template y, out-of-band, con los bloques que también
+cambian de página a página (la barra de navegación inferior).
+
+Los parciales se cachean como las páginas (``CachedPageMixin``): la clave
+incluye el bloque pedido, y los ``{% uncached %}`` se renderizan por request.
+
+Para vistas de función: ``render_blocks`` renderiza bloques sueltos de un
+template y ``oob`` los marca para un swap out-of-band.
+"""
+
+import re
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.template import TemplateSyntaxError
+from django.template.loader import get_template
+from django.template.loader_tags import BLOCK_CONTEXT_KEY
+from django.template.loader_tags import BlockContext
+from django.template.loader_tags import BlockNode
+from django.utils.cache import patch_vary_headers
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from apps.core.pages import CachedPageMixin
+from apps.core.pages import template_chain
+
+FIRST_TAG = re.compile(r"<[a-zA-Z][\w-]*")
+
+
+def is_htmx(request) -> bool:
+    return request.headers.get("HX-Request") == "true"
+
+
+def is_partial_request(request) -> bool:
+    """
+    Request de htmx que acepta un fragmento. Al restaurar el historial sin
+    snapshot htmx pide la página entera (``HX-History-Restore-Request``).
+    """
+    return (
+        is_htmx(request) and request.headers.get("HX-History-Restore-Request") != "true"
+    )
+
+
+def oob(html: str, swap: str = "true") -> str:
+    """
+    Marca el primer elemento de ``html`` con ``hx-swap-oob``: htmx lo
+    reemplaza por ``id`` fuera del target del request.
+    """
+    match = FIRST_TAG.search(html)
+    if match is None:
+        return html
+    end = match.end()
+    return mark_safe(f'{html[:end]} hx-swap-oob="{escape(swap)}"{html[end:]}')  # noqa: S308
+
+
+def render_blocks(template, names, context) -> list[str]:
+    """
+    Renderiza los bloques ``names`` de ``template`` (un
+    ``django.template.Template``) como en la página entera: con los bloques
+    que redefinen los hijos, ``{{ block.super }}`` y los context processors.
+    """
+    blocks = BlockContext()
+    nodes = {}
+    for current in template_chain(template):
+        defined = {n.name: n for n in current.nodelist.get_nodes_by_type(BlockNode)}
+        blocks.add_blocks(defined)
+        nodes.update(defined)
+    missing = [name for name in names if name not in nodes]
+    if missing:
+        msg = f"{template.name} no tiene los bloques {', '.join(missing)}"
+        raise TemplateSyntaxError(msg)
+    with context.render_context.push_state(template), context.bind_template(template):
+        context.render_context[BLOCK_CONTEXT_KEY] = blocks
+        return [nodes[name].render(context) for name in names]
+
+
+class HtmxPartialMixin(CachedPageMixin):
+    """
+    ``CachedPageMixin`` que a un request de htmx responde sólo el bloque de
+    ``htmx_partials[HX-Target]`` más los ``htmx_oob_blocks`` out-of-band.
+    """
+
+    # id del elemento que htmx reemplaza -> bloque del template que lo renderiza.
+    htmx_partials: dict[str, str] = {}
+    htmx_oob_blocks: tuple[str, ...] = ()
+
+    def get_partial_block(self) -> str | None:
+        if not is_partial_request(self.request):
+            return None
+        return self.htmx_partials.get(self.request.headers.get("HX-Target"))
+
+    def get_page_cache_parts(self, context) -> list[str]:
+        return [*super().get_page_cache_parts(context), self.get_partial_block() or ""]
+
+    def render_content(self, template, context) -> str:
+        block = self.get_partial_block()
+        if block is None:
+            return super().render_content(template, context)
+        partial, *out_of_band = render_blocks(
+            template,
+            (block, *self.htmx_oob_blocks),
+            context,
+        )
+        return "".join([partial, *(oob(html) for html in out_of_band)])
+
+    def render_to_response(self, context, **response_kwargs):
+        if self.get_partial_block() is not None and not getattr(
+            settings,
+            "PAGE_CACHE_TIMEOUT",
+            0,
+        ):
+            template = get_template(self.get_template_names()[0]).template
+            shell = self.render_shell(template, context)
+            response = HttpResponse(
+                self.fill(template, shell, context),
+                **response_kwargs,
+            )
+        else:
+            response = super().render_to_response(context, **response_kwargs)
+        # El navegador no debe servir un parcial como página (ni al revés).
+        patch_vary_headers(
+            response,
+            ("HX-Request", "HX-Target", "HX-History-Restore-Request"),
+        )
+        return response
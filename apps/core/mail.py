@@ -0,0 +1,315 @@
+"""
+Envío de emails fuera del request.
+
+``QueuedEmailBackend`` (``EMAIL_BACKEND``) no habla con el proveedor: serializa
+cada mensaje y lo agrega al stream de Redis ``core:mail`` cuando la
+transacción en curso hace commit (un signup que hace rollback no manda nada).
+El comando
+``send_queued_mail`` lo consume en lotes con un consumer group y envía con
+``MAIL_QUEUE_DELIVERY_BACKEND`` (SMTP o anymail/Brevo) reutilizando la misma
+conexión mientras haya mensajes. Cada mensaje se confirma (``XACK``) y se
+borra del stream recién después de enviarlo: semántica *at-least-once*. El
+stream nunca se recorta; su largo es lo que falta enviar.
+
+Reintentos: un envío fallido se guarda en el sorted set ``core:mail:retry``
+con espera exponencial (``MAIL_QUEUE_RETRY_DELAY`` · 2^intentos) y vuelve al
+stream cuando vence. Después de ``MAIL_QUEUE_MAX_ATTEMPTS`` intentos pasa al
+stream ``core:mail:dead`` con el último error.
+"""
+
+import copy
+import logging
+import os
+import pickle
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+STREAM_KEY = "core:mail"
+STREAM_GROUP = "mail-senders"
+RETRY_KEY = "core:mail:retry"
+DEAD_KEY = "core:mail:dead"
+
+
+@dataclass(slots=True)
+class QueuedMessage:
+    entry_id: bytes
+    message: object
+    attempts: int
+
+
+class MailQueue:
+    """Stream de mensajes pendientes, reintentos programados y descartados."""
+
+    def __init__(
+        self,
+        redis=None,
+        *,
+        max_attempts: int = 5,
+        retry_delay: float = 30,
+        claim_idle_ms: int = 5 * 60_000,
+    ):
+        self._redis = redis
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.claim_idle_ms = claim_idle_ms
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+
+    @property
+    def redis(self):
+        if self._redis is not None:
+            return self._redis
+        from django_redis import get_redis_connection  # noqa: PLC0415
+
+        return get_redis_connection("default")
+
+    @staticmethod
+    def dumps(message) -> bytes:
+        message = copy.copy(message)
+        # El backend que lo encoló no viaja con el mensaje.
+        message.connection = None
+        return pickle.dumps(message)
+
+    def enqueue(self, messages, attempts: int = 0) -> None:
+        pipe = self.redis.pipeline(transaction=False)
+        for message in messages:
+            self._add(pipe, self.dumps(message), attempts)
+        pipe.execute()
+
+    def _add(self, pipe, payload: bytes, attempts: int) -> None:
+        pipe.xadd(STREAM_KEY, {"message": payload, "attempts": attempts})
+
+    @staticmethod
+    def _done(pipe, entry_id: bytes) -> None:
+        pipe.xack(STREAM_KEY, STREAM_GROUP, entry_id)
+        pipe.xdel(STREAM_KEY, entry_id)
+
+    def _ensure_group(self) -> None:
+        import redis  # noqa: PLC0415
+
+        try:
+            self.redis.xgroup_create(STREAM_KEY, STREAM_GROUP, id="0", mkstream=True)
+        except redis.ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    def read(self, count: int, block_ms: int | None = 2000) -> list[QueuedMessage]:
+        """Lote a enviar; primero reclama los de consumidores caídos."""
+        self._ensure_group()
+        _, entries, *_ = self.redis.xautoclaim(
+            STREAM_KEY,
+            STREAM_GROUP,
+            self.consumer,
+            min_idle_time=self.claim_idle_ms,
+            count=count,
+        )
+        if not entries:
+            response = self.redis.xreadgroup(
+                STREAM_GROUP,
+                self.consumer,
+                {STREAM_KEY: ">"},
+                count=count,
+                block=block_ms,
+            )
+            entries = response[0][1] if response else []
+        messages = []
+        for entry_id, data in entries:
+            if not data:
+                continue
+            try:
+                message = pickle.loads(data[b"message"])  # noqa: S301
+            except Exception:
+                logger.exception("Email %s ilegible, se descarta", entry_id)
+                self._dead(entry_id, data[b"message"], "unpickling failed")
+                continue
+            messages.append(
+                QueuedMessage(entry_id, message, int(data.get(b"attempts", 0))),
+            )
+        return messages
+
+    def ack(self, entry_id: bytes) -> None:
+        pipe = self.redis.pipeline(transaction=False)
+        self._done(pipe, entry_id)
+        pipe.execute()
+
+    def _dead(self, entry_id: bytes, payload: bytes, error: str) -> None:
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.xadd(DEAD_KEY, {"message": payload, "error": error[:1000]})
+        self._done(pipe, entry_id)
+        pipe.execute()
+
+    def retry(self, queued: QueuedMessage, error: str) -> bool:
+        """Programa otro intento; ``False`` si ya no quedan."""
+        attempts = queued.attempts + 1
+        payload = self.dumps(queued.message)
+        if attempts >= self.max_attempts:
+            self._dead(queued.entry_id, payload, error)
+            return False
+        due = time.time() + self.retry_delay * 2 ** (attempts - 1)
+        member = pickle.dumps((uuid.uuid4().hex, attempts, payload))
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.zadd(RETRY_KEY, {member: due})
+        self._done(pipe, queued.entry_id)
+        pipe.execute()
+        return True
+
+    def release_due(self, limit: int = 100) -> int:
+        """Devuelve al stream los reintentos vencidos."""
+        released = 0
+        due = self.redis.zrangebyscore(RETRY_KEY, "-inf", time.time(), 0, limit)
+        for member in due:
+            # ZREM gana una sola vez aunque haya varios senders.
+            if self.redis.zrem(RETRY_KEY, member):
+                _, attempts, payload = pickle.loads(member)  # noqa: S301
+                pipe = self.redis.pipeline(transaction=False)
+                self._add(pipe, payload, attempts)
+                pipe.execute()
+                released += 1
+        return released
+
+    def __len__(self):
+        return self.redis.xlen(STREAM_KEY)
+
+
+@dataclass
+class SendStats:
+    sent: int = 0
+    retried: int = 0
+    dead: int = 0
+    connections: int = 0
+
+
+class MailSender:
+    """Envía lotes de la cola con una conexión que se reutiliza entre lotes."""
+
+    def __init__(self, queue: MailQueue, backend: str, batch_size: int = 50):
+        self.queue = queue
+        self.backend = backend
+        self.batch_size = batch_size
+        self.connection = None
+        self.stats = SendStats()
+
+    def _connection(self):
+        if self.connection is None:
+            self.connection = get_connection(self.backend, fail_silently=False)
+            self.connection.open()
+            self.stats.connections += 1
+        return self.connection
+
+    def close(self) -> None:
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:  # noqa: BLE001
+                logger.debug("Error cerrando la conexión de email", exc_info=True)
+            self.connection = None
+
+    def send_batch(self, block_ms: int | None = 2000) -> int:
+        """Envía un lote; devuelve cuántos mensajes se procesaron."""
+        self.queue.release_due()
+        batch = self.queue.read(self.batch_size, block_ms=block_ms)
+        if not batch:
+            # Cola vacía: no dejar la conexión abierta hasta el próximo lote.
+            self.close()
+            return 0
+        for queued in batch:
+            try:
+                self._connection().send_messages([queued.message])
+            except Exception as exc:  # noqa: BLE001
+                # Cada backend (smtplib, anymail) lanza sus propias excepciones
+                # y todas se reintentan igual.
+                logger.warning("Falló el envío del email %s: %s", queued.entry_id, exc)
+                # La conexión puede haber quedado en mal estado.
+                self.close()
+                if self.queue.retry(queued, repr(exc)):
+                    self.stats.retried += 1
+                else:
+                    self.stats.dead += 1
+            else:
+                self.queue.ack(queued.entry_id)
+                self.stats.sent += 1
+        return len(batch)
+
+    def drain(self) -> int:
+        processed = 0
+        while count := self.send_batch(block_ms=None):
+            processed += count
+        self.close()
+        return processed
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """
+    Encola los mensajes en Redis; los envía ``send_queued_mail``.
+
+    Dentro de una transacción (``ATOMIC_REQUESTS``) el encolado queda para
+    después del commit y ``send_messages`` devuelve los mensajes programados,
+    no los encolados. Si después falla, se registra en el log: los datos ya
+    se guardaron y la respuesta no debe ser un 500.
+    """
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        messages = list(email_messages)
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(
+                lambda: self._enqueue_after_commit(messages),
+                robust=True,
+            )
+            return len(messages)
+        return self._enqueue(messages)
+
+    @staticmethod
+    def _enqueue_after_commit(messages) -> None:
+        try:
+            get_mail_queue().enqueue(messages)
+        except Exception:
+            logger.exception("No se pudieron encolar %s emails", len(messages))
+
+    def _enqueue(self, messages) -> int:
+        try:
+            get_mail_queue().enqueue(messages)
+        except Exception:
+            if not self.fail_silently:
+                raise
+            logger.warning("No se pudieron encolar emails", exc_info=True)
+            return 0
+        return len(messages)
+
+
+_queue: MailQueue | None = None
+_queue_lock = threading.Lock()
+
+
+def get_mail_queue() -> MailQueue:
+    global _queue  # noqa: PLW0603
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = MailQueue(
+                    max_attempts=getattr(settings, "MAIL_QUEUE_MAX_ATTEMPTS", 5),
+                    retry_delay=getattr(settings, "MAIL_QUEUE_RETRY_DELAY", 30),
+                )
+    return _queue
+
+
+def get_mail_sender() -> MailSender:
+    return MailSender(
+        get_mail_queue(),
+        backend=getattr(
+            settings,
+            "MAIL_QUEUE_DELIVERY_BACKEND",
+            "django.core.mail.backends.smtp.EmailBackend",
+        ),
+        batch_size=getattr(settings, "MAIL_QUEUE_BATCH_SIZE", 50),
+    )
@@ -0,0 +1,40 @@
+"""
+Management command que precompila el esquema OpenAPI para producción.
+
+Uso:
+    python manage.py build_openapi_schema [--output-dir DIR]
+
+Se corre en cada deploy (ver ``compose/production/django/start``). Fuera de
+DEBUG, ``/api/schema/`` sólo sirve este archivo: no genera el esquema en
+runtime.
+"""
+
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from apps.core.schema import build_schema
+from apps.core.schema import get_schema_dir
+
+
+class Command(BaseCommand):
+    help = "Genera el esquema OpenAPI versionado en OPENAPI_SCHEMA_DIR"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output-dir",
+            type=Path,
+            default=None,
+            help="Directorio de salida (por defecto OPENAPI_SCHEMA_DIR)",
+        )
+
+    def handle(self, *args, **options):
+        directory = options["output_dir"] or get_schema_dir()
+        manifest = build_schema(directory)
+        for name in manifest["files"].values():
+            self.stdout.write(f"📄 {directory / name}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Esquema {manifest['version']} ({manifest['hash']}) generado",
+            ),
+        )
@@ -0,0 +1,72 @@
+"""
+Management command que envía los emails encolados por ``QueuedEmailBackend``.
+
+Uso:
+    python manage.py send_queued_mail [--once] [--batch-size N]
+
+Envía con ``MAIL_QUEUE_DELIVERY_BACKEND`` y reutiliza la conexión mientras la
+cola tenga mensajes. Los fallos se reintentan con espera exponencial (ver
+``apps.core.mail``).
+"""
+
+import json
+import time
+from dataclasses import asdict
+
+from django.core.management.base import BaseCommand
+
+from apps.core.mail import get_mail_sender
+
+
+class Command(BaseCommand):
+    help = "Consume la cola de emails de Redis y los envía en lotes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Envía lo pendiente y termina",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Mensajes por lote (por defecto MAIL_QUEUE_BATCH_SIZE)",
+        )
+        parser.add_argument(
+            "--stats-every",
+            type=int,
+            default=60,
+            help="Segundos entre reportes de métricas (0 para desactivar)",
+        )
+
+    def handle(self, *args, **options):
+        sender = get_mail_sender()
+        if options["batch_size"]:
+            sender.batch_size = options["batch_size"]
+
+        if options["once"]:
+            processed = sender.drain()
+            self.stdout.write(self.style.SUCCESS(f"✅ {processed} emails procesados"))
+            self._write_stats(sender)
+            return
+
+        self.stdout.write(f"📥 Enviando emails como {sender.queue.consumer}")
+        reported_at = time.monotonic()
+        try:
+            while True:
+                try:
+                    sender.send_batch()
+                except Exception as exc:  # noqa: BLE001
+                    # Redis caído: lo no confirmado se reclama en la próxima vuelta.
+                    self.stderr.write(f"❌ Error leyendo la cola: {exc}")
+                    time.sleep(1)
+                every = options["stats_every"]
+                if every and time.monotonic() - reported_at >= every:
+                    self._write_stats(sender)
+                    reported_at = time.monotonic()
+        finally:
+            sender.close()
+
+    def _write_stats(self, sender):
+        self.stdout.write(json.dumps(asdict(sender.stats)))
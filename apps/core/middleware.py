@@ -0,0 +1,256 @@
+"""
+Middlewares de infraestructura compartidos por todas las apps.
+"""
+
+import time
+
+from asgiref.sync import iscoroutinefunction
+from asgiref.sync import markcoroutinefunction
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from apps.core.compression import acompress_sequence
+from apps.core.compression import compress_sequence
+from apps.core.compression import get_encoder
+from apps.core.compression import is_compressible
+from apps.core.compression import negotiate
+from apps.core.preload import critical_links
+from apps.core.preload import links_for
+from apps.core.preload import remember
+from apps.core.replicas import PIN_COOKIE
+from apps.core.replicas import replica_aliases
+from apps.core.replicas import routing
+
+# Momento (epoch) en que la sesión se guardó por última vez.
+SESSION_REFRESHED_KEY = "_session_refreshed_at"
+
+
+class ThrottledSessionMiddleware(SessionMiddleware):
+    """
+    ``SessionMiddleware`` con vencimiento deslizante pero sin guardar en cada
+    request (reemplaza a ``SESSION_SAVE_EVERY_REQUEST``).
+
+    Una sesión que el request usó se vuelve a guardar, y su cookie se renueva,
+    sólo si cambió o si desde el último guardado pasó más de
+    ``SESSION_REFRESH_FRACTION`` de su duración: es decir, cuando el
+    vencimiento se movería más que esa fracción. Los requests que no tocan la
+    sesión (``sw.js``, estáticos) no la leen ni la escriben.
+    """
+
+    def process_response(self, request, response):
+        session = getattr(request, "session", None)
+        if (
+            session is not None
+            and session.accessed
+            and not session.is_empty()
+            and response.status_code < 500  # noqa: PLR2004
+        ):
+            now = int(time.time())
+            refreshed_at = session.get(SESSION_REFRESHED_KEY)
+            fraction = getattr(settings, "SESSION_REFRESH_FRACTION", 0.1)
+            if (
+                session.modified
+                or refreshed_at is None
+                or now - refreshed_at >= fraction * session.get_expiry_age()
+            ):
+                # Marca la sesión como modificada: SessionMiddleware la guarda.
+                session[SESSION_REFRESHED_KEY] = now
+        return super().process_response(request, response)
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    ``WhiteNoiseMiddleware`` que también funciona en modo async.
+
+    WhiteNoise sólo es sync: bajo ASGI, Django adapta toda la cadena y cada
+    request, aunque la vista sea async, ocupa un hilo de principio a fin
+    (``sync_to_async`` alrededor y ``async_to_sync`` adentro). En modo async
+    la búsqueda del archivo es un lookup en memoria; sólo servirlo (o
+    buscarlo en disco con ``autorefresh``) pasa por un hilo.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class CompressionMiddleware:
+    """
+    Comprime HTML y JSON dinámicos con brotli o gzip según
+    ``Accept-Encoding`` (WhiteNoise ya sirve los estáticos comprimidos).
+
+    Saltea los cuerpos de menos de ``RESPONSE_COMPRESSION_MIN_SIZE`` bytes, los
+    que ya traen ``Content-Encoding`` y los tipos que no ganan nada (imágenes,
+    zip). Un streaming se comprime de a chunks, sin juntarlo en memoria, y
+    sigue siendo async si lo era. En modo async no agrega un hilo al request:
+    comprimir una página lleva menos que el salto a ``sync_to_async``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, "RESPONSE_COMPRESSION_MIN_SIZE", 512)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding") or not is_compressible(
+            response.get("Content-Type", ""),
+        ):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return response
+
+        encoder = get_encoder(encoding)
+        if response.streaming:
+            content = response.streaming_content
+            if response.is_async:
+                response.streaming_content = acompress_sequence(encoder, content)
+            else:
+                response.streaming_content = compress_sequence(encoder, content)
+            del response.headers["Content-Length"]
+        else:
+            compressed = encoder.compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # Como GZipMiddleware: el cuerpo ya no es byte a byte el del ETag.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+
+class PreloadMiddleware:
+    """
+    Agrega ``Link: rel=preload`` (y ``preconnect``) con los assets del
+    ``<head>`` a las páginas HTML, y los registra para los 103 Early Hints
+    del próximo request al mismo path (ver ``apps.core.preload``).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if (
+            request.method != "GET"
+            or response.status_code != 200  # noqa: PLR2004
+            or response.streaming
+            or not response.get("Content-Type", "").startswith("text/html")
+            # Un parcial de htmx no tiene <head>.
+            or "HX-Request" in request.headers
+        ):
+            return response
+        links = links_for(request.path)
+        if links is None:
+            html = response.content.decode(response.charset, errors="replace")
+            links = critical_links(html)
+            remember(request.path, links)
+        if links:
+            existing = response.get("Link")
+            response.headers["Link"] = ", ".join(
+                [existing, *links] if existing else links,
+            )
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Abre el estado de ruteo a réplicas de cada request (ver
+    ``apps.core.replicas``). Si el request escribió, responde con la cookie
+    que deja al usuario en ``default`` por ``REPLICA_PIN_SECONDS`` segundos.
+    Sin ``DATABASE_REPLICAS`` no se instala.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not replica_aliases():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.pin_seconds = getattr(settings, "REPLICA_PIN_SECONDS", 10)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with routing(pinned=PIN_COOKIE in request.COOKIES) as state:
+            response = self.get_response(request)
+        return self.process_response(state, response)
+
+    async def __acall__(self, request):
+        with routing(pinned=PIN_COOKIE in request.COOKIES) as state:
+            response = await self.get_response(request)
+        return self.process_response(state, response)
+
+    def process_response(self, state, response):
+        if state.wrote:
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=self.pin_seconds,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,184 @@
+"""
+Caché de páginas con huecos por usuario.
+
+Las páginas autenticadas (``config.views``) son casi iguales para todos: cambia
+el saludo con el email, los mensajes y el token CSRF. ``CachedPageMixin``
+guarda el HTML completo de la página (el "shell") una vez por página, idioma y
+estado de autenticación, y en cada request sólo renderiza los fragmentos
+marcados en el template con::
+
+    {% load page_cache %}
+    {% uncached "greeting" %}Hola, {{ request.user.email }}{% enduncached %}
+
+Al renderizar el shell cada ``{% uncached %}`` deja un marcador; en cada
+request se renderizan sólo esos nodos (del template ya compilado por el cached
+loader) con el contexto del request y se reemplazan los marcadores.
+
+El shell se guarda en el caché compartido y, delante, en un LRU del proceso.
+La clave incluye ``PAGE_CACHE_VERSION`` y el hash del manifest de estáticos,
+así que un deploy con estáticos nuevos no sirve shells viejos.
+"""
+
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template import Context
+from django.template import Node
+from django.template import RequestContext
+from django.template.loader import get_template
+from django.template.loader_tags import ExtendsNode
+from django.utils.translation import get_language
+
+from apps.core.cache import LRUCache
+
+PAGE_KEY = "core:page:{version}:{digest}"
+# Variable de contexto presente sólo mientras se renderiza el shell.
+CAPTURING = "_page_cache_capturing"
+MARKER = "<!--uncached:{name}-->"
+
+_local = LRUCache(
+    max_size=getattr(settings, "PAGE_CACHE_LOCAL_SIZE", 256),
+    ttl=getattr(settings, "PAGE_CACHE_LOCAL_TTL", 30),
+)
+
+
+class UncachedNode(Node):
+    """Fragmento que se renderiza en cada request, fuera del shell cacheado."""
+
+    child_nodelists = ("nodelist",)
+
+    def __init__(self, name: str, nodelist):
+        self.name = name
+        self.nodelist = nodelist
+
+    def render(self, context):
+        if context.get(CAPTURING):
+            return MARKER.format(name=self.name)
+        return self.nodelist.render(context)
+
+
+def template_chain(template):
+    """``template`` y los templates que extiende, del hijo a la base."""
+    while template is not None:
+        yield template
+        extends = template.nodelist.get_nodes_by_type(ExtendsNode)
+        if not extends:
+            return
+        parent = extends[0].parent_name.resolve(Context())
+        template = template.engine.get_template(parent)
+
+
+@functools.lru_cache(maxsize=64)
+def find_uncached(template) -> dict[str, UncachedNode]:
+    """
+    Nodos ``{% uncached %}`` de ``template`` y de los templates que extiende.
+    Con el cached loader el template compilado es siempre el mismo objeto.
+    """
+    nodes = {}
+    # Los del hijo (dentro de sus bloques) pisan a los de la base.
+    for current in reversed(list(template_chain(template))):
+        nodes.update(
+            (node.name, node)
+            for node in current.nodelist.get_nodes_by_type(UncachedNode)
+        )
+    return nodes
+
+
+def cache_version() -> str:
+    manifest_hash = getattr(staticfiles_storage, "manifest_hash", "")
+    return f"{getattr(settings, 'PAGE_CACHE_VERSION', '')}.{manifest_hash}"
+
+
+def clear_local() -> None:
+    _local.clear()
+
+
+class CachedPageMixin:
+    """
+    ``TemplateView`` que sirve el shell cacheado y renderiza sólo los
+    fragmentos ``{% uncached %}`` por request.
+
+    ``page_cache_vary_on`` nombra las variables del contexto que entran en la
+    clave, además del template, la URL, el idioma y la autenticación. La
+    respuesta lleva ``Server-Timing: page;desc=hit|miss;dur=<ms>``.
+    """
+
+    page_cache_vary_on: tuple[str, ...] = ()
+
+    def get_page_cache_parts(self, context) -> list[str]:
+        match = self.request.resolver_match
+        return [
+            self.get_template_names()[0],
+            match.view_name if match else self.request.path,
+            get_language() or "",
+            "auth" if self.request.user.is_authenticated else "anon",
+            *(repr(context.get(name)) for name in self.page_cache_vary_on),
+        ]
+
+    def get_page_cache_key(self, context) -> str:
+        parts = self.get_page_cache_parts(context)
+        digest = hashlib.md5("|".join(parts).encode(), usedforsecurity=False)
+        return PAGE_KEY.format(version=cache_version(), digest=digest.hexdigest())
+
+    def render_to_response(self, context, **response_kwargs):
+        timeout = getattr(settings, "PAGE_CACHE_TIMEOUT", 0)
+        if not timeout:
+            return super().render_to_response(context, **response_kwargs)
+
+        started = time.perf_counter()
+        template = get_template(self.get_template_names()[0]).template
+        key = self.get_page_cache_key(context)
+        shell = _local.get(key)
+        hit = shell is not None
+        if not hit:
+            shell = cache.get(key)
+            hit = shell is not None
+            if not hit:
+                shell = self.render_shell(template, context)
+                cache.set(key, shell, timeout=timeout)
+            _local.set(key, shell)
+
+        content = self.fill(template, shell, context)
+        response = HttpResponse(content, **response_kwargs)
+        duration = (time.perf_counter() - started) * 1000
+        response["Server-Timing"] = (
+            f'page;desc="{"hit" if hit else "miss"}";dur={duration:.1f}'
+        )
+        return response
+
+    def render_shell(self, template, context) -> str:
+        request_context = RequestContext(self.request, context)
+        # Encima de los context processors. Sin token, un {% csrf_token %} que
+        # quedó fuera de {% uncached %} no termina en el caché.
+        request_context.update({CAPTURING: True, "csrf_token": ""})
+        return self.render_content(template, request_context)
+
+    def render_content(self, template, context) -> str:
+        """Lo que se cachea: la página entera (ver ``HtmxPartialMixin``)."""
+        return template.render(context)
+
+    def fill(self, template, shell: str, context) -> str:
+        """Renderiza los fragmentos ``{% uncached %}`` y los pone en el shell."""
+        nodes = {
+            name: node
+            for name, node in find_uncached(template).items()
+            if MARKER.format(name=name) in shell
+        }
+        if not nodes:
+            return shell
+        request_context = RequestContext(self.request, context)
+        with (
+            request_context.render_context.push_state(template),
+            request_context.bind_template(template),
+        ):
+            for name, node in nodes.items():
+                shell = shell.replace(
+                    MARKER.format(name=name),
+                    node.nodelist.render(request_context),
+                )
+        return shell
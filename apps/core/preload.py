@@ -0,0 +1,123 @@
+"""
+Preload de los assets críticos: headers ``Link`` y 103 Early Hints.
+
+El navegador descubre el CSS y el JS de ``base.html`` recién al parsear el
+``<head>``. ``PreloadMiddleware`` lee ese ``<head>`` de la página ya
+renderizada, así las URLs son las finales (hasheadas por
+``ManifestStaticFilesStorage`` o generadas por ``{% compress %}``), y agrega:
+
+- ``<url>; rel=preload; as=style|script`` para los estáticos propios;
+- ``<origen>; rel=preconnect`` para los scripts de CDNs.
+
+Los links quedan registrados por path. En el próximo request al mismo path,
+``EarlyHints`` (delante de Django en ``config.asgi``) los manda como
+``103 Early Hints`` antes de que Django empiece a trabajar, si el servidor
+anuncia la extensión ASGI ``http.response.informational`` o, si no,
+``http.response.early_hint`` (uvicorn con ``config.early_hints``).
+"""
+
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+from apps.core.cache import LRUCache
+
+EARLY_HINT = "http.response.early_hint"
+INFORMATIONAL = "http.response.informational"
+
+_links = LRUCache(
+    max_size=getattr(settings, "PRELOAD_MAX_PATHS", 1000),
+    ttl=getattr(settings, "PRELOAD_TTL", 5 * 60),
+)
+
+
+class _HeadParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "link" and (attrs.get("rel") or "").lower() == "stylesheet":
+            self.add(attrs.get("href"), "style", cors="crossorigin" in attrs)
+        elif tag == "script" and attrs.get("src"):
+            self.add(attrs["src"], "script", cors="crossorigin" in attrs)
+
+    def add(self, url: str | None, kind: str, *, cors: bool) -> None:
+        if not url:
+            return
+        parts = urlsplit(url)
+        if parts.netloc:
+            link = f"<{parts.scheme or 'https'}://{parts.netloc}>; rel=preconnect"
+            # Los pedidos CORS usan otra conexión que los que no lo son.
+            if cors:
+                link += "; crossorigin"
+        else:
+            link = f"<{url}>; rel=preload; as={kind}"
+        if link not in self.links:
+            self.links.append(link)
+
+
+def critical_links(html: str) -> tuple[str, ...]:
+    """Valores de ``Link`` para los estilos y scripts del ``<head>`` de ``html``."""
+    end = html.find("</head>")
+    parser = _HeadParser()
+    parser.feed(html if end == -1 else html[:end])
+    parser.close()
+    return tuple(parser.links)
+
+
+def links_for(path: str) -> tuple[str, ...] | None:
+    return _links.get(path)
+
+
+def remember(path: str, links: tuple[str, ...]) -> None:
+    _links.set(path, links)
+
+
+def clear() -> None:
+    _links.clear()
+
+
+class EarlyHints:
+    """
+    Aplicación ASGI que, si el servidor lo soporta, manda ``103 Early Hints``
+    con los links conocidos del path y delega en ``app``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        extensions = scope.get("extensions") or {}
+        if (
+            scope["type"] == "http"
+            and scope["method"] == "GET"
+            and (INFORMATIONAL in extensions or EARLY_HINT in extensions)
+            and (links := links_for(scope["path"]))
+            and _is_navigation(scope["headers"])
+        ):
+            encoded = [link.encode() for link in links]
+            if INFORMATIONAL in extensions:
+                await send(
+                    {
+                        "type": INFORMATIONAL,
+                        "status": 103,
+                        "headers": [(b"link", link) for link in encoded],
+                    },
+                )
+            else:
+                await send({"type": EARLY_HINT, "links": encoded})
+        await self.app(scope, receive, send)
+
+
+def _is_navigation(headers) -> bool:
+    """Pedido de una página (no htmx, fetch ni un estático)."""
+    accept = b""
+    for name, value in headers:
+        if name == b"hx-request":
+            return False
+        if name == b"accept":
+            accept = value
+    return b"text/html" in accept
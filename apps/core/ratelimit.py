@@ -0,0 +1,100 @@
+"""
+Rate limiting con ventana deslizante sobre el cache (Redis en producción).
+
+Se usa la aproximación de "ventana deslizante por contadores": un contador por
+ventana fija de ``window`` segundos y, para estimar los últimos ``window``
+segundos, el contador actual más la parte proporcional del anterior. Cuesta un
+``INCR`` y un ``GET`` por intento (o un ``GET`` de dos claves para consultar
+sin contar) y no guarda un registro por intento.
+
+Si el cache no responde (django-redis con ``IGNORE_EXCEPTIONS`` devuelve
+``None``) el limitador deja pasar: es un prefiltro y no debe cortar el login.
+"""
+
+import hashlib
+import logging
+import math
+import time
+from dataclasses import dataclass
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+KEY = "ratelimit:{scope}:{key}:{bucket}"
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitResult:
+    allowed: bool
+    count: float
+    retry_after: int
+
+
+class SlidingWindowLimiter:
+    """Hasta ``limit`` eventos por ``key`` en los últimos ``window`` segundos."""
+
+    def __init__(self, scope: str, limit: int, window: int):
+        self.scope = scope
+        self.limit = limit
+        self.window = window
+
+    def _keys(self, key: str, now: float) -> tuple[str, str, float]:
+        digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+        bucket = int(now // self.window)
+        current = KEY.format(scope=self.scope, key=digest, bucket=bucket)
+        previous = KEY.format(scope=self.scope, key=digest, bucket=bucket - 1)
+        elapsed = (now % self.window) / self.window
+        return current, previous, elapsed
+
+    def _result(
+        self,
+        current: int | None,
+        previous: int | None,
+        elapsed: float,
+    ) -> RateLimitResult:
+        if current is None:
+            logger.warning("Rate limit %s sin cache; se deja pasar", self.scope)
+            return RateLimitResult(allowed=True, count=0, retry_after=0)
+        count = current + (previous or 0) * (1 - elapsed)
+        if count <= self.limit:
+            return RateLimitResult(allowed=True, count=count, retry_after=0)
+        # Cota superior: al empezar la próxima ventana el actual pasa a pesar
+        # menos; puede liberarse antes.
+        retry_after = max(1, math.ceil(self.window * (1 - elapsed)))
+        return RateLimitResult(allowed=False, count=count, retry_after=retry_after)
+
+    def hit(self, key: str) -> RateLimitResult:
+        """Cuenta un evento y dice si entra en el límite."""
+        current_key, previous_key, elapsed = self._keys(key, time.time())
+        # La ventana anterior se sigue leyendo: dura dos ventanas.
+        cache.add(current_key, 0, timeout=2 * self.window)
+        current = cache.incr(current_key)
+        previous = cache.get(previous_key, 0)
+        return self._result(current, previous, elapsed)
+
+    def peek(self, key: str) -> RateLimitResult:
+        """Como ``hit`` pero sin contar."""
+        current_key, previous_key, elapsed = self._keys(key, time.time())
+        values = cache.get_many([current_key, previous_key]) or {}
+        return self._result(
+            values.get(current_key, 0) + 1,
+            values.get(previous_key, 0),
+            elapsed,
+        )
+
+    async def ahit(self, key: str) -> RateLimitResult:
+        current_key, previous_key, elapsed = self._keys(key, time.time())
+        await cache.aadd(current_key, 0, timeout=2 * self.window)
+        current = await cache.aincr(current_key)
+        previous = await cache.aget(previous_key, 0)
+        return self._result(current, previous, elapsed)
+
+    async def apeek(self, key: str) -> RateLimitResult:
+        current_key, previous_key, elapsed = self._keys(key, time.time())
+        values = await cache.aget_many([current_key, previous_key]) or {}
+        return self._result(
+            values.get(current_key, 0) + 1,
+            values.get(previous_key, 0),
+            elapsed,
+        )
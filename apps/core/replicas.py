@@ -0,0 +1,174 @@
+"""
+Lecturas en réplicas, con conciencia del lag de replicación.
+
+``DATABASE_REPLICAS`` lista los alias de ``DATABASES`` que replican a
+``default``. ``ReplicaRouter`` manda a una réplica sólo las lecturas de los
+métodos seguros de las vistas ``READ_ONLY`` (ver ``apps.core.transactions``):
+las páginas y los ``GET`` de la API. El resto (writes, vistas ``WRITE``,
+comandos, tareas) sigue en ``default``.
+
+- Un request que escribe deja al usuario en ``default`` por
+  ``REPLICA_PIN_SECONDS`` segundos, con una cookie: sus próximas páginas ven lo
+  que acaba de escribir aunque la réplica venga atrasada.
+- Cada proceso mide el lag de cada réplica cada ``REPLICA_LAG_CHECK_INTERVAL``
+  segundos. Una réplica con más de ``REPLICA_MAX_LAG`` segundos de atraso, o
+  que no responde, no recibe lecturas hasta la próxima medición; sin réplicas
+  sanas se lee de ``default``.
+- Dentro de un bloque ``atomic`` abierto antes de la vista (un test, una vista
+  llamada desde otra) se lee de ``default``, que ve la transacción en curso.
+
+Todas las lecturas de un request van a la misma réplica.
+"""
+
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db import DatabaseError
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# La cookie sólo marca "escribió hace poco"; vence sola a los N segundos.
+PIN_COOKIE = "db_pin"
+
+# En una réplica de PostgreSQL: 0 si aplicó todo lo que recibió, si no el
+# tiempo desde la última transacción aplicada. En el primario, 0. Una réplica
+# sin WAL receiver en streaming (desconectada del primario) aplicó todo lo que
+# recibió pero no sabe cuánto le falta: NULL, no se usa. Sin
+# pg_read_all_stats ``status`` se ve NULL; alcanza con que el receiver exista.
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (
+            SELECT 1 FROM pg_stat_wal_receiver
+            WHERE status IS NULL OR status = 'streaming'
+        ) THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+
+@dataclass
+class RoutingState:
+    """Lo que el router sabe del request en curso."""
+
+    pinned: bool = False
+    reading: bool = False
+    outer_atomic: bool = False
+    wrote: bool = False
+    replica: str | None = None
+
+
+_state: ContextVar[RoutingState | None] = ContextVar("replica_routing", default=None)
+_lag: dict[str, tuple[float, float]] = {}
+_lag_lock = threading.Lock()
+
+
+def replica_aliases() -> list[str]:
+    return list(getattr(settings, "DATABASE_REPLICAS", ()))
+
+
+@contextmanager
+def routing(*, pinned: bool = False):
+    """Estado de ruteo de un request; lo abre ``ReplicaRoutingMiddleware``."""
+    state = RoutingState(pinned=pinned)
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+@contextmanager
+def reading():
+    """Manda a las réplicas las lecturas del bloque, si hay un request."""
+    state = _state.get()
+    if state is None:
+        yield
+        return
+    previous = state.reading, state.outer_atomic
+    state.reading = True
+    state.outer_atomic = connections[DEFAULT_DB_ALIAS].in_atomic_block
+    try:
+        yield
+    finally:
+        state.reading, state.outer_atomic = previous
+
+
+def _measure_lag(alias: str) -> float | None:
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        # Una réplica de SQLite (para desarrollo) es una copia: sin lag.
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(LAG_SQL)
+        (lag,) = cursor.fetchone()
+    return None if lag is None else float(lag)
+
+
+def replica_lag(alias: str) -> float:
+    """Lag de ``alias`` en segundos (``inf`` si no se pudo medir)."""
+    interval = getattr(settings, "REPLICA_LAG_CHECK_INTERVAL", 5.0)
+    now = time.monotonic()
+    with _lag_lock:
+        checked = _lag.get(alias)
+    if checked is not None and now - checked[0] < interval:
+        return checked[1]
+    try:
+        lag = _measure_lag(alias)
+    except DatabaseError:
+        logger.warning("No se pudo medir el lag de la réplica %s", alias)
+        lag = None
+    lag = float("inf") if lag is None else lag
+    with _lag_lock:
+        _lag[alias] = (now, lag)
+    return lag
+
+
+def healthy_replicas() -> list[str]:
+    max_lag = getattr(settings, "REPLICA_MAX_LAG", 2.0)
+    return [alias for alias in replica_aliases() if replica_lag(alias) <= max_lag]
+
+
+class ReplicaRouter:
+    """Lecturas de vistas ``READ_ONLY`` a las réplicas, el resto a ``default``."""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if (
+            state is None
+            or not state.reading
+            or state.pinned
+            or state.wrote
+            or state.outer_atomic
+        ):
+            return None
+        if state.replica is None:
+            replicas = healthy_replicas()
+            state.replica = random.choice(replicas) if replicas else DEFAULT_DB_ALIAS  # noqa: S311
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:  # noqa: SLF001
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replica_aliases():
+            return False
+        return None
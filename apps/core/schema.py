@@ -0,0 +1,113 @@
+"""
+Esquema OpenAPI precompilado.
+
+En cada deploy ``python manage.py build_openapi_schema`` genera el esquema
+una sola vez y lo guarda en ``OPENAPI_SCHEMA_DIR`` como archivos versionados
+(``openapi-<versión>-<hash>.yaml`` y ``.json``) más un ``manifest.json`` que
+apunta a ellos. Fuera de DEBUG, ``/api/schema/`` sirve esos bytes desde
+memoria (con ETag y gzip precalculado) sin introspeccionar las vistas.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+from drf_spectacular.renderers import OpenApiJsonRenderer
+from drf_spectacular.renderers import OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+
+MANIFEST_NAME = "manifest.json"
+
+
+class SchemaNotBuilt(Exception):  # noqa: N818
+    """No hay un esquema precompilado en ``OPENAPI_SCHEMA_DIR``."""
+
+
+def get_schema_dir() -> Path:
+    return Path(settings.OPENAPI_SCHEMA_DIR)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+def build_schema(directory: Path | None = None) -> dict:
+    """Genera el esquema, escribe los archivos y devuelve el manifest."""
+    directory = directory or get_schema_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    bodies = {
+        "yaml": OpenApiYamlRenderer().render(schema, renderer_context={}),
+        "json": OpenApiJsonRenderer().render(schema, renderer_context={}),
+    }
+    digest = hashlib.sha256(bodies["json"]).hexdigest()[:12]
+    version = schema.get("info", {}).get("version", "0")
+
+    manifest = {"version": version, "hash": digest, "files": {}}
+    for fmt, body in bodies.items():
+        name = f"openapi-{version}-{digest}.{fmt}"
+        _write_atomic(directory / name, body)
+        manifest["files"][fmt] = name
+    # El manifest se escribe al final: nunca apunta a archivos a medio escribir.
+    _write_atomic(directory / MANIFEST_NAME, json.dumps(manifest).encode())
+    return manifest
+
+
+@dataclass(frozen=True, slots=True)
+class SchemaVariant:
+    body: bytes
+    gzip_body: bytes
+    etag: str
+
+
+class SchemaArtifact:
+    """Esquema precompilado cargado en memoria, por formato."""
+
+    def __init__(self, manifest: dict, variants: dict[str, SchemaVariant]):
+        self.manifest = manifest
+        self.variants = variants
+
+    @classmethod
+    def load(cls, directory: Path | None = None):
+        directory = directory or get_schema_dir()
+        try:
+            manifest = json.loads((directory / MANIFEST_NAME).read_bytes())
+            variants = {}
+            for fmt, name in manifest["files"].items():
+                body = (directory / name).read_bytes()
+                variants[fmt] = SchemaVariant(
+                    body=body,
+                    gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+                    etag=f'"{manifest["hash"]}-{fmt}"',
+                )
+        except (OSError, ValueError, KeyError) as exc:
+            msg = f"No hay esquema OpenAPI precompilado en {directory}"
+            raise SchemaNotBuilt(msg) from exc
+        return cls(manifest, variants)
+
+
+_artifact: SchemaArtifact | None = None
+_artifact_lock = threading.Lock()
+
+
+def get_artifact() -> SchemaArtifact:
+    """Esquema del proceso actual; se lee del disco una sola vez."""
+    global _artifact  # noqa: PLW0603
+    if _artifact is None:
+        with _artifact_lock:
+            if _artifact is None:
+                _artifact = SchemaArtifact.load()
+    return _artifact
+
+
+def clear_artifact() -> None:
+    global _artifact  # noqa: PLW0603
+    _artifact = None
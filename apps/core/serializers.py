@@ -0,0 +1,76 @@
+"""
+Campos de serializers reutilizables para los endpoints de la API.
+
+``CompiledHyperlinkedIdentityField`` evita el ``reverse()`` + URL absoluta
+por objeto de ``HyperlinkedIdentityField``: la ruta se resuelve una sola vez
+por request con un valor centinela y queda como plantilla
+``prefijo + pk + sufijo``. Para las filas siguientes armar la URL es una
+concatenación de strings.
+"""
+
+from django.urls import NoReverseMatch
+from rest_framework.relations import HyperlinkedIdentityField
+
+# Entero que no aparece en ninguna URL real y cumple con los conversores
+# ``int``, ``str``, ``slug`` y el ``[^/.]+`` de los routers de DRF.
+_SENTINEL = 987654321987654321
+
+
+class CompiledHyperlinkedIdentityField(HyperlinkedIdentityField):
+    """
+    ``HyperlinkedIdentityField`` que compila la URL en una plantilla por
+    request. Sólo usa la plantilla con lookups enteros (las pk); para otros
+    valores, o si la ruta no admite el centinela, se comporta como el
+    campo original.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # En un ListSerializer el campo es único para todas las filas: se
+        # guarda la plantilla (prefijo, sufijo) del último request.
+        self._template_request = None
+        self._template_key = None
+        self._template = None
+
+    def _get_template(self, view_name, request, format):  # noqa: A002
+        key = (view_name, format)
+        if request is not self._template_request or key != self._template_key:
+            self._template_request = request
+            self._template_key = key
+            self._template = self._compile(view_name, request, format)
+        return self._template
+
+    def _compile(self, view_name, request, format):  # noqa: A002
+        try:
+            url = self.reverse(
+                view_name,
+                kwargs={self.lookup_url_kwarg: _SENTINEL},
+                request=request,
+                format=format,
+            )
+        except NoReverseMatch:
+            return None
+        parts = url.split(str(_SENTINEL))
+        if len(parts) != 2:  # noqa: PLR2004
+            return None
+        return parts[0], parts[1]
+
+    def get_url(self, obj, view_name, request, format):  # noqa: A002
+        if hasattr(obj, "pk") and obj.pk in (None, ""):
+            return None
+        lookup_value = getattr(obj, self.lookup_field)
+        # bool es subclase de int pero no es una pk.
+        if type(lookup_value) is int:
+            template = self._get_template(view_name, request, format)
+            if template is not None:
+                return f"{template[0]}{lookup_value}{template[1]}"
+        return super().get_url(obj, view_name, request, format)
+
+
+class CompiledHyperlinksMixin:
+    """
+    Mixin para ``ModelSerializer``: el campo ``url`` usa
+    ``CompiledHyperlinkedIdentityField``.
+    """
+
+    serializer_url_field = CompiledHyperlinkedIdentityField
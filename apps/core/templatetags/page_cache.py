@@ -0,0 +1,21 @@
+from django import template
+
+from apps.core.pages import UncachedNode
+
+register = template.Library()
+
+
+@register.tag
+def uncached(parser, token):
+    """
+    ``{% uncached "name" %}...{% enduncached %}``: fragmento por usuario que
+    ``CachedPageMixin`` renderiza en cada request en lugar de cachearlo.
+    """
+    bits = token.split_contents()
+    if len(bits) != 2:  # noqa: PLR2004
+        msg = f"'{bits[0]}' recibe un solo argumento: el nombre del fragmento"
+        raise template.TemplateSyntaxError(msg)
+    name = bits[1].strip("\"'")
+    nodelist = parser.parse(("enduncached",))
+    parser.delete_first_token()
+    return UncachedNode(name, nodelist)
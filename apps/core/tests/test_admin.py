@@ -0,0 +1,211 @@
+import re
+from http import HTTPStatus
+from unittest.mock import patch
+
+import pytest
+from django.contrib.admin import site
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import connection
+from django.urls import reverse
+from push_notifications.models import WebPushDevice
+
+from apps.core import bulk
+from apps.core.admin import EstimatedCountPaginator
+from apps.core.admin import estimated_count
+from apps.pwa.admin import send_test_message
+from apps.users.admin import UserAdmin
+from apps.users.admin import deactivate_users
+from apps.users.models import User
+from apps.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _settings(settings):
+    settings.ADMIN_BULK_WORKERS = 0
+    settings.ADMIN_BULK_CHUNK_SIZE = 2
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def changelist(client, **params):
+    return client.get(reverse("admin:users_user_changelist"), data=params)
+
+
+class TestEstimatedCountPaginator:
+    def test_unfiltered_uses_estimate(self, settings):
+        settings.ADMIN_ESTIMATED_COUNT_THRESHOLD = 1000
+        with patch("apps.core.admin.estimated_count", return_value=5000):
+            paginator = EstimatedCountPaginator(User.objects.order_by("pk"), 10)
+            assert paginator.count == 5000  # noqa: PLR2004
+        assert paginator.is_estimate
+
+    def test_small_tables_are_counted(self, settings, user):
+        with patch("apps.core.admin.estimated_count", return_value=10):
+            paginator = EstimatedCountPaginator(User.objects.order_by("pk"), 10)
+            assert paginator.count == 1
+        assert not paginator.is_estimate
+
+    def test_filtered_count_is_capped(self, settings):
+        settings.ADMIN_COUNT_LIMIT = 3
+        UserFactory.create_batch(5, name="x")
+        paginator = EstimatedCountPaginator(
+            User.objects.filter(name="x").order_by("pk"),
+            10,
+        )
+        assert paginator.count == 3  # noqa: PLR2004
+        assert paginator.is_estimate
+
+    def test_estimated_count_reads_pg_class(self):
+        UserFactory.create_batch(3)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE users_user")
+        assert estimated_count(User.objects.all()) == 3  # noqa: PLR2004
+
+
+class TestKeysetChangeList:
+    def test_pages_by_cursor(self, admin_client, admin_user):
+        users = [admin_user, *UserFactory.create_batch(4)]
+        with patch.object(UserAdmin, "list_per_page", 2):
+            response = changelist(admin_client)
+            cl = response.context["cl"]
+            assert [u.pk for u in cl.result_list] == [u.pk for u in users[:2]]
+            assert cl.next_cursor == users[1].pk
+
+            response = changelist(admin_client, cursor=cl.next_cursor)
+            cl = response.context["cl"]
+            assert [u.pk for u in cl.result_list] == [u.pk for u in users[2:4]]
+            assert "cursor" not in cl.first_page_url
+            assert b"First page" in response.content
+
+            response = changelist(admin_client, cursor=users[3].pk)
+            assert response.context["cl"].next_cursor is None
+
+    def test_other_orderings_use_page_numbers(self, admin_client):
+        UserFactory.create_batch(3)
+        with patch.object(UserAdmin, "list_per_page", 2):
+            response = changelist(admin_client, o="1")
+        cl = response.context["cl"]
+        assert not cl.keyset
+        assert cl.multi_page
+
+    def test_invalid_cursor(self, admin_client):
+        response = changelist(admin_client, cursor="nope")
+        # El admin redirige con ?e=1 ante parámetros inválidos.
+        assert response.status_code == HTTPStatus.FOUND
+
+
+class TestSearch:
+    def test_short_terms_match_email_prefix(self, admin_client):
+        UserFactory(email="ab@example.com", name="Zed")
+        UserFactory(email="zz@example.com", name="Abby")
+        response = changelist(admin_client, q="ab")
+        assert [u.email for u in response.context["cl"].result_list] == [
+            "ab@example.com",
+        ]
+
+    def test_long_terms_match_email_and_name(self, admin_client):
+        UserFactory(email="ab@example.com", name="Zed")
+        UserFactory(email="zz@example.com", name="Abby")
+        response = changelist(admin_client, q="abb")
+        assert [u.name for u in response.context["cl"].result_list] == ["Abby"]
+
+
+class TestBulkActions:
+    def test_deactivate_in_chunks(
+        self,
+        admin_client,
+        django_capture_on_commit_callbacks,
+    ):
+        users = UserFactory.create_batch(5)
+        with (
+            patch("apps.users.admin.invalidate_user") as invalidate,
+            django_capture_on_commit_callbacks(execute=True),
+        ):
+            response = admin_client.post(
+                reverse("admin:users_user_changelist"),
+                {
+                    "action": "deactivate_selected",
+                    "_selected_action": [u.pk for u in users],
+                },
+            )
+        assert response.status_code == HTTPStatus.FOUND
+        assert not User.objects.filter(pk__in=[u.pk for u in users], is_active=True)
+        assert invalidate.call_count == 5  # noqa: PLR2004
+
+        (message,) = get_messages(response.wsgi_request)
+        url = re.search(r'href="([^"]+)"', str(message)).group(1)
+        assert admin_client.get(url).json() == {"status": "done", "done": 5}
+
+    def test_deactivation_clears_caches_after_commit(self):
+        user = UserFactory()
+        with patch("apps.users.admin.invalidate_user") as invalidate:
+            bulk.process_in_chunks(User.objects.all(), deactivate_users, chunk_size=2)
+        # The test transaction never commits.
+        invalidate.assert_not_called()
+        assert not User.objects.get(pk=user.pk).is_active
+
+    def test_unknown_job(self, admin_client):
+        url = reverse("admin:users_user_bulk_job", args=["nope"])
+        assert admin_client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+    def test_process_in_chunks_reports_progress(self):
+        UserFactory.create_batch(5)
+        chunks = []
+        done = bulk.process_in_chunks(
+            User.objects.all(),
+            lambda qs: chunks.append(qs.count()),
+            chunk_size=2,
+            job_id="job",
+        )
+        assert done == 5  # noqa: PLR2004
+        assert chunks == [2, 2, 1]
+        assert bulk.get_job("job") == {"status": "done", "done": 5}
+
+    def test_send_test_push(self, admin_client, django_capture_on_commit_callbacks):
+        device = WebPushDevice.objects.create(
+            registration_id="https://push.example.com/1",
+            p256dh="key",
+            auth="auth",
+            browser="CHROME",
+        )
+        with (
+            patch.object(type(WebPushDevice.objects.none()), "send_message") as send,
+            django_capture_on_commit_callbacks(execute=True),
+        ):
+            admin_client.post(
+                reverse("admin:push_notifications_webpushdevice_changelist"),
+                {"action": "send_test", "_selected_action": [device.pk]},
+            )
+        send.assert_called_once()
+
+    def test_send_test_push_after_the_chunk(self, django_capture_on_commit_callbacks):
+        WebPushDevice.objects.create(
+            registration_id="https://push.example.com/1",
+            p256dh="key",
+            auth="auth",
+            browser="CHROME",
+        )
+        with patch.object(type(WebPushDevice.objects.none()), "send_message") as send:
+            with django_capture_on_commit_callbacks() as callbacks:
+                bulk.process_in_chunks(
+                    WebPushDevice.objects.all(),
+                    send_test_message,
+                    chunk_size=10,
+                )
+            # Nada sale a la red con la transacción de la tanda abierta.
+            send.assert_not_called()
+            for callback in callbacks:
+                callback()
+        send.assert_called_once()
+
+    def test_device_changelist(self, admin_client):
+        assert site.is_registered(WebPushDevice)
+        response = admin_client.get(
+            reverse("admin:push_notifications_webpushdevice_changelist"),
+            data={"q": "a"},
+        )
+        assert response.status_code == HTTPStatus.OK
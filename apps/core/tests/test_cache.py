@@ -0,0 +1,165 @@
+import json
+import time
+import uuid
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from django.urls import reverse
+from redis.exceptions import RedisError
+
+from apps.core.cache import LRUCache
+from apps.core.cache import TieredRedisCache
+from apps.core.cache import shared_get
+
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        lru = LRUCache(max_size=2, ttl=60)
+        lru.set("a", "1")
+        lru.set("b", "2")
+        lru.get("a")
+        lru.set("c", "3")
+        assert lru.get("b") is None
+        assert lru.get("a") == "1"
+        assert lru.get("c") == "3"
+
+    def test_expires(self):
+        lru = LRUCache(max_size=2, ttl=60)
+        lru.set("a", "1", ttl=-1)
+        assert lru.get("a") is None
+
+
+def eventually(check, timeout: float = 2) -> bool:
+    deadline = time.monotonic() + timeout
+    while not check():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def workers(settings):
+    """Dos ``TieredRedisCache`` sobre el Redis de ``REDIS_URL``, como dos workers."""
+    params = {
+        "KEY_PREFIX": f"test-{uuid.uuid4().hex}",
+        "OPTIONS": {
+            "SOCKET_CONNECT_TIMEOUT": 0.5,
+            "L1_TTL": 60,
+            "L1_KEY_PREFIXES": ["hot:"],
+        },
+    }
+    tiers = [TieredRedisCache(settings.REDIS_URL, params) for _ in range(2)]
+    try:
+        tiers[0].client.get_client().ping()
+    except (RedisError, OSError):
+        pytest.skip("Redis no disponible en REDIS_URL")
+    for tier in tiers:
+        tier.get("hot:warmup")
+        assert tier._subscribed.wait(2)  # noqa: SLF001
+    yield tiers
+    tiers[0].delete_pattern("*")
+    for tier in tiers:
+        tier.stop_listener()
+
+
+class TestTieredRedisCache:
+    def test_reads_fill_the_l1(self, workers):
+        first, _ = workers
+        first.set("hot:config", {"name": "geoqr"})
+        assert first.get("hot:config") == {"name": "geoqr"}
+        assert first.get("hot:config") == {"name": "geoqr"}
+        stats = first.tier_stats()
+        assert stats["l1"]["hits"] == 1
+        assert stats["l2"]["hits"] == 1
+
+    def test_values_are_copies(self, workers):
+        first, _ = workers
+        first.set("hot:config", {"name": "geoqr"})
+        first.get("hot:config")["name"] = "cambiado"
+        assert first.get("hot:config") == {"name": "geoqr"}
+
+    def test_writes_invalidate_other_workers(self, workers):
+        first, second = workers
+        first.set("hot:config", "v1")
+        assert second.get("hot:config") == "v1"
+        first.set("hot:config", "v2")
+        assert eventually(lambda: second.get("hot:config") == "v2")
+        first.delete("hot:config")
+        assert eventually(lambda: second.get("hot:config") is None)
+        assert second.tier_stats()["invalidations"]["received"] == 3  # noqa: PLR2004
+
+    def test_invalidation_during_a_read(self, workers, monkeypatch):
+        _, second = workers
+        second.set("hot:config", "v1")
+        fetch = second.client.get
+        message = {"keys": [second.make_key("hot:config")], "sender": "otro"}
+
+        def racing_get(*args, **kwargs):
+            value = fetch(*args, **kwargs)
+            second._receive(json.dumps(message))  # noqa: SLF001
+            return value
+
+        monkeypatch.setattr(second.client, "get", racing_get)
+        assert second.get("hot:config") == "v1"
+        assert second.tier_stats()["l1"]["size"] == 0
+
+    def test_incr_invalidates(self, workers):
+        first, second = workers
+        first.set("hot:counter", 1)
+        assert second.get("hot:counter") == 1
+        first.incr("hot:counter")
+        assert eventually(lambda: second.get("hot:counter") == 2)  # noqa: PLR2004
+
+    def test_keys_outside_the_prefixes(self, workers):
+        first, _ = workers
+        first.set("cold:job", "pending")
+        first.get("cold:job")
+        first.get("cold:job")
+        stats = first.tier_stats()
+        assert stats["l1"]["size"] == 0
+        assert stats["l2"]["hits"] == 2  # noqa: PLR2004
+
+    def test_get_many(self, workers):
+        first, _ = workers
+        first.set_many({"hot:a": 1, "hot:b": 2, "cold:c": 3})
+        first.get("hot:a")
+        assert first.get_many(["hot:a", "hot:b", "cold:c", "hot:x"]) == {
+            "hot:a": 1,
+            "hot:b": 2,
+            "cold:c": 3,
+        }
+        assert first.tier_stats()["l1"]["hits"] == 1
+
+    def test_without_subscription(self, workers):
+        first, _ = workers
+        first.stop_listener()
+        first.set("hot:config", "v1")
+        first.get("hot:config")
+        assert first.get("hot:config") == "v1"
+        assert first.tier_stats()["l1"]["hits"] == 0
+
+    def test_shared_get_skips_the_l1(self, workers):
+        first, second = workers
+        first.set("hot:bloom", b"v1")
+        assert second.get("hot:bloom") == b"v1"
+        # Un L1 viejo (invalidación perdida) no lo ve shared_get.
+        second.l1.set(second.make_key("hot:bloom"), (False, b"viejo"))
+        assert second.get("hot:bloom") == b"viejo"
+        assert shared_get(second, "hot:bloom") == b"v1"
+        assert shared_get(second, "hot:nada", "default") == "default"
+
+
+def test_shared_get_without_l1():
+    cache = LocMemCache("shared-get", {})
+    cache.set("clave", 1)
+    assert shared_get(cache, "clave") == 1
+    assert shared_get(cache, "otra", 2) == 2  # noqa: PLR2004
+
+
+@pytest.mark.django_db
+def test_stats_view(admin_client, client):
+    response = admin_client.get(reverse("api-cache-stats"))
+    assert response.status_code == 200  # noqa: PLR2004
+    assert set(response.json()) == {"pid", "caches"}
+    assert client.get(reverse("api-cache-stats")).status_code in {401, 403}
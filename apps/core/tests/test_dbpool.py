@@ -0,0 +1,59 @@
+import pytest
+from django.db import OperationalError
+from django.db import connections
+from django.urls import reverse
+
+from apps.core.dbpool import pool_stats
+
+pytestmark = pytest.mark.django_db(transaction=True, databases=["default", "replica"])
+
+
+@pytest.fixture
+def pooled(monkeypatch):
+    # El alias "replica" de los tests es otra conexión a la base de test.
+    connection = connections["replica"]
+    connection.close()
+    monkeypatch.setitem(
+        connection.settings_dict["OPTIONS"],
+        "pool",
+        {"min_size": 0, "max_size": 1, "timeout": 0.2},
+    )
+    yield connection
+    connection.close()
+    connection.close_pool()
+
+
+class TestPoolStats:
+    def test_without_pools(self):
+        assert pool_stats() == {}
+
+    def test_checkouts(self, pooled):
+        for _ in range(3):
+            with pooled.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            pooled.close()
+        stats = pool_stats()["replica"]
+        assert stats["requests_num"] == 3  # noqa: PLR2004
+        assert stats["connections_num"] == 1
+        assert stats["pool_size"] == stats["pool_available"] == 1
+        assert stats["requests_errors"] == 0
+
+    def test_exhaustion(self, pooled):
+        pooled.pool.open()
+        with pooled.pool.connection(), pytest.raises(OperationalError):
+            pooled.ensure_connection()
+        stats = pool_stats()["replica"]
+        assert stats["requests_errors"] == 1
+        assert stats["requests_queued"] >= 1
+        assert stats["requests_wait_ms_avg"] > 0
+
+
+class TestPoolStatsView:
+    def test_staff(self, admin_client, pooled):
+        response = admin_client.get(reverse("api-db-pool"))
+        assert response.status_code == 200  # noqa: PLR2004
+        assert set(response.json()) == {"pid", "pools"}
+        assert "replica" in response.json()["pools"]
+
+    def test_others(self, client):
+        assert client.get(reverse("api-db-pool")).status_code in {401, 403}
@@ -0,0 +1,106 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.template import RequestContext
+from django.template import TemplateSyntaxError
+from django.template.loader import get_template
+from django.urls import reverse
+
+from apps.core import pages
+from apps.core.htmx import oob
+from apps.core.htmx import render_blocks
+
+pytestmark = pytest.mark.django_db
+
+PARTIAL = {"HX-Request": "true", "HX-Target": "main-content"}
+
+
+@pytest.fixture(autouse=True)
+def _empty_page_cache(settings):
+    settings.PAGE_CACHE_TIMEOUT = 60
+    cache.clear()
+    pages.clear_local()
+
+
+@pytest.fixture
+def logged_in(client, user):
+    client.force_login(user)
+    return client
+
+
+def get(client, name="geo", **headers):
+    response = client.get(reverse(name), headers=headers)
+    assert response.status_code == HTTPStatus.OK
+    return response
+
+
+class TestOob:
+    def test_marks_first_element(self):
+        html = "\n<!-- nav -->\n<nav id='bottom-nav'><a>x</a></nav>"
+        assert oob(html) == (
+            "\n<!-- nav -->\n<nav hx-swap-oob=\"true\" id='bottom-nav'><a>x</a></nav>"
+        )
+        assert 'hx-swap-oob="innerHTML:#a"' in oob("<div>", "innerHTML:#a")
+
+    def test_without_elements(self):
+        assert oob("\n  ") == "\n  "
+
+
+class TestRenderBlocks:
+    def test_renders_child_blocks(self, rf, user):
+        request = rf.get("/")
+        request.user = user
+        template = get_template("pages/geo.html").template
+        main, nav = render_blocks(
+            template,
+            ("main_content", "bottom_nav"),
+            RequestContext(request),
+        )
+        assert main.strip().startswith('<div id="main-content"')
+        assert 'id="map-container"' in main
+        assert 'id="bottom-nav"' in nav
+
+    def test_missing_block(self, rf):
+        template = get_template("pages/geo.html").template
+        with pytest.raises(TemplateSyntaxError):
+            render_blocks(template, ("sidebar",), RequestContext(rf.get("/")))
+
+
+class TestPartialPages:
+    def test_htmx_gets_only_the_target_and_oob_nav(self, logged_in, user):
+        full = get(logged_in)
+        partial = get(logged_in, **PARTIAL)
+        content = partial.content.decode()
+        assert content.lstrip().startswith('<div id="main-content"')
+        assert '<nav hx-swap-oob="true" id="bottom-nav"' in content
+        assert "<html" not in content
+        assert user.email not in content
+        assert len(partial.content) < len(full.content)
+        assert "HX-Target" in partial["Vary"]
+        assert "HX-History-Restore-Request" in partial["Vary"]
+
+    def test_partial_is_cached_apart_from_the_page(self, logged_in):
+        assert "miss" in get(logged_in)["Server-Timing"]
+        assert "miss" in get(logged_in, **PARTIAL)["Server-Timing"]
+        response = get(logged_in, "qr", **PARTIAL)
+        assert 'name="csrfmiddlewaretoken"' in response.content.decode()
+        assert "hit" in get(logged_in, **PARTIAL)["Server-Timing"]
+
+    @pytest.mark.parametrize(
+        "headers",
+        [
+            {"HX-Request": "true", "HX-Target": "modal"},
+            {**PARTIAL, "HX-History-Restore-Request": "true"},
+        ],
+    )
+    def test_full_page_otherwise(self, logged_in, headers):
+        assert "<html" in get(logged_in, **headers).content.decode()
+
+    def test_without_page_cache(self, logged_in, settings):
+        settings.PAGE_CACHE_TIMEOUT = 0
+        response = get(logged_in, "qr", **PARTIAL)
+        content = response.content.decode()
+        assert "<html" not in content
+        assert 'name="csrfmiddlewaretoken"' in content
+        assert "<!--uncached:" not in content
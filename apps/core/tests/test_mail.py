@@ -0,0 +1,178 @@
+import pickle
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail import get_connection
+from django.core.mail.backends.locmem import EmailBackend as LocmemBackend
+
+from apps.core.mail import DEAD_KEY
+from apps.core.mail import RETRY_KEY
+from apps.core.mail import MailQueue
+from apps.core.mail import MailSender
+from apps.core.mail import QueuedMessage
+
+LOCMEM = "django.core.mail.backends.locmem.EmailBackend"
+
+
+class FakeQueue:
+    """Cola en memoria con la interfaz que usa ``MailSender``."""
+
+    consumer = "test"
+
+    def __init__(self, messages, max_attempts=3):
+        self.pending = [
+            QueuedMessage(str(i).encode(), m, 0) for i, m in enumerate(messages)
+        ]
+        self.max_attempts = max_attempts
+        self.acked = []
+        self.retried = []
+
+    def release_due(self):
+        return 0
+
+    def read(self, count, block_ms=None):
+        batch, self.pending = self.pending[:count], self.pending[count:]
+        return batch
+
+    def ack(self, entry_id):
+        self.acked.append(entry_id)
+
+    def retry(self, queued, error):
+        self.retried.append((queued.entry_id, error))
+        return queued.attempts + 1 < self.max_attempts
+
+
+def message(i=0):
+    return EmailMessage("Asunto", "Cuerpo", to=[f"user{i}@example.com"])
+
+
+class TestQueuedEmailBackend:
+    def test_enqueues_instead_of_sending(self):
+        queue = MagicMock()
+        with patch("apps.core.mail.get_mail_queue", return_value=queue):
+            connection = get_connection("apps.core.mail.QueuedEmailBackend")
+            sent = connection.send_messages([message(1), message(2)])
+        assert sent == 2  # noqa: PLR2004
+        queue.enqueue.assert_called_once()
+        assert not mail.outbox
+
+    def test_fail_silently(self):
+        queue = MagicMock()
+        queue.enqueue.side_effect = ConnectionError
+        with patch("apps.core.mail.get_mail_queue", return_value=queue):
+            connection = get_connection(
+                "apps.core.mail.QueuedEmailBackend",
+                fail_silently=True,
+            )
+            assert connection.send_messages([message()]) == 0
+            connection = get_connection("apps.core.mail.QueuedEmailBackend")
+            with pytest.raises(ConnectionError):
+                connection.send_messages([message()])
+
+    @pytest.mark.django_db
+    def test_enqueues_on_commit(self, django_capture_on_commit_callbacks):
+        queue = MagicMock()
+        with patch("apps.core.mail.get_mail_queue", return_value=queue):
+            with django_capture_on_commit_callbacks() as callbacks:
+                connection = get_connection("apps.core.mail.QueuedEmailBackend")
+                assert connection.send_messages([message()]) == 1
+            # Un rollback descarta los callbacks: el mail nunca se encola.
+            queue.enqueue.assert_not_called()
+            for callback in callbacks:
+                callback()
+        queue.enqueue.assert_called_once()
+
+    @pytest.mark.django_db
+    def test_failure_after_commit_is_logged(
+        self,
+        django_capture_on_commit_callbacks,
+        caplog,
+    ):
+        queue = MagicMock()
+        queue.enqueue.side_effect = ConnectionError
+        with (
+            patch("apps.core.mail.get_mail_queue", return_value=queue),
+            django_capture_on_commit_callbacks(execute=True),
+        ):
+            connection = get_connection("apps.core.mail.QueuedEmailBackend")
+            assert connection.send_messages([message()]) == 1
+        queue.enqueue.assert_called_once()
+        assert "No se pudieron encolar 1 emails" in caplog.text
+
+    def test_serialized_message_drops_connection(self):
+        original = message()
+        original.connection = get_connection(LOCMEM)
+        restored = pickle.loads(MailQueue.dumps(original))  # noqa: S301
+        assert restored.connection is None
+        assert restored.to == original.to
+        assert original.connection is not None
+
+
+class TestMailQueue:
+    def test_retry_backs_off_exponentially(self):
+        redis = MagicMock()
+        queue = MailQueue(redis, max_attempts=5, retry_delay=10)
+        with patch("apps.core.mail.time.time", return_value=1000):
+            assert queue.retry(QueuedMessage(b"1-0", message(), 2), "boom")
+        pipe = redis.pipeline.return_value
+        key, mapping = pipe.zadd.call_args.args
+        assert key == RETRY_KEY
+        assert list(mapping.values()) == [1000 + 10 * 4]
+        _, attempts, _ = pickle.loads(next(iter(mapping)))  # noqa: S301
+        assert attempts == 3  # noqa: PLR2004
+        pipe.xack.assert_called_once()
+
+    def test_last_attempt_goes_to_dead_letter(self):
+        redis = MagicMock()
+        queue = MailQueue(redis, max_attempts=3)
+        assert not queue.retry(QueuedMessage(b"1-0", message(), 2), "boom")
+        pipe = redis.pipeline.return_value
+        assert pipe.xadd.call_args.args[0] == DEAD_KEY
+        pipe.zadd.assert_not_called()
+
+    def test_release_due_requeues_once(self):
+        redis = MagicMock()
+        member = pickle.dumps(("id", 1, b"payload"))
+        redis.zrangebyscore.return_value = [member, member]
+        # Otro sender se llevó el segundo.
+        redis.zrem.side_effect = [1, 0]
+        assert MailQueue(redis).release_due() == 1
+        fields = redis.pipeline.return_value.xadd.call_args.args[1]
+        assert fields == {"message": b"payload", "attempts": 1}
+
+
+class TestMailSender:
+    def test_sends_batches_over_one_connection(self):
+        queue = FakeQueue([message(i) for i in range(5)])
+        sender = MailSender(queue, LOCMEM, batch_size=2)
+        assert sender.drain() == 5  # noqa: PLR2004
+        assert len(mail.outbox) == 5  # noqa: PLR2004
+        assert queue.acked == [b"0", b"1", b"2", b"3", b"4"]
+        assert sender.stats.sent == 5  # noqa: PLR2004
+        assert sender.stats.connections == 1
+        assert sender.connection is None
+
+    def test_failures_are_retried_and_reconnect(self):
+        queue = FakeQueue([message(i) for i in range(3)])
+        sender = MailSender(queue, LOCMEM, batch_size=10)
+        original = LocmemBackend.send_messages
+        calls = 0
+
+        def flaky(self, messages):
+            nonlocal calls
+            calls += 1
+            if calls == 2:  # noqa: PLR2004
+                msg = "connection reset"
+                raise OSError(msg)
+            return original(self, messages)
+
+        with patch.object(LocmemBackend, "send_messages", flaky):
+            sender.send_batch()
+        assert queue.acked == [b"0", b"2"]
+        assert queue.retried == [(b"1", "OSError('connection reset')")]
+        assert sender.stats.retried == 1
+        # La conexión se rehace después del fallo.
+        assert sender.stats.connections == 2  # noqa: PLR2004
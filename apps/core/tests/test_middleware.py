@@ -0,0 +1,233 @@
+import gzip
+from unittest.mock import patch
+
+import brotli
+import pytest
+from asgiref.sync import SyncToAsync
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore
+from django.core.handlers.asgi import ASGIHandler
+from django.http import HttpResponse
+from django.http import JsonResponse
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory
+
+from apps.core import middleware
+from apps.core.compression import negotiate
+from apps.core.middleware import AsyncWhiteNoiseMiddleware
+from apps.core.middleware import CompressionMiddleware
+from apps.core.middleware import ThrottledSessionMiddleware
+
+pytestmark = pytest.mark.django_db
+
+DAY = 24 * 60 * 60
+
+
+def touch_session(request):
+    request.session.get("user")
+    return HttpResponse()
+
+
+def ignore_session(request):
+    return HttpResponse()
+
+
+def write_session(request):
+    request.session["cart"] = 1
+    return HttpResponse()
+
+
+class Client:
+    """Envía requests por el middleware reutilizando la cookie de sesión."""
+
+    def __init__(self, view=touch_session):
+        self.middleware = ThrottledSessionMiddleware(view)
+        self.session_key = None
+
+    def get(self, view=None):
+        if view is not None:
+            self.middleware.get_response = view
+        request = RequestFactory().get("/")
+        if self.session_key:
+            request.COOKIES[settings.SESSION_COOKIE_NAME] = self.session_key
+        response = self.middleware(request)
+        if settings.SESSION_COOKIE_NAME in response.cookies:
+            self.session_key = response.cookies[settings.SESSION_COOKIE_NAME].value
+        return response
+
+
+@pytest.fixture
+def clock():
+    with patch.object(middleware.time, "time", return_value=1_000_000.0) as mock:
+        yield mock
+
+
+@pytest.fixture
+def saves():
+    with patch.object(
+        SessionStore,
+        "save",
+        autospec=True,
+        side_effect=SessionStore.save,
+    ) as mock:
+        yield mock
+
+
+@pytest.fixture
+def client(clock, saves) -> Client:
+    client = Client()
+    client.get(write_session)
+    saves.reset_mock()
+    return client
+
+
+class TestThrottledSessionMiddleware:
+    def test_no_save_within_fraction(self, client, clock, saves, settings):
+        settings.SESSION_COOKIE_AGE = 10 * DAY
+        settings.SESSION_REFRESH_FRACTION = 0.1
+        for _ in range(20):
+            clock.return_value += 60 * 60
+            response = client.get(touch_session)
+            assert settings.SESSION_COOKIE_NAME not in response.cookies
+        assert saves.call_count == 0
+
+    def test_saves_when_expiry_moves_more_than_fraction(
+        self,
+        client,
+        clock,
+        saves,
+        settings,
+    ):
+        settings.SESSION_COOKIE_AGE = 10 * DAY
+        settings.SESSION_REFRESH_FRACTION = 0.1
+        clock.return_value += DAY
+        response = client.get(touch_session)
+        assert saves.call_count == 1
+        assert response.cookies[settings.SESSION_COOKIE_NAME]["max-age"] == 10 * DAY
+
+    def test_saves_modified_session(self, client, saves):
+        client.get(write_session)
+        assert saves.call_count == 1
+
+    def test_untouched_session_is_not_loaded(self, client, clock, saves):
+        clock.return_value += 30 * DAY
+        with patch.object(SessionStore, "load", autospec=True) as load:
+            client.get(ignore_session)
+        load.assert_not_called()
+        assert saves.call_count == 0
+
+    def test_anonymous_request_creates_no_session(self, clock, saves):
+        response = Client().get(touch_session)
+        assert settings.SESSION_COOKIE_NAME not in response.cookies
+        assert saves.call_count == 0
+
+
+class TestAsyncWhiteNoiseMiddleware:
+    def test_chain_stays_async_under_asgi(self):
+        chain = ASGIHandler()._middleware_chain  # noqa: SLF001
+        # Con un middleware sync, la cadena entera quedaría en sync_to_async.
+        assert not isinstance(chain, SyncToAsync)
+
+    def test_serves_static_files_and_passes_through(self, tmp_path):
+        static = tmp_path / "app.js"
+        static.write_text("console.log(1)")
+
+        async def view(request):
+            return HttpResponse("view")
+
+        mw = AsyncWhiteNoiseMiddleware(view)
+        mw.add_file_to_dictionary("/static/app.js", str(static))
+        factory = RequestFactory()
+
+        response = async_to_sync(mw)(factory.get("/static/app.js"))
+        assert b"".join(response.streaming_content) == b"console.log(1)"
+        assert async_to_sync(mw)(factory.get("/other/")).content == b"view"
+
+    def test_sync_mode(self):
+        mw = AsyncWhiteNoiseMiddleware(lambda request: HttpResponse("view"))
+        assert mw(RequestFactory().get("/other/")).content == b"view"
+
+
+PAGE = "<p>GeoQR</p>\n" * 200
+
+
+def compressed(view, accept_encoding="br, gzip"):
+    request = RequestFactory().get("/", headers={"Accept-Encoding": accept_encoding})
+    mw = CompressionMiddleware(view)
+    if mw.async_mode:
+        return async_to_sync(mw)(request)
+    return mw(request)
+
+
+class TestCompressionMiddleware:
+    @pytest.mark.parametrize(
+        ("accept_encoding", "expected"),
+        [
+            ("gzip, deflate, br, zstd", "br"),
+            ("gzip", "gzip"),
+            ("br;q=0.5, gzip", "gzip"),
+            ("br;q=0, *", "gzip"),
+            ("identity", None),
+            ("", None),
+        ],
+    )
+    def test_negotiate(self, accept_encoding, expected):
+        assert negotiate(accept_encoding) == expected
+
+    def test_brotli_and_gzip(self):
+        response = compressed(lambda request: HttpResponse(PAGE))
+        assert response["Content-Encoding"] == "br"
+        assert response["Vary"] == "Accept-Encoding"
+        assert int(response["Content-Length"]) == len(response.content)
+        assert brotli.decompress(response.content).decode() == PAGE
+
+        response = compressed(
+            lambda request: HttpResponse(PAGE, headers={"ETag": '"v1"'}),
+            "gzip",
+        )
+        assert response["Content-Encoding"] == "gzip"
+        assert response["ETag"] == 'W/"v1"'
+        assert gzip.decompress(response.content).decode() == PAGE
+
+    @pytest.mark.parametrize(
+        "response",
+        [
+            HttpResponse("<p>corto</p>"),
+            HttpResponse(PAGE, content_type="image/png"),
+            HttpResponse(PAGE, headers={"Content-Encoding": "br"}),
+        ],
+    )
+    def test_skipped(self, response):
+        assert compressed(lambda request: response).content == response.content
+        assert not response.has_header("Vary")
+
+    def test_not_accepted(self):
+        response = compressed(lambda request: JsonResponse({"a": PAGE}), "identity")
+        assert "Content-Encoding" not in response
+        assert response["Vary"] == "Accept-Encoding"
+
+    def test_streaming_is_compressed_per_chunk(self):
+        chunks = [PAGE.encode()] * 3
+
+        response = compressed(lambda request: StreamingHttpResponse(iter(chunks)))
+        parts = list(response.streaming_content)
+        assert "Content-Length" not in response
+        assert len(parts) == len(chunks) + 1
+        assert brotli.decompress(b"".join(parts)) == b"".join(chunks)
+
+        async def view(request):
+            async def content():
+                for chunk in chunks:
+                    yield chunk
+
+            return StreamingHttpResponse(content())
+
+        response = compressed(view, "gzip")
+        assert response.is_async
+
+        async def consume():
+            return [part async for part in response.streaming_content]
+
+        body = b"".join(async_to_sync(consume)())
+        assert gzip.decompress(body) == b"".join(chunks)
@@ -0,0 +1,103 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.contrib import messages
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import _unmask_cipher_token
+from django.template import Context
+from django.template import Template
+from django.template.response import TemplateResponse
+from django.test import Client
+from django.urls import reverse
+
+from apps.core import pages
+from apps.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _empty_page_cache(settings):
+    settings.PAGE_CACHE_TIMEOUT = 60
+    cache.clear()
+    pages.clear_local()
+
+
+def get(client, name="push", **headers):
+    response = client.get(reverse(name), headers=headers)
+    assert response.status_code == HTTPStatus.OK
+    return response
+
+
+def page_cache(response) -> str:
+    return response["Server-Timing"].split('"')[1]
+
+
+class TestUncachedTag:
+    def test_renders_normally_outside_the_page_cache(self):
+        template = Template(
+            '{% load page_cache %}a{% uncached "x" %}{{ v }}{% enduncached %}',
+        )
+        assert template.render(Context({"v": "b"})) == "ab"
+        captured = template.render(Context({"v": "b", pages.CAPTURING: True}))
+        assert captured == "a<!--uncached:x-->"
+
+
+class TestCachedPages:
+    def test_shell_is_shared_but_greeting_is_per_user(self, client, user):
+        client.force_login(user)
+        first = get(client)
+        assert page_cache(first) == "miss"
+        assert f"Hola, {user.email}" in first.content.decode()
+
+        other = UserFactory()
+        client.force_login(other)
+        second = get(client)
+        assert page_cache(second) == "hit"
+        content = second.content.decode()
+        assert f"Hola, {other.email}" in content
+        assert user.email not in content
+        assert "<!--uncached:" not in content
+
+    def test_csrf_token_is_rendered_per_request(self, client, user):
+        client.force_login(user)
+        get(client)
+        other = Client()
+        other.force_login(UserFactory())
+        response = get(other)
+        assert page_cache(response) == "hit"
+        token = re.search(
+            r'name="csrfmiddlewaretoken" value="(\w+)"',
+            response.content.decode(),
+        )[1]
+        assert _unmask_cipher_token(token) == other.cookies["csrftoken"].value
+        assert other.cookies["csrftoken"].value != client.cookies["csrftoken"].value
+
+    def test_messages_are_not_cached(self, client, user, rf):
+        client.force_login(user)
+        get(client, "qr")
+        storage = CookieStorage(rf.get("/"))
+        storage.add(messages.SUCCESS, "Guardado")
+        storage.update(response := HttpResponse())
+        client.cookies.update(response.cookies)
+        assert "Guardado" in get(client, "qr").content.decode()
+        assert "Guardado" not in get(client, "qr").content.decode()
+
+    def test_varies_by_language_and_page(self, client, user):
+        client.force_login(user)
+        english = get(client, accept_language="en")
+        spanish = get(client, accept_language="es")
+        assert page_cache(spanish) == "miss"
+        assert english.content != spanish.content
+        assert page_cache(get(client, "geo")) == "miss"
+        assert page_cache(get(client, accept_language="es")) == "hit"
+
+    def test_disabled(self, client, user, settings):
+        settings.PAGE_CACHE_TIMEOUT = 0
+        client.force_login(user)
+        response = get(client)
+        assert isinstance(response, TemplateResponse)
+        assert "Server-Timing" not in response
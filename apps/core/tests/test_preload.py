@@ -0,0 +1,192 @@
+import socket
+import threading
+import time
+
+import pytest
+import uvicorn
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+from uvicorn.protocols.http.httptools_impl import RequestResponseCycle
+
+from apps.core import preload
+from apps.core.middleware import PreloadMiddleware
+from apps.core.preload import EarlyHints
+from apps.core.preload import critical_links
+from config import early_hints
+from config.early_hints import EarlyHintsHttpToolsProtocol
+
+HEAD = """<!DOCTYPE html><html><head>
+<link rel="icon" href="/static/icons/icon.svg" />
+<script src="https://cdn.jsdelivr.net/npm/htmx.org" crossorigin="anonymous"></script>
+<script defer src="https://cdn.jsdelivr.net/npm/alpinejs"></script>
+<link href="/static/CACHE/css/output.1a2b.css" rel="stylesheet" />
+<script src="/static/app.3c4d.js"></script>
+<script src="/static/app.3c4d.js"></script>
+<script>inline()</script>
+</head><body><script src="/static/late.js"></script></body></html>"""
+LINKS = (
+    "<https://cdn.jsdelivr.net>; rel=preconnect; crossorigin",
+    "<https://cdn.jsdelivr.net>; rel=preconnect",
+    "</static/CACHE/css/output.1a2b.css>; rel=preload; as=style",
+    "</static/app.3c4d.js>; rel=preload; as=script",
+)
+
+
+@pytest.fixture(autouse=True)
+def _forget_links():
+    preload.clear()
+
+
+def test_critical_links():
+    assert critical_links(HEAD) == LINKS
+
+
+class TestPreloadMiddleware:
+    def test_adds_and_remembers_links(self):
+        mw = PreloadMiddleware(lambda request: HttpResponse(HEAD))
+        response = mw(RequestFactory().get("/page/"))
+        assert response["Link"] == ", ".join(LINKS)
+        assert preload.links_for("/page/") == LINKS
+
+    @pytest.mark.parametrize(
+        ("response", "headers"),
+        [
+            (HttpResponse(HEAD, content_type="application/json"), {}),
+            (HttpResponse(HEAD, status=404), {}),
+            (HttpResponse(HEAD), {"HX-Request": "true"}),
+        ],
+    )
+    def test_skips(self, response, headers):
+        mw = PreloadMiddleware(lambda request: response)
+        assert "Link" not in mw(RequestFactory().get("/page/", headers=headers))
+        assert preload.links_for("/page/") is None
+
+    @pytest.mark.django_db
+    def test_page(self, client, user):
+        client.force_login(user)
+        link = client.get(reverse("qr"))["Link"]
+        assert "rel=preload; as=style" in link
+        assert "<https://cdn.tailwindcss.com>; rel=preconnect" in link
+
+
+async def page(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def scope(path="/page/", accept=b"text/html", *, extension=preload.EARLY_HINT):
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "headers": [(b"accept", accept)],
+        "extensions": {extension: {}} if extension else {},
+    }
+
+
+def call(scope) -> list[dict]:
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async_to_sync(EarlyHints(page))(scope, None, send)
+    return sent
+
+
+class TestEarlyHints:
+    def test_sends_known_links_first(self):
+        preload.remember("/page/", LINKS)
+        first, start, _ = call(scope())
+        assert first == {
+            "type": preload.EARLY_HINT,
+            "links": [link.encode() for link in LINKS],
+        }
+        assert start["status"] == 200  # noqa: PLR2004
+
+    def test_prefers_the_informational_extension(self):
+        preload.remember("/page/", LINKS)
+        first, _, _ = call(scope(extension=preload.INFORMATIONAL))
+        assert first == {
+            "type": preload.INFORMATIONAL,
+            "status": 103,
+            "headers": [(b"link", link.encode()) for link in LINKS],
+        }
+
+    @pytest.mark.parametrize(
+        "request_scope",
+        [
+            scope(path="/other/"),
+            scope(accept=b"*/*"),
+            scope(extension=None),
+        ],
+    )
+    def test_only_for_known_page_navigations(self, request_scope):
+        preload.remember("/page/", LINKS)
+        assert [m["type"] for m in call(request_scope)] == [
+            "http.response.start",
+            "http.response.body",
+        ]
+
+
+def test_early_hints_fall_back_without_uvicorn_internals(monkeypatch):
+    assert early_hints.supported()
+    monkeypatch.delattr(RequestResponseCycle, "send")
+    assert not early_hints.supported()
+    assert early_hints.http_protocol() == "httptools"
+    monkeypatch.undo()
+    assert early_hints.http_protocol() == (
+        "config.early_hints:EarlyHintsHttpToolsProtocol"
+    )
+
+
+def get_from_uvicorn(path):
+    config = uvicorn.Config(
+        EarlyHints(page),
+        port=0,
+        http=EarlyHintsHttpToolsProtocol,
+        lifespan="off",
+        log_level="warning",
+    )
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        with socket.create_connection(("127.0.0.1", port)) as conn:
+            conn.sendall(
+                b"GET " + path + b" HTTP/1.1\r\nHost: test\r\nAccept: text/html\r\n"
+                b"Connection: close\r\n\r\n",
+            )
+            data = b""
+            while chunk := conn.recv(4096):
+                data += chunk
+    finally:
+        server.should_exit = True
+        thread.join()
+    return data
+
+
+def test_uvicorn_writes_103_before_the_response():
+    preload.remember("/page/", LINKS[2:])
+    data = get_from_uvicorn(b"/page/")
+    hints, response = data.split(b"\r\n\r\n", 1)
+    assert hints.splitlines() == [
+        b"HTTP/1.1 103 Early Hints",
+        *(b"link: " + link.encode() for link in LINKS[2:]),
+    ]
+    assert response.startswith(b"HTTP/1.1 200 OK")
+    assert b"\r\nok\r\n" in response
+
+
+def test_uvicorn_cycle_without_the_expected_attributes(monkeypatch):
+    # Neither swapped nor advertised: the page is served without hints.
+    monkeypatch.setattr(early_hints, "CYCLE_ATTRIBUTES", ("missing",))
+    preload.remember("/page/", LINKS[2:])
+    data = get_from_uvicorn(b"/page/")
+    assert data.startswith(b"HTTP/1.1 200 OK")
+    assert b"\r\nok\r\n" in data
@@ -0,0 +1,76 @@
+from unittest.mock import patch
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+
+from apps.core.ratelimit import SlidingWindowLimiter
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def clock():
+    with patch("apps.core.ratelimit.time.time", return_value=6000.0) as mocked:
+        yield mocked
+
+
+class TestSlidingWindowLimiter:
+    def test_hits_up_to_limit(self, clock):
+        limiter = SlidingWindowLimiter("test", limit=3, window=60)
+        assert [limiter.hit("a").allowed for _ in range(4)] == [
+            True,
+            True,
+            True,
+            False,
+        ]
+        assert limiter.hit("b").allowed
+
+    def test_retry_after_until_window_ends(self, clock):
+        limiter = SlidingWindowLimiter("test", limit=1, window=60)
+        clock.return_value = 6015.0
+        limiter.hit("a")
+        assert limiter.hit("a").retry_after == 45  # noqa: PLR2004
+
+    def test_peek_does_not_count(self, clock):
+        limiter = SlidingWindowLimiter("test", limit=1, window=60)
+        assert limiter.peek("a").allowed
+        assert limiter.peek("a").allowed
+        limiter.hit("a")
+        assert not limiter.peek("a").allowed
+
+    def test_previous_window_weighs_in_proportionally(self, clock):
+        limiter = SlidingWindowLimiter("test", limit=4, window=60)
+        for _ in range(4):
+            limiter.hit("a")
+        # A quarter into the next window, 3/4 of the previous 4 still count.
+        clock.return_value = 6075.0
+        assert limiter.peek("a").count == 4  # noqa: PLR2004
+        assert limiter.hit("a").allowed
+        assert not limiter.hit("a").allowed
+        clock.return_value = 6110.0
+        assert limiter.hit("a").allowed
+
+    def test_async_api(self, clock):
+        limiter = SlidingWindowLimiter("test", limit=1, window=60)
+        assert async_to_sync(limiter.ahit)("a").allowed
+        assert not async_to_sync(limiter.apeek)("a").allowed
+        assert not async_to_sync(limiter.ahit)("a").allowed
+
+    def test_fails_open_without_cache(self, clock):
+        # django-redis with IGNORE_EXCEPTIONS returns None when Redis is down.
+        limiter = SlidingWindowLimiter("test", limit=1, window=60)
+        with (
+            patch.object(cache, "add", return_value=None),
+            patch.object(cache, "incr", return_value=None),
+            patch.object(cache, "get", return_value=None),
+            patch.object(cache, "get_many", return_value=None),
+        ):
+            assert limiter.hit("a").allowed
+            assert limiter.hit("a").allowed
+            assert limiter.peek("a").allowed
@@ -0,0 +1,141 @@
+import pytest
+from django.contrib.sites.models import Site
+from django.db import DEFAULT_DB_ALIAS
+from django.db import DatabaseError
+from django.http import HttpResponse
+from django.urls import path
+
+from apps.core import replicas
+from apps.core.replicas import PIN_COOKIE
+from apps.core.replicas import ReplicaRouter
+from apps.core.replicas import reading
+from apps.core.replicas import replica_lag
+from apps.core.replicas import routing
+from apps.core.transactions import READ_ONLY
+from apps.core.transactions import WRITE
+from apps.core.transactions import transaction_policy
+
+
+@transaction_policy(READ_ONLY)
+def read(request):
+    return HttpResponse(Site.objects.get(pk=1)._state.db)  # noqa: SLF001
+
+
+@transaction_policy(WRITE)
+def write(request):
+    Site.objects.filter(pk=1).update(name="escrito")
+    return HttpResponse(Site.objects.get(pk=1)._state.db)  # noqa: SLF001
+
+
+urlpatterns = [
+    path("read/", read),
+    path("write/", write),
+]
+
+
+@pytest.fixture(autouse=True)
+def _replicas(settings):
+    settings.DATABASE_REPLICAS = ["replica"]
+    replicas._lag.clear()  # noqa: SLF001
+    yield
+    replicas._lag.clear()  # noqa: SLF001
+
+
+def lag_of(monkeypatch, lag):
+    def measure(alias):
+        if isinstance(lag, Exception):
+            raise lag
+        return lag
+
+    monkeypatch.setattr(replicas, "_measure_lag", measure)
+
+
+class TestRouter:
+    def read_alias(self):
+        return ReplicaRouter().db_for_read(Site)
+
+    def test_outside_requests(self):
+        assert self.read_alias() is None
+        with reading():
+            assert self.read_alias() is None
+
+    def test_read_only_section(self, monkeypatch):
+        lag_of(monkeypatch, 0.0)
+        with routing():
+            assert self.read_alias() is None
+            with reading():
+                assert self.read_alias() == "replica"
+
+    @pytest.mark.parametrize(
+        "lag",
+        [5.0, None, DatabaseError("sin conexión")],
+        ids=["lagging", "unknown", "down"],
+    )
+    def test_unhealthy_replica(self, monkeypatch, lag):
+        lag_of(monkeypatch, lag)
+        with routing(), reading():
+            assert self.read_alias() == "default"
+
+    def test_lag_is_checked_once_per_interval(self, monkeypatch):
+        lag_of(monkeypatch, 0.0)
+        assert replica_lag("replica") == 0.0
+        lag_of(monkeypatch, 5.0)
+        assert replica_lag("replica") == 0.0
+
+    def test_pinned(self, monkeypatch):
+        lag_of(monkeypatch, 0.0)
+        with routing(pinned=True), reading():
+            assert self.read_alias() is None
+
+    def test_reads_after_a_write(self, monkeypatch):
+        lag_of(monkeypatch, 0.0)
+        with routing() as state, reading():
+            assert ReplicaRouter().db_for_write(Site) == DEFAULT_DB_ALIAS
+            assert state.wrote
+            assert self.read_alias() is None
+
+    @pytest.mark.django_db
+    def test_inside_an_outer_transaction(self, monkeypatch):
+        lag_of(monkeypatch, 0.0)
+        with routing(), reading():
+            assert self.read_alias() is None
+
+    def test_migrations_skip_replicas(self):
+        router = ReplicaRouter()
+        assert router.allow_migrate("replica", "sites") is False
+        assert router.allow_migrate("default", "sites") is None
+
+
+@pytest.mark.django_db(databases=["default", "replica"])
+def test_primary_lag():
+    # pg_is_in_recovery() es falso en el primario (y SQLite no tiene lag).
+    assert replica_lag("replica") == 0.0
+
+
+@pytest.mark.urls(__name__)
+@pytest.mark.django_db(transaction=True, databases=["default", "replica"])
+class TestRequests:
+    def test_reads_from_the_replica(self, client):
+        response = client.get("/read/")
+        assert response.content == b"replica"
+        assert PIN_COOKIE not in response.cookies
+
+    def test_unsafe_methods_use_the_primary(self, client):
+        assert client.post("/read/").content == b"default"
+
+    def test_pinned_after_a_write(self, client, settings):
+        settings.REPLICA_PIN_SECONDS = 7
+        response = client.post("/write/")
+        assert response.content == b"default"
+        assert response.cookies[PIN_COOKIE]["max-age"] == 7  # noqa: PLR2004
+        assert client.get("/read/").content == b"default"
+
+    def test_lagging_replica(self, client, monkeypatch):
+        lag_of(monkeypatch, 60.0)
+        assert client.get("/read/").content == b"default"
+
+    def test_without_replicas(self, client, settings):
+        settings.DATABASE_REPLICAS = []
+        response = client.post("/write/")
+        assert PIN_COOKIE not in response.cookies
+        assert client.get("/read/").content == b"default"
@@ -0,0 +1,61 @@
+from unittest.mock import patch
+
+from rest_framework import serializers
+from rest_framework.test import APIRequestFactory
+
+from apps.core.serializers import CompiledHyperlinkedIdentityField
+from apps.users.api.serializers import UserSerializer
+from apps.users.models import User
+
+
+class PlainUserSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ["name", "url"]
+        extra_kwargs = {
+            "url": {"view_name": "api:user-detail", "lookup_field": "pk"},
+        }
+
+
+def make_request(host: str = "testserver"):
+    return APIRequestFactory().get("/api/users/", HTTP_HOST=host)
+
+
+def make_users(count: int) -> list[User]:
+    return [User(pk=pk, name=f"user {pk}") for pk in range(1, count + 1)]
+
+
+class TestCompiledHyperlinkedIdentityField:
+    def test_user_serializer_uses_it(self):
+        field = UserSerializer().fields["url"]
+        assert isinstance(field, CompiledHyperlinkedIdentityField)
+
+    def test_same_output_as_drf(self):
+        users = make_users(3)
+        context = {"request": make_request()}
+        compiled = UserSerializer(users, many=True, context=context).data
+        plain = PlainUserSerializer(users, many=True, context=context).data
+        assert compiled == plain
+        assert compiled[2]["url"] == "http://testserver/api/users/3/"
+
+    def test_reverses_once_per_request(self):
+        context = {"request": make_request()}
+        serializer = UserSerializer(make_users(50), many=True, context=context)
+        field = serializer.child.fields["url"]
+        with patch.object(field, "reverse", wraps=field.reverse) as reverse:
+            assert len(serializer.data) == 50  # noqa: PLR2004
+        assert reverse.call_count == 1
+
+    def test_recompiles_for_another_request(self, settings):
+        settings.ALLOWED_HOSTS = ["a.test", "b.test"]
+        users = make_users(1)
+        serializer = UserSerializer(users, many=True)
+        field = serializer.child.fields["url"]
+        serializer._context = {"request": make_request("a.test")}  # noqa: SLF001
+        assert field.to_representation(users[0]) == "http://a.test/api/users/1/"
+        serializer._context = {"request": make_request("b.test")}  # noqa: SLF001
+        assert field.to_representation(users[0]) == "http://b.test/api/users/1/"
+
+    def test_unsaved_object(self):
+        context = {"request": make_request()}
+        assert UserSerializer(User(name="x"), context=context).data["url"] is None
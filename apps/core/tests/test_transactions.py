@@ -0,0 +1,128 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.sites.models import Site
+from django.db import DatabaseError
+from django.db import connection
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import path
+from django.views.generic import View
+
+from apps.core.checks import check_transaction_policies
+from apps.core.transactions import NONE
+from apps.core.transactions import READ_ONLY
+from apps.core.transactions import WRITE
+from apps.core.transactions import ReadOnlyViolation
+from apps.core.transactions import TransactionPolicyMixin
+from apps.core.transactions import transaction_policy
+
+
+def in_transaction(request):
+    return HttpResponse(str(connection.in_atomic_block))
+
+
+def view_for(policy):
+    # Como non_atomic_requests, la política se guarda en la función.
+    def view(request):
+        return in_transaction(request)
+
+    return transaction_policy(policy)(view)
+
+
+def write(request):
+    Site.objects.update(name="escrito")
+    return HttpResponse("ok")
+
+
+@transaction.non_atomic_requests
+def undeclared(request):
+    return HttpResponse("ok")
+
+
+urlpatterns = [
+    path("read/", view_for(READ_ONLY)),
+    path("write/", view_for(WRITE)),
+    path("none/", view_for(NONE)),
+    path("undeclared/", undeclared),
+]
+
+
+@pytest.mark.urls(__name__)
+@pytest.mark.django_db(transaction=True)
+class TestRequests:
+    @pytest.mark.parametrize(
+        ("url", "method", "atomic"),
+        [
+            ("/read/", "get", "False"),
+            ("/read/", "post", "True"),
+            ("/write/", "get", "True"),
+            ("/none/", "post", "False"),
+        ],
+    )
+    def test_policy(self, client, url, method, atomic):
+        assert getattr(client, method)(url).content.decode() == atomic
+
+    def test_read_only_transaction_mode(self, settings):
+        settings.TRANSACTION_READ_ONLY_MODE = "transaction"
+        view = transaction_policy(READ_ONLY)(write)
+        with pytest.raises(DatabaseError, match="read-only transaction"):
+            view(RequestFactory().get("/"))
+        assert view(RequestFactory().post("/")).status_code == 200  # noqa: PLR2004
+
+
+@pytest.mark.django_db
+class TestGuard:
+    def test_write_on_safe_method(self):
+        view = transaction_policy(READ_ONLY)(write)
+        with pytest.raises(ReadOnlyViolation):
+            view(RequestFactory().get("/"))
+
+    def test_write_on_unsafe_method(self):
+        view = transaction_policy(READ_ONLY)(write)
+        assert view(RequestFactory().post("/")).status_code == 200  # noqa: PLR2004
+
+    def test_disabled(self, settings):
+        settings.TRANSACTION_READ_ONLY_GUARD = False
+        view = transaction_policy(READ_ONLY)(write)
+        assert view(RequestFactory().get("/")).status_code == 200  # noqa: PLR2004
+
+
+class TestDeclaration:
+    def test_attributes(self):
+        read_only = view_for(READ_ONLY)
+        assert read_only.transaction_policy == READ_ONLY
+        assert read_only._non_atomic_requests == {"default"}  # noqa: SLF001
+        assert not hasattr(view_for(WRITE), "_non_atomic_requests")
+
+    def test_async_views_are_not_wrapped(self):
+        async def view(request):
+            return HttpResponse("ok")
+
+        declared = transaction_policy(READ_ONLY)(view)
+        assert declared is view
+        response = async_to_sync(declared)(RequestFactory().get("/"))
+        assert response.content == b"ok"
+
+    def test_mixin(self):
+        class PolicyView(TransactionPolicyMixin, View):
+            transaction_policy = READ_ONLY
+
+        view = PolicyView.as_view()
+        assert view.transaction_policy == READ_ONLY
+        assert view.view_class is PolicyView
+
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError, match="desconocida"):
+            transaction_policy("read-mostly")
+
+
+@pytest.mark.urls(__name__)
+def test_check_flags_undeclared_opt_outs():
+    (warning,) = check_transaction_policies(None)
+    assert warning.id == "core.W001"
+    assert warning.obj.endswith(".undeclared")
+
+
+def test_project_views_declare_their_policy():
+    assert check_transaction_policies(None) == []
@@ -0,0 +1,121 @@
+"""
+Política de transacción por vista sobre ``ATOMIC_REQUESTS``.
+
+``ATOMIC_REQUESTS`` envuelve cada vista en ``BEGIN``/``COMMIT``, aunque sólo
+lea: dos round-trips más y la conexión tomada todo el request. Cada vista
+puede declarar su política con ``transaction_policy`` (funciones) o con el
+atributo ``transaction_policy`` de ``TransactionPolicyMixin`` (clases):
+
+- ``READ_ONLY``: los métodos seguros (``GET``, ``HEAD``, ``OPTIONS``) corren
+  sin transacción, en autocommit. Con ``TRANSACTION_READ_ONLY_MODE =
+  "transaction"`` corren en una transacción ``READ ONLY`` (la base rechaza
+  las escrituras). Los demás métodos siguen en una transacción normal.
+- ``WRITE``: como sin política, una transacción por request.
+- ``NONE``: sin transacción; la vista maneja las suyas (p. ej. las vistas
+  async, que ``ATOMIC_REQUESTS`` no admite).
+
+Con ``DATABASE_REPLICAS``, las lecturas de los métodos seguros de las vistas
+``READ_ONLY`` van a una réplica (ver ``apps.core.replicas``).
+
+Con ``TRANSACTION_READ_ONLY_GUARD`` (en DEBUG y tests) una escritura en un
+método seguro de una vista ``READ_ONLY`` levanta ``ReadOnlyViolation``. El
+system check ``core.W001`` marca las vistas que salen de ``ATOMIC_REQUESTS``
+con ``non_atomic_requests`` sin declarar una política.
+
+En las vistas async sólo aplica la salida de ``ATOMIC_REQUESTS``: sus
+consultas corren en otros hilos, con otra conexión.
+"""
+
+import functools
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db import DatabaseError
+from django.db import connections
+from django.db import transaction
+
+from apps.core.replicas import reading
+
+READ_ONLY = "read-only"
+WRITE = "write"
+NONE = "none"
+POLICIES = (READ_ONLY, WRITE, NONE)
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+WRITE_STATEMENTS = (
+    "insert",
+    "update",
+    "delete",
+    "merge",
+    "truncate",
+    "create",
+    "alter",
+    "drop",
+)
+
+
+class ReadOnlyViolation(DatabaseError):  # noqa: N818
+    """Una vista ``READ_ONLY`` escribió en la base en un método seguro."""
+
+
+def _guard(execute, sql, params, many, context):
+    if sql.lstrip().lower().startswith(WRITE_STATEMENTS):
+        msg = f"Escritura en una vista read-only: {sql[:80]}"
+        raise ReadOnlyViolation(msg)
+    return execute(sql, params, many, context)
+
+
+def _run_read_only(view, request, *args, **kwargs):
+    connection = connections[DEFAULT_DB_ALIAS]
+    mode = getattr(settings, "TRANSACTION_READ_ONLY_MODE", "autocommit")
+    guard = getattr(settings, "TRANSACTION_READ_ONLY_GUARD", settings.DEBUG)
+    with reading():
+        if mode == "transaction" and not connection.in_atomic_block:
+            with transaction.atomic(using=DEFAULT_DB_ALIAS):
+                with connection.cursor() as cursor:
+                    cursor.execute("SET TRANSACTION READ ONLY")
+                return view(request, *args, **kwargs)
+        if guard:
+            with connection.execute_wrapper(_guard):
+                return view(request, *args, **kwargs)
+        return view(request, *args, **kwargs)
+
+
+def transaction_policy(policy: str):
+    """Decorador que declara la política de transacción de una vista."""
+    if policy not in POLICIES:
+        msg = f"Política de transacción desconocida: {policy!r}"
+        raise ValueError(msg)
+
+    def decorator(view):
+        if policy == READ_ONLY and not iscoroutinefunction(view):
+
+            @functools.wraps(view)
+            def wrapper(request, *args, **kwargs):
+                if request.method in SAFE_METHODS:
+                    return _run_read_only(view, request, *args, **kwargs)
+                with transaction.atomic(using=DEFAULT_DB_ALIAS):
+                    return view(request, *args, **kwargs)
+
+        else:
+            wrapper = view
+        if policy != WRITE:
+            wrapper = transaction.non_atomic_requests(wrapper)
+        wrapper.transaction_policy = policy
+        return wrapper
+
+    return decorator
+
+
+class TransactionPolicyMixin:
+    """``as_view()`` aplica ``transaction_policy`` a la vista resultante."""
+
+    transaction_policy: str | None = None
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        view = super().as_view(*args, **kwargs)
+        if cls.transaction_policy is None:
+            return view
+        return transaction_policy(cls.transaction_policy)(view)
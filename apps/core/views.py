@@ -0,0 +1,94 @@
+import logging
+import os
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.http import JsonResponse
+from django.utils.cache import patch_vary_headers
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS
+from drf_spectacular.views import SpectacularAPIView
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.core.compression import etag_matches
+from apps.core.compression import negotiate
+from apps.core.dbpool import pool_stats
+from apps.core.schema import SchemaNotBuilt
+from apps.core.schema import get_artifact
+from apps.core.transactions import READ_ONLY
+from apps.core.transactions import TransactionPolicyMixin
+
+logger = logging.getLogger(__name__)
+
+
+class PrebuiltSchemaView(TransactionPolicyMixin, APIView):
+    """
+    Sirve el esquema OpenAPI generado por ``build_openapi_schema`` desde
+    memoria. Mismos permisos y negociación de formato que
+    ``SpectacularAPIView`` (YAML por defecto, JSON con ``?format=json``
+    o ``Accept``), pero sin generar nada en el request.
+    """
+
+    transaction_policy = READ_ONLY
+    renderer_classes = SpectacularAPIView.renderer_classes
+    permission_classes = SpectacularAPIView.permission_classes
+    authentication_classes = SpectacularAPIView.authentication_classes
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        try:
+            artifact = get_artifact()
+        except SchemaNotBuilt:
+            logger.exception("Falta correr build_openapi_schema")
+            return JsonResponse({"error": "Schema not built"}, status=503)
+
+        _, media_type = self.perform_content_negotiation(request)
+        variant = artifact.variants["json" if "json" in media_type else "yaml"]
+        if etag_matches(request.headers.get("If-None-Match", ""), variant.etag):
+            response = HttpResponse(status=304)
+        elif negotiate(request.headers.get("Accept-Encoding", ""), ("gzip",)):
+            response = HttpResponse(variant.gzip_body, content_type=media_type)
+            response["Content-Encoding"] = "gzip"
+        else:
+            response = HttpResponse(variant.body, content_type=media_type)
+        response["ETag"] = variant.etag
+        response["Cache-Control"] = "private, no-cache"
+        patch_vary_headers(response, ("Accept", "Accept-Encoding"))
+        return response
+
+
+class DatabasePoolStatsView(TransactionPolicyMixin, APIView):
+    """
+    Estadísticas de los pools de conexiones del proceso que atiende el
+    request (ver ``apps.core.dbpool``), para staff. Con varios workers, cada
+    llamada muestra uno: ``pid`` dice cuál.
+    """
+
+    transaction_policy = READ_ONLY
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(exclude=True)
+    def get(self, request, *args, **kwargs):
+        return Response({"pid": os.getpid(), "pools": pool_stats()})
+
+
+class CacheStatsView(TransactionPolicyMixin, APIView):
+    """
+    Aciertos por nivel de los cachés con L1 (``TieredRedisCache``) del
+    proceso que atiende el request, para staff.
+    """
+
+    transaction_policy = READ_ONLY
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(exclude=True)
+    def get(self, request, *args, **kwargs):
+        stats = {
+            alias: caches[alias].tier_stats()
+            for alias in settings.CACHES
+            if hasattr(caches[alias], "tier_stats")
+        }
+        return Response({"pid": os.getpid(), "caches": stats})
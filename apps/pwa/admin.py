@@ -1,3 +1,80 @@
+import json
+
 from django.contrib import admin
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from push_notifications.admin import WebPushDeviceAdmin as BaseWebPushDeviceAdmin
+from push_notifications.models import WebPushDevice
+
+from apps.core.admin import ScalableAdminMixin
+
+TEST_MESSAGE = {
+    "title": "🔔 Notificación de Prueba",
+    "body": "Notificación de prueba enviada desde el admin de GeoQR.",
+    "icon": "/static/icons/android/android-launchericon-192-192.png",
+    "badge": "/static/icons/qeoqr_icon_monochrome.svg",
+    "data": {"url": "/"},
+}
+
+
+def enable_devices(queryset):
+    queryset.update(active=True)
+
+
+def disable_devices(queryset):
+    queryset.update(active=False)
+
+
+def send_test_message(queryset):
+    # Una tanda: send_message filtra los activos y agrupa por aplicación. Se
+    # manda después del commit de la tanda, sin transacción abierta durante
+    # el envío.
+    transaction.on_commit(
+        lambda: queryset.send_message(message=json.dumps(TEST_MESSAGE)),
+    )
+
+
+admin.site.unregister(WebPushDevice)
+
+
+@admin.register(WebPushDevice)
+class WebPushDeviceAdmin(ScalableAdminMixin, BaseWebPushDeviceAdmin):
+    """
+    Admin de dispositivos Web Push para tablas grandes: conteo estimado,
+    paginación por cursor (más nuevos primero), búsqueda por email del
+    usuario (indexada en ``users_user``) y acciones por tandas en segundo
+    plano en lugar de recorrer el queryset en el request.
+    """
+
+    ordering = ["-id"]
+    list_select_related = ["user"]
+    search_fields = ["user__email"]
+    prefix_search_fields = ("user__email",)
+    actions = ["send_test", "enable_selected", "disable_selected"]
+
+    @admin.action(description=_("Send a test notification"))
+    def send_test(self, request, queryset):
+        self.run_in_background(
+            request,
+            queryset,
+            send_test_message,
+            _("Test notification"),
+        )
+
+    @admin.action(description=_("Activate selected devices"))
+    def enable_selected(self, request, queryset):
+        self.run_in_background(
+            request,
+            queryset,
+            enable_devices,
+            _("Activate devices"),
+        )
 
-# Register your models here.
+    @admin.action(description=_("Deactivate selected devices"))
+    def disable_selected(self, request, queryset):
+        self.run_in_background(
+            request,
+            queryset,
+            disable_devices,
+            _("Deactivate devices"),
+        )
@@ -0,0 +1,211 @@
+"""
+Respuestas constantes de la PWA servidas antes de entrar a Django.
+
+Los navegadores piden ``/sw.js`` en cada chequeo de actualización del Service
+Worker, Android verifica ``/.well-known/assetlinks.json`` y la PWA vuelve a
+buscar ``/manifest.json`` y ``/offline.html``. Las cuatro respuestas son iguales
+para todos, pero cada pedido pasaba por sesión, CSRF, allauth y la transacción
+de ``ATOMIC_REQUESTS``.
+
+``PwaFastLane`` (en ``config.asgi``) deja que Django renderice cada ruta una
+vez por proceso, con un pedido sin cookies, y guarda la respuesta: headers
+(incluidos los de seguridad), cuerpo y sus versiones brotli y gzip. Después la
+sirve desde memoria con el ``Cache-Control`` de ``ROUTES``, un ETag fijo y
+``304`` si el cliente ya la tiene. Una respuesta que no es ``200`` o que setea
+cookies no se guarda.
+
+Con ``PWA_FAST_LANE = False`` (el default con ``DEBUG``) todo pasa por Django.
+"""
+
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from http import HTTPStatus
+
+from django.conf import settings
+
+from apps.core.compression import BrotliEncoder
+from apps.core.compression import GzipEncoder
+from apps.core.compression import is_compressible
+from apps.core.compression import negotiate
+
+# Path → Cache-Control. El Service Worker y la página offline se revalidan
+# siempre (cambian con cada deploy); el ETag hace que eso sea un 304.
+ROUTES = {
+    "/sw.js": "no-cache",
+    "/offline.html": "no-cache",
+    "/manifest.json": "public, max-age=3600",
+    "/.well-known/assetlinks.json": "public, max-age=86400",
+}
+# Headers del pedido original que se pasan al renderizar la respuesta.
+FORWARDED_HEADERS = frozenset({b"host", b"x-forwarded-proto"})
+# Headers de la respuesta capturada que se recalculan al servirla.
+RECOMPUTED_HEADERS = frozenset(
+    {
+        b"cache-control",
+        b"content-encoding",
+        b"content-length",
+        b"etag",
+        b"expires",
+        b"last-modified",
+        b"server-timing",
+        b"vary",
+    },
+)
+
+
+@dataclass(frozen=True, slots=True)
+class ConstantResponse:
+    headers: list[tuple[bytes, bytes]]
+    # Encoding ("" sin comprimir) → cuerpo.
+    bodies: dict[str, bytes]
+    digest: str
+
+    @classmethod
+    def build(cls, headers, body: bytes, cache_control: str):
+        # Django manda los nombres como se escribieron ("Content-Type").
+        headers = [(k.lower(), v) for k, v in headers]
+        headers = [(k, v) for k, v in headers if k not in RECOMPUTED_HEADERS]
+        headers.append((b"cache-control", cache_control.encode()))
+        bodies = {"": body}
+        content_type = dict(headers).get(b"content-type", b"").decode("latin-1")
+        min_size = getattr(settings, "RESPONSE_COMPRESSION_MIN_SIZE", 512)
+        if is_compressible(content_type) and len(body) >= min_size:
+            # Se comprime una sola vez por proceso: vale el nivel máximo.
+            for encoding, encoder in (
+                ("br", BrotliEncoder(11)),
+                ("gzip", GzipEncoder(9, max_random_bytes=0)),
+            ):
+                if len(compressed := encoder.compress(body)) < len(body):
+                    bodies[encoding] = compressed
+        if len(bodies) > 1:
+            headers.append((b"vary", b"Accept-Encoding"))
+        digest = hashlib.sha256(body).hexdigest()[:16]
+        return cls(headers, bodies, digest)
+
+    def etag(self, encoding: str) -> bytes:
+        suffix = f"-{encoding}" if encoding else ""
+        return f'"{self.digest}{suffix}"'.encode()
+
+    async def send(self, scope, send) -> None:
+        request_headers = dict(scope["headers"])
+        encoding = ""
+        if len(self.bodies) > 1:
+            accept = request_headers.get(b"accept-encoding", b"").decode("latin-1")
+            encoding = negotiate(accept) or ""
+        etag = self.etag(encoding)
+        if etag in _etags(request_headers.get(b"if-none-match", b"")):
+            headers = [
+                (k, v) for k, v in self.headers if k in {b"cache-control", b"vary"}
+            ]
+            await _send(send, HTTPStatus.NOT_MODIFIED, [*headers, (b"etag", etag)])
+            return
+        body = self.bodies[encoding]
+        headers = [
+            *self.headers,
+            (b"etag", etag),
+            (b"content-length", str(len(body)).encode()),
+        ]
+        if encoding:
+            headers.append((b"content-encoding", encoding.encode()))
+        if scope["method"] == "HEAD":
+            body = b""
+        await _send(send, HTTPStatus.OK, headers, body)
+
+
+def _etags(if_none_match: bytes) -> set[bytes]:
+    return {tag.strip().removeprefix(b"W/") for tag in if_none_match.split(b",")}
+
+
+async def _send(send, status: int, headers: list, body: bytes = b"") -> None:
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+class PwaFastLane:
+    """
+    Aplicación ASGI que responde ``GET``/``HEAD`` a los paths de ``ROUTES``
+    desde memoria y delega todo lo demás en ``app``.
+    """
+
+    def __init__(self, app, routes: dict[str, str] | None = None):
+        self.app = app
+        self.routes = ROUTES if routes is None else routes
+        self.responses: dict[str, ConstantResponse] = {}
+        self.enabled = getattr(settings, "PWA_FAST_LANE", True)
+
+    async def __call__(self, scope, receive, send):
+        if not self._match(scope):
+            await self.app(scope, receive, send)
+            return
+        response = self.responses.get(scope["path"])
+        if response is None:
+            response = await self._capture(scope)
+            if response is None:
+                await self.app(scope, receive, send)
+                return
+            self.responses[scope["path"]] = response
+        await response.send(scope, send)
+
+    def _match(self, scope) -> bool:
+        return (
+            self.enabled
+            and scope["type"] == "http"
+            and scope["method"] in {"GET", "HEAD"}
+            and scope["path"] in self.routes
+            # Django se encarga del redirect a https.
+            and not (settings.SECURE_SSL_REDIRECT and not _is_secure(scope))
+        )
+
+    async def _capture(self, scope) -> ConstantResponse | None:
+        """Respuesta de Django a un ``GET`` anónimo del path, o ``None``."""
+        capture_scope = {
+            **scope,
+            "method": "GET",
+            "query_string": b"",
+            "headers": [(k, v) for k, v in scope["headers"] if k in FORWARDED_HEADERS],
+            "extensions": {},
+        }
+        start, chunks = {}, []
+        finished = asyncio.Event()
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # Django espera un posible disconnect hasta terminar la respuesta.
+            await finished.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body"):
+                    finished.set()
+
+        await self.app(capture_scope, receive, send)
+        finished.set()
+        headers = start.get("headers", [])
+        if start.get("status") != HTTPStatus.OK or any(
+            name.lower() == b"set-cookie" for name, _ in headers
+        ):
+            return None
+        return ConstantResponse.build(
+            headers,
+            b"".join(chunks),
+            self.routes[scope["path"]],
+        )
+
+
+def _is_secure(scope) -> bool:
+    if scope.get("scheme") == "https":
+        return True
+    if proxy_header := settings.SECURE_PROXY_SSL_HEADER:
+        name, value = proxy_header
+        name = name.removeprefix("HTTP_").lower().replace("_", "-").encode()
+        return dict(scope["headers"]).get(name) == value.encode()
+    return False
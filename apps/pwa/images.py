@@ -0,0 +1,246 @@
+"""
+Íconos y screenshots de la PWA generados desde una sola imagen.
+
+``python manage.py build_pwa_images`` toma ``icon.png`` (1024x1024, fondo
+transparente) y los screenshots de ``PWA_IMAGES_SOURCE_DIR`` y genera cada
+variante en PNG, WebP y AVIF en paralelo. Los archivos se llaman
+``<variante>.<hash>.<ext>`` (hash del contenido, como los de
+``ManifestStaticFilesStorage``): nunca cambian, así que se sirven con cache
+inmutable. Al final reescribe ``icons``, ``shortcuts`` y ``screenshots`` de
+``manifest.json`` con los nombres nuevos.
+
+Las variantes son los tamaños que pedían los sets de Android, iOS y Windows 11
+(PWABuilder), sin repetir. WebP y AVIF sólo se publican si pesan menos que el
+PNG del mismo tamaño.
+"""
+
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from PIL import Image
+from PIL import ImageColor
+
+# En el orden en que aparecen en el manifest: el navegador usa el primero que
+# soporta entre los del mismo tamaño.
+FORMATS = ("avif", "webp", "png")
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp", "png": "image/png"}
+SAVE_OPTIONS = {
+    "avif": {"quality": 60, "speed": 6},
+    "webp": {"quality": 85, "method": 5},
+    "png": {"optimize": True},
+}
+
+# fmt: off
+ICON_SIZES = sorted(
+    {
+        # Android
+        48, 72, 96, 144, 192, 512,
+        # iOS
+        16, 20, 29, 32, 40, 50, 57, 58, 60, 64, 76, 80, 87, 100, 114, 120, 128,
+        152, 167, 180, 256, 1024,
+        # Windows 11: Square44x44Logo (targetsize y scale), SmallTile,
+        # Square150x150Logo, LargeTile y StoreLogo
+        24, 30, 36, 44, 55, 63, 66, 71, 75, 88, 89, 107, 142, 150, 176, 188,
+        200, 225, 284, 300, 310, 388, 465, 600, 620, 1240,
+    },
+)
+# fmt: on
+MASKABLE_SIZES = (192, 512)
+# Windows 11: Wide310x150Logo y SplashScreen.
+WIDE_SIZES = (
+    (310, 150),
+    (388, 188),
+    (465, 225),
+    (620, 300),
+    (775, 375),
+    (930, 450),
+    (1240, 600),
+    (2480, 1200),
+)
+# Lado del ícono dentro de un maskable: la zona segura es el círculo del 80%.
+MASKABLE_SCALE = 0.7
+
+
+@dataclass(frozen=True, slots=True)
+class Variant:
+    name: str
+    source: str
+    size: tuple[int, int]
+    # "resize" escala la fuente; "contain" la centra en un lienzo del tamaño
+    # (transparente, o con el background_color si ``purpose`` es maskable).
+    fit: str = "resize"
+    purpose: str = "any"
+    form_factor: str = ""
+    label: str = ""
+
+    @property
+    def sizes(self) -> str:
+        return f"{self.size[0]}x{self.size[1]}"
+
+
+ICONS = (
+    *(Variant(f"icon-{s}x{s}", "icon.png", (s, s)) for s in ICON_SIZES),
+    *(
+        Variant(f"maskable-{s}x{s}", "icon.png", (s, s), "contain", "maskable")
+        for s in MASKABLE_SIZES
+    ),
+    *(Variant(f"wide-{w}x{h}", "icon.png", (w, h), "contain") for w, h in WIDE_SIZES),
+)
+SCREENSHOTS = (
+    Variant(
+        "screenshot-narrow-540x720",
+        "screenshot-narrow.png",
+        (540, 720),
+        form_factor="narrow",
+        label="Vista principal de GeoQR",
+    ),
+    Variant(
+        "screenshot-wide-1280x720",
+        "screenshot-wide.png",
+        (1280, 720),
+        form_factor="wide",
+        label="Vista de escritorio de GeoQR",
+    ),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Output:
+    variant: Variant
+    format: str
+    filename: str
+    data: bytes
+
+
+def get_source_dir() -> Path:
+    return Path(settings.PWA_IMAGES_SOURCE_DIR)
+
+
+def get_static_dir() -> Path:
+    return Path(settings.STATICFILES_DIRS[0])
+
+
+@lru_cache(maxsize=8)
+def _open(path: str) -> Image.Image:
+    # Cada proceso abre la fuente una vez y la reusa para todas sus variantes.
+    image = Image.open(path)
+    image.load()
+    return image
+
+
+def render(source_dir: Path, variant: Variant, background: str) -> Image.Image:
+    source = _open(str(source_dir / variant.source))
+    if variant.fit == "resize":
+        return source.resize(variant.size, Image.Resampling.LANCZOS)
+    width, height = variant.size
+    side = min(width, height)
+    if variant.purpose == "maskable":
+        side = round(side * MASKABLE_SCALE)
+        canvas = Image.new("RGBA", variant.size, ImageColor.getrgb(background))
+    else:
+        canvas = Image.new("RGBA", variant.size, (0, 0, 0, 0))
+    icon = source.resize((side, side), Image.Resampling.LANCZOS)
+    canvas.alpha_composite(icon, ((width - side) // 2, (height - side) // 2))
+    return canvas
+
+
+def encode(image: Image.Image, fmt: str) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, fmt.upper(), **SAVE_OPTIONS[fmt])
+    return buffer.getvalue()
+
+
+def build_variant(source_dir: Path, variant: Variant, background: str) -> list:
+    """Codifica ``variant`` en cada formato; corre en un proceso del pool."""
+    image = render(source_dir, variant, background)
+    outputs = []
+    for fmt in FORMATS:
+        data = encode(image, fmt)
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        outputs.append(Output(variant, fmt, f"{variant.name}.{digest}.{fmt}", data))
+    png = outputs[-1]
+    # Un formato moderno que no ahorra bytes sólo agranda el manifest.
+    return [o for o in outputs if o is png or len(o.data) < len(png.data)]
+
+
+def _entry(output: Output, url_prefix: str) -> dict:
+    entry = {
+        "src": f"{url_prefix}{output.filename}",
+        "sizes": output.variant.sizes,
+        "type": MIME_TYPES[output.format],
+    }
+    if output.variant.form_factor:
+        entry["form_factor"] = output.variant.form_factor
+        entry["label"] = output.variant.label
+    else:
+        entry["purpose"] = output.variant.purpose
+    return entry
+
+
+def update_manifest(manifest: dict, outputs: list, url_prefix: str) -> dict:
+    icons = [_entry(o, url_prefix) for o in outputs if not o.variant.form_factor]
+    screenshots = [_entry(o, url_prefix) for o in outputs if o.variant.form_factor]
+    # Los SVG (monochrome) no se generan: se mantienen.
+    vectors = [i for i in manifest.get("icons", []) if i.get("type") == "image/svg+xml"]
+    manifest["icons"] = vectors + icons
+    manifest["screenshots"] = screenshots
+    for shortcut in manifest.get("shortcuts", []):
+        sizes = {i["sizes"] for i in shortcut.get("icons", [])}
+        shortcut["icons"] = [
+            i for i in icons if i["sizes"] in sizes and i["purpose"] == "any"
+        ]
+    return manifest
+
+
+def build_images(
+    source_dir: Path | None = None,
+    static_dir: Path | None = None,
+    jobs: int | None = None,
+    variants: tuple[Variant, ...] = (*ICONS, *SCREENSHOTS),
+) -> list:
+    """
+    Genera todas las variantes en ``<static_dir>/<PWA_IMAGES_STATIC_PREFIX>``,
+    borra las que ya no corresponden y actualiza ``<static_dir>/manifest.json``.
+    """
+    source_dir = source_dir or get_source_dir()
+    static_dir = static_dir or get_static_dir()
+    prefix = settings.PWA_IMAGES_STATIC_PREFIX
+    output_dir = static_dir / prefix
+    manifest_path = static_dir / "manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    background = manifest.get("background_color", "#ffffff")
+
+    args = (
+        [source_dir] * len(variants),
+        variants,
+        [background] * len(variants),
+    )
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1:
+        results = list(map(build_variant, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(build_variant, *args))
+    outputs = [output for result in results for output in result]
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    names = {output.filename for output in outputs}
+    for output in outputs:
+        path = output_dir / output.filename
+        if not path.exists():
+            path.write_bytes(output.data)
+    for path in output_dir.iterdir():
+        if path.name not in names:
+            path.unlink()
+
+    url_prefix = f"{settings.STATIC_URL}{prefix}/"
+    manifest = update_manifest(manifest, outputs, url_prefix)
+    manifest_path.write_text(json.dumps(manifest, indent=2, ensure_ascii=False) + "\n")
+    return outputs
@@ -0,0 +1,47 @@
+"""
+Management command que genera los íconos y screenshots de la PWA.
+
+Uso:
+    python manage.py build_pwa_images [--jobs N]
+
+Se corre al cambiar la imagen fuente (``PWA_IMAGES_SOURCE_DIR``); las
+variantes generadas y ``manifest.json`` se commitean. Ver ``apps.pwa.images``.
+"""
+
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from apps.pwa.images import build_images
+
+
+class Command(BaseCommand):
+    help = "Genera los íconos y screenshots de la PWA en PNG, WebP y AVIF"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=None,
+            help="Procesos en paralelo (por defecto uno por CPU)",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        outputs = build_images(jobs=options["jobs"])
+        elapsed = time.perf_counter() - started
+
+        files, sizes = Counter(), Counter()
+        for output in outputs:
+            files[output.format] += 1
+            sizes[output.format] += len(output.data)
+        for fmt in sorted(files, key=sizes.get):
+            self.stdout.write(
+                f"🖼️  {fmt}: {files[fmt]} archivos, {sizes[fmt] / 1024:.0f} KB",
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ {len(outputs)} imágenes generadas en {elapsed:.1f} s",
+            ),
+        )
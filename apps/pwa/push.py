@@ -0,0 +1,84 @@
+"""
+Envío Web Push asíncrono.
+
+``push_notifications`` envía con ``pywebpush.webpush`` (requests, bloqueante)
+un dispositivo detrás de otro. ``asend_message`` usa ``webpush_async`` y
+envía a todos los dispositivos a la vez, sobre una sesión aiohttp por envío
+(los dispositivos de un mismo push service comparten la conexión TLS).
+
+Mantiene la semántica de ``webpush_send_message``: un 404/410 desactiva el
+dispositivo y cualquier otro error termina en ``WebPushError``.
+"""
+
+import asyncio
+
+import aiohttp
+from push_notifications.conf import get_manager
+from push_notifications.exceptions import WebPushError
+from push_notifications.webpush import get_subscription_info
+from pywebpush import WebPushException
+from pywebpush import webpush_async
+
+GONE_STATUSES = (404, 410)
+
+
+async def asend(device, message: str, session: aiohttp.ClientSession) -> dict:
+    """``WebPushDevice.send_message`` sin bloquear el event loop."""
+    manager = get_manager()
+    application_id = device.application_id
+    result = {"results": [{"original_registration_id": device.registration_id}]}
+    private_key = None
+    if hasattr(manager, "get_wp_private_key"):
+        private_key = manager.get_wp_private_key(application_id)
+    claims = None
+    if hasattr(manager, "get_wp_claims"):
+        claims = manager.get_wp_claims(application_id).copy()
+    timeout = None
+    if hasattr(manager, "get_wp_error_timeout"):
+        timeout = aiohttp.ClientTimeout(
+            total=manager.get_wp_error_timeout(application_id),
+        )
+    try:
+        await webpush_async(
+            subscription_info=get_subscription_info(
+                application_id,
+                device.registration_id,
+                device.browser,
+                device.auth,
+                device.p256dh,
+            ),
+            data=message,
+            vapid_private_key=private_key,
+            vapid_claims=claims,
+            timeout=timeout,
+            aiohttp_session=session,
+        )
+    except WebPushException as exc:
+        response = exc.response
+        if response is not None and response.status in GONE_STATUSES:
+            device.active = False
+            await device.asave(update_fields=["active"])
+            result["failure"] = 1
+            result["results"][0]["error"] = exc.message
+            return result
+        raise WebPushError(exc.message) from exc
+    except (aiohttp.ClientError, TimeoutError) as exc:
+        raise WebPushError(str(exc)) from exc
+    result["success"] = 1
+    return result
+
+
+async def asend_message(devices, message: str) -> list[dict]:
+    """
+    Envía ``message`` a todos los ``devices`` en paralelo. Si alguno falla se
+    levanta el primer error, pero después de intentar con todos.
+    """
+    async with aiohttp.ClientSession() as session:
+        results = await asyncio.gather(
+            *(asend(device, message, session) for device in devices),
+            return_exceptions=True,
+        )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
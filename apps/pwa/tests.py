@@ -1,3 +1,327 @@
-from django.test import TestCase
+import json
+from http import HTTPStatus
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+from unittest.mock import patch
 
-# Create your tests here.
+import brotli
+import pytest
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core import signals
+from django.core.asgi import get_asgi_application
+from django.db import close_old_connections
+from django.urls import reverse
+from PIL import Image
+from push_notifications.models import WebPushDevice
+from pywebpush import WebPushException
+
+from apps.core.middleware import AsyncWhiteNoiseMiddleware
+from apps.pwa.fastlane import PwaFastLane
+from apps.pwa.images import SCREENSHOTS
+from apps.pwa.images import Variant
+from apps.pwa.images import build_images
+from apps.pwa.push import asend_message
+
+pytestmark = pytest.mark.django_db
+
+SUBSCRIPTION = {
+    "endpoint": "https://push.example.com/1",
+    "keys": {"p256dh": "key", "auth": "auth"},
+}
+
+
+@pytest.fixture
+def device(user):
+    return WebPushDevice.objects.create(
+        user=user,
+        registration_id=SUBSCRIPTION["endpoint"],
+        p256dh="key",
+        auth="auth",
+        browser="CHROME",
+    )
+
+
+class TestPushViews:
+    def test_subscribe(self, client, user):
+        client.force_login(user)
+        response = client.post(
+            reverse("push_subscribe"),
+            {"subscription": SUBSCRIPTION, "browser": "CHROME"},
+            content_type="application/json",
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()["created"]
+        assert WebPushDevice.objects.get(user=user).auth == "auth"
+
+    def test_subscribe_requires_login(self, client):
+        response = client.post(reverse("push_subscribe"))
+        assert response.status_code == HTTPStatus.FOUND
+
+    def test_unsubscribe(self, client, user, device):
+        client.force_login(user)
+        response = client.delete(
+            reverse("push_unsubscribe"),
+            {"endpoint": device.registration_id},
+            content_type="application/json",
+        )
+        assert response.json() == {"success": True, "deleted": True}
+        assert not WebPushDevice.objects.exists()
+
+    def test_send_test(self, client, user, device):
+        client.force_login(user)
+        with patch("apps.pwa.push.asend_message", new=AsyncMock()) as send:
+            response = client.post(reverse("push_test"))
+        assert response.json()["devices_count"] == 1
+        devices, message = send.await_args.args
+        assert devices == [device]
+        assert json.loads(message)["title"]
+
+    def test_send_test_without_devices(self, client, user):
+        client.force_login(user)
+        response = client.post(reverse("push_test"))
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+class TestAsendMessage:
+    def test_sends_to_every_device(self, device):
+        with patch("apps.pwa.push.webpush_async", new=AsyncMock()) as webpush:
+            results = async_to_sync(asend_message)([device, device], "{}")
+        assert webpush.await_count == 2  # noqa: PLR2004
+        assert [r["success"] for r in results] == [1, 1]
+
+    def test_gone_subscription_deactivates_device(self, device):
+        gone = WebPushException("gone", response=MagicMock(status=410))
+        with patch("apps.pwa.push.webpush_async", new=AsyncMock(side_effect=gone)):
+            (result,) = async_to_sync(asend_message)([device], "{}")
+        assert result["failure"] == 1
+        device.refresh_from_db()
+        assert not device.active
+
+
+class TestBuildImages:
+    variants = (
+        Variant("icon-32x32", "icon.png", (32, 32)),
+        Variant("icon-96x96", "icon.png", (96, 96)),
+        Variant("maskable-64x64", "icon.png", (64, 64), "contain", "maskable"),
+        Variant("wide-62x30", "icon.png", (62, 30), "contain"),
+        Variant(
+            "screenshot-narrow-30x40",
+            "shot.png",
+            (30, 40),
+            form_factor="narrow",
+            label=SCREENSHOTS[0].label,
+        ),
+    )
+
+    @pytest.fixture
+    def dirs(self, tmp_path):
+        source, static = tmp_path / "source", tmp_path / "static"
+        source.mkdir()
+        static.mkdir()
+        Image.new("RGBA", (128, 128), (84, 108, 200, 255)).save(source / "icon.png")
+        Image.new("RGB", (60, 80), (255, 255, 255)).save(source / "shot.png")
+        manifest = {
+            "background_color": "#ffffff",
+            "shortcuts": [{"name": "Scan", "icons": [{"sizes": "96x96"}]}],
+            "icons": [
+                {"src": "/static/icons/old.png", "sizes": "96x96"},
+                {"src": "/static/icons/mono.svg", "type": "image/svg+xml"},
+            ],
+        }
+        (static / "manifest.json").write_text(json.dumps(manifest))
+        return source, static
+
+    def build(self, dirs):
+        return build_images(*dirs, jobs=1, variants=self.variants)
+
+    def test_writes_hashed_variants_and_manifest(self, dirs):
+        outputs = self.build(dirs)
+        output_dir = dirs[1] / settings.PWA_IMAGES_STATIC_PREFIX
+        assert {p.name for p in output_dir.iterdir()} == {o.filename for o in outputs}
+        assert {o.format for o in outputs} >= {"png"}
+        icon = next(o for o in outputs if o.variant.name == "wide-62x30")
+        assert Image.open(output_dir / icon.filename).size == (62, 30)
+        maskable = next(o for o in outputs if o.variant.purpose == "maskable")
+        corner = Image.open(output_dir / maskable.filename).getpixel((0, 0))
+        assert corner[:3] == (255, 255, 255)
+
+        manifest = json.loads((dirs[1] / "manifest.json").read_text())
+        prefix = f"{settings.STATIC_URL}{settings.PWA_IMAGES_STATIC_PREFIX}/"
+        assert manifest["icons"][0]["src"] == "/static/icons/mono.svg"
+        assert all(i["src"].startswith(prefix) for i in manifest["icons"][1:])
+        assert {i["sizes"] for i in manifest["shortcuts"][0]["icons"]} == {"96x96"}
+        screenshot = manifest["screenshots"][0]
+        assert screenshot["form_factor"] == "narrow"
+        assert screenshot["sizes"] == "30x40"
+
+    def test_rebuild_is_stable_and_drops_stale_files(self, dirs):
+        output_dir = dirs[1] / settings.PWA_IMAGES_STATIC_PREFIX
+        first = {o.filename for o in self.build(dirs)}
+        (output_dir / "icon-32x32.000000000000.png").write_bytes(b"old")
+        assert {o.filename for o in self.build(dirs)} == first
+        assert {p.name for p in output_dir.iterdir()} == first
+
+    def test_hashed_names_are_immutable(self):
+        test = AsyncWhiteNoiseMiddleware(lambda request: None).immutable_file_test
+        assert test("", "/static/icons/pwa/icon-96x96.3b3f36e5a8ea.avif")
+        assert not test("", "/static/icons/icon.svg")
+
+
+SW_BODY = b"self.addEventListener('fetch', () => {});\n" * 40
+
+
+class Upstream:
+    """Django de mentira: cuenta los pedidos que le llegan."""
+
+    def __init__(self, headers=(), status=HTTPStatus.OK):
+        self.calls = []
+        self.status = status
+        self.headers = [
+            (b"content-type", b"application/javascript"),
+            (b"x-content-type-options", b"nosniff"),
+            (b"vary", b"Cookie"),
+            *headers,
+        ]
+
+    async def __call__(self, scope, receive, send):
+        self.calls.append(scope)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status,
+                "headers": self.headers,
+            },
+        )
+        await send({"type": "http.response.body", "body": SW_BODY})
+
+
+def call_fast_lane(app, path="/sw.js", method="GET", headers=(), scheme="https"):
+    scope = {
+        "type": "http",
+        "method": method,
+        "scheme": scheme,
+        "path": path,
+        "query_string": b"",
+        "headers": [(b"host", b"testserver"), (b"cookie", b"a=b"), *headers],
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    # Como el cliente de tests de Django: no cerrar la conexión de la transacción.
+    signals.request_started.disconnect(close_old_connections)
+    signals.request_finished.disconnect(close_old_connections)
+    try:
+        async_to_sync(app)(scope, receive, send)
+    finally:
+        signals.request_started.connect(close_old_connections)
+        signals.request_finished.connect(close_old_connections)
+    start, body = messages
+    return start["status"], dict(start["headers"]), body["body"]
+
+
+class TestPwaFastLane:
+    def test_renders_once_and_serves_from_memory(self):
+        upstream = Upstream()
+        app = PwaFastLane(upstream)
+        for _ in range(3):
+            status, headers, body = call_fast_lane(app)
+        assert status == HTTPStatus.OK
+        assert body == SW_BODY
+        assert len(upstream.calls) == 1
+        # Django lo renderiza como un pedido anónimo.
+        assert dict(upstream.calls[0]["headers"]) == {b"host": b"testserver"}
+        assert headers[b"cache-control"] == b"no-cache"
+        assert headers[b"x-content-type-options"] == b"nosniff"
+        assert headers[b"vary"] == b"Accept-Encoding"
+        assert headers[b"content-length"] == str(len(SW_BODY)).encode()
+
+    def test_compressed_and_not_modified(self):
+        app = PwaFastLane(Upstream())
+        accept = (b"accept-encoding", b"gzip, br")
+        _, headers, body = call_fast_lane(app, headers=[accept])
+        assert headers[b"content-encoding"] == b"br"
+        assert brotli.decompress(body) == SW_BODY
+
+        status, not_modified, body = call_fast_lane(
+            app,
+            headers=[accept, (b"if-none-match", headers[b"etag"])],
+        )
+        assert status == HTTPStatus.NOT_MODIFIED
+        assert not_modified[b"etag"] == headers[b"etag"]
+        assert body == b""
+        # El ETag es por encoding.
+        status, _, _ = call_fast_lane(
+            app,
+            headers=[(b"if-none-match", headers[b"etag"])],
+        )
+        assert status == HTTPStatus.OK
+
+    def test_head(self):
+        status, headers, body = call_fast_lane(PwaFastLane(Upstream()), method="HEAD")
+        assert status == HTTPStatus.OK
+        assert headers[b"content-length"] == str(len(SW_BODY)).encode()
+        assert body == b""
+
+    @pytest.mark.parametrize(
+        "upstream",
+        [
+            Upstream(headers=[(b"set-cookie", b"csrftoken=x")]),
+            Upstream(status=HTTPStatus.NOT_FOUND),
+        ],
+    )
+    def test_does_not_keep_per_request_responses(self, upstream):
+        app = PwaFastLane(upstream)
+        call_fast_lane(app)
+        status, _, _ = call_fast_lane(app)
+        assert status == upstream.status
+        assert app.responses == {}
+
+    @pytest.mark.parametrize(
+        ("path", "method", "scheme"),
+        [
+            ("/home/", "GET", "https"),
+            ("/sw.js", "POST", "https"),
+            ("/sw.js", "GET", "http"),
+        ],
+    )
+    def test_delegates(self, settings, path, method, scheme):
+        settings.SECURE_SSL_REDIRECT = True
+        upstream = Upstream()
+        app = PwaFastLane(upstream)
+        call_fast_lane(app, path, method, scheme=scheme)
+        call_fast_lane(app, path, method, scheme=scheme)
+        assert len(upstream.calls) == 2  # noqa: PLR2004
+        assert upstream.calls[0]["headers"][1] == (b"cookie", b"a=b")
+
+    def test_disabled(self, settings):
+        settings.PWA_FAST_LANE = False
+        upstream = Upstream()
+        app = PwaFastLane(upstream)
+        call_fast_lane(app)
+        call_fast_lane(app)
+        assert len(upstream.calls) == 2  # noqa: PLR2004
+
+    @pytest.mark.parametrize(
+        ("path", "content_type"),
+        [
+            ("/sw.js", b"application/javascript"),
+            ("/manifest.json", b"application/manifest+json"),
+            ("/offline.html", b"text/html; charset=utf-8"),
+            ("/.well-known/assetlinks.json", b"application/json"),
+        ],
+    )
+    def test_django_routes(self, path, content_type):
+        app = PwaFastLane(get_asgi_application())
+        status, headers, body = call_fast_lane(app, path)
+        assert status == HTTPStatus.OK
+        assert headers[b"content-type"] == content_type
+        assert headers[b"x-frame-options"] == b"DENY"
+        assert b"set-cookie" not in headers
+        assert call_fast_lane(app, path)[2] == body
+        assert list(app.responses) == [path]
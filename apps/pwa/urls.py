@@ -2,6 +2,7 @@
 from django.urls import path
 
 from apps.pwa.views import assetlinks
+from apps.pwa.views import manifest
 from apps.pwa.views import offline
 from apps.pwa.views import privacity_page
 from apps.pwa.views import register_push_subscription
@@ -12,6 +13,7 @@ from apps.pwa.views import unregister_push_subscription
 
 urlpatterns = [
     path("sw.js", service_worker, name="service_worker"),
+    path("manifest.json", manifest, name="manifest"),
     path("offline.html", offline, name="offline"),
     path("server-error.html", server_error, name="server_error"),
     path(".well-known/assetlinks.json", assetlinks, name="assetlinks"),
@@ -1,14 +1,22 @@
 import hashlib
 import json
 import secrets
+from pathlib import Path
 
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.contrib.staticfiles import finders
+from django.http import Http404
+from django.http import HttpResponse
 from django.http import JsonResponse
 from django.shortcuts import render
 from django.utils import timezone
 from django.views.decorators.http import require_http_methods
 
+from apps.core.transactions import NONE
+from apps.core.transactions import READ_ONLY
+from apps.core.transactions import transaction_policy
+
 
 def _get_service_worker_cache_name():
     """
@@ -44,6 +52,7 @@ def _get_service_worker_cache_name():
         return f"geoqr-{content_hash}"
 
 
+@transaction_policy(READ_ONLY)
 def service_worker(request):
     """
     Vista que sirve el Service Worker como una plantilla Django.
@@ -67,6 +76,7 @@ def service_worker(request):
     )
 
 
+@transaction_policy(READ_ONLY)
 def offline(request):
     """
     Vista que sirve la página de error cuando el usuario no tiene conexión a internet.
@@ -75,6 +85,7 @@ def offline(request):
     return render(request, "pwa/offline.html", status=200)
 
 
+@transaction_policy(READ_ONLY)
 def server_error(request):
     """
     Vista que sirve la página de error cuando el servidor está caído (5xx).
@@ -83,6 +94,7 @@ def server_error(request):
     return render(request, "pwa/server-error.html", status=200)
 
 
+@transaction_policy(READ_ONLY)
 def assetlinks(request):
     """
     Vista que sirve el archivo assetlinks.json necesario para la verificación de aplicaciones en Android.
@@ -90,6 +102,23 @@ def assetlinks(request):
     return render(request, "pwa/assetlinks.json", content_type="application/json")
 
 
+@transaction_policy(READ_ONLY)
+def manifest(request):
+    """
+    Vista que sirve el Web App Manifest en la raíz del sitio (las páginas lo
+    enlazan desde ``/static/``). Lo genera ``build_pwa_images``.
+    """
+    path = finders.find("manifest.json")
+    if path is None:
+        msg = "manifest.json no está en los estáticos"
+        raise Http404(msg)
+    return HttpResponse(
+        Path(path).read_bytes(),
+        content_type="application/manifest+json",
+    )
+
+
+@transaction_policy(READ_ONLY)
 def privacity_page(request):
     """
     Vista que sirve la página de privacidad de la PWA.
@@ -97,9 +126,13 @@ def privacity_page(request):
     return render(request, "pwa/privacity_page.html", status=200)
 
 
+# Las vistas de Web Push son async: bajo uvicorn no ocupan un hilo mientras
+# esperan a la base o a los push services. ATOMIC_REQUESTS no admite vistas
+# async; cada escritura es atómica por sí sola.
+@transaction_policy(NONE)
 @login_required
 @require_http_methods(["POST"])
-def register_push_subscription(request):
+async def register_push_subscription(request):
     """
     Registra o actualiza la suscripción Web Push del usuario.
     """
@@ -121,10 +154,10 @@ def register_push_subscription(request):
             return JsonResponse({"error": "Invalid subscription format"}, status=400)
 
         # Crear o actualizar el dispositivo
-        device, created = WebPushDevice.objects.update_or_create(
+        device, created = await WebPushDevice.objects.aupdate_or_create(
             registration_id=endpoint,
             defaults={
-                "user": request.user,
+                "user": await request.auser(),
                 "p256dh": p256dh,
                 "auth": auth,
                 "browser": data.get("browser", "unknown"),
@@ -146,19 +179,29 @@ def register_push_subscription(request):
         return JsonResponse({"error": str(e)}, status=500)
 
 
+@transaction_policy(NONE)
 @login_required
 @require_http_methods(["POST"])
-def send_test_notification(request):
+async def send_test_notification(request):
     """
-    Envía una notificación de prueba al usuario actual.
+    Envía una notificación de prueba al usuario actual, a todos sus
+    dispositivos en paralelo.
     """
     try:
         from push_notifications.models import WebPushDevice
 
+        # Local como WebPushDevice: push importa push_notifications y pywebpush,
+        # y sin ellos la vista responde el error de abajo.
+        from apps.pwa.push import asend_message  # noqa: PLC0415
+
         # Obtener todos los dispositivos activos del usuario
-        devices = WebPushDevice.objects.filter(user=request.user, active=True)
+        user = await request.auser()
+        devices = [
+            device
+            async for device in WebPushDevice.objects.filter(user=user, active=True)
+        ]
 
-        if not devices.exists():
+        if not devices:
             return JsonResponse(
                 {"error": "No active devices found. Please subscribe first."},
                 status=400,
@@ -198,12 +241,12 @@ def send_test_notification(request):
             "data": {"url": "/", "timestamp": timezone.now().isoformat()},
         }
 
-        devices.send_message(message=json.dumps(message))
+        await asend_message(devices, json.dumps(message))
 
         return JsonResponse(
             {
                 "success": True,
-                "devices_count": devices.count(),
+                "devices_count": len(devices),
                 "message": "Test notification sent",
             }
         )
@@ -216,9 +259,10 @@ def send_test_notification(request):
         return JsonResponse({"error": str(e)}, status=500)
 
 
+@transaction_policy(NONE)
 @login_required
 @require_http_methods(["DELETE"])
-def unregister_push_subscription(request):
+async def unregister_push_subscription(request):
     """
     Desregistra la suscripción Web Push del usuario.
     """
@@ -231,9 +275,9 @@ def unregister_push_subscription(request):
         if not endpoint:
             return JsonResponse({"error": "No endpoint provided"}, status=400)
 
-        deleted_count, _ = WebPushDevice.objects.filter(
-            registration_id=endpoint, user=request.user
-        ).delete()
+        deleted_count, _ = await WebPushDevice.objects.filter(
+            registration_id=endpoint, user=await request.auser()
+        ).adelete()
 
         return JsonResponse({"success": True, "deleted": deleted_count > 0})
 
@@ -0,0 +1,25 @@
+from django.contrib import admin
+
+from apps.qr.counters import get_counters
+from apps.qr.counters import scan_counter
+from apps.qr.models import ShortLink
+
+
+@admin.register(ShortLink)
+class ShortLinkAdmin(admin.ModelAdmin):
+    list_display = ["code", "target", "is_active", "scans", "created"]
+    list_filter = ["is_active"]
+    search_fields = ["code"]
+
+    def get_changelist_instance(self, request):
+        changelist = super().get_changelist_instance(request)
+        # Un solo get_many al caché para toda la página.
+        links = changelist.result_list
+        counts = get_counters().get_counts([scan_counter(link.code) for link in links])
+        for link in links:
+            link.scan_count = counts[scan_counter(link.code)]
+        return changelist
+
+    @admin.display(description="Lecturas (aprox.)")
+    def scans(self, obj):
+        return getattr(obj, "scan_count", "-")
@@ -0,0 +1,12 @@
+import contextlib
+
+from django.apps import AppConfig
+
+
+class QrConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "apps.qr"
+
+    def ready(self):
+        with contextlib.suppress(ImportError):
+            import apps.qr.signals  # noqa: F401, PLC0415
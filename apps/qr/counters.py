@@ -0,0 +1,231 @@
+"""
+Contadores repartidos en shards para lecturas y visitas muy concurrentes.
+
+Incrementar una sola fila por código serializa las lecturas en el lock de esa
+fila. Acá cada incremento va a uno de ``QR_COUNTER_SHARDS`` sub-contadores
+elegido al azar y el comando ``rollup_counters`` los consolida
+periódicamente en `apps.qr.models.Counter`. Hay dos backends
+(``QR_COUNTER_BACKEND``):
+
+- ``db``: filas `CounterShard` (``UPDATE ... SET value = value + n``).
+- ``redis``: campos de un hash ``qr:counter:<nombre>`` (``HINCRBY``).
+
+Lecturas:
+
+- ``get_count``: barata y aproximada, cacheada ``QR_COUNTER_CACHE_SECONDS``.
+- ``get_exact_count``: total consolidado más lo pendiente en los shards.
+"""
+
+import random
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.db.models import Sum
+
+from apps.qr.models import Counter
+from apps.qr.models import CounterShard
+
+COUNT_KEY = "qr:count:{name}"
+REDIS_COUNTER_KEY = "qr:counter:{name}"
+# Nombres con incrementos pendientes de consolidar (backend redis).
+REDIS_DIRTY_KEY = "qr:counters:dirty"
+
+
+def scan_counter(code: str) -> str:
+    """Nombre del contador de lecturas de un código."""
+    return f"scan:{code}"
+
+
+def _add_to_totals(totals: dict[str, int]) -> None:
+    for name, amount in totals.items():
+        updated = Counter.objects.filter(name=name).update(total=F("total") + amount)
+        if not updated:
+            counter, created = Counter.objects.get_or_create(
+                name=name,
+                defaults={"total": amount},
+            )
+            if not created:
+                Counter.objects.filter(pk=counter.pk).update(
+                    total=F("total") + amount,
+                )
+
+
+class DatabaseCounterBackend:
+    """Shards como filas de `CounterShard`."""
+
+    def __init__(self, shards: int):
+        self.shards = shards
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        shard = random.randrange(self.shards)  # noqa: S311
+        updated = CounterShard.objects.filter(name=name, shard=shard).update(
+            value=F("value") + amount,
+        )
+        if updated:
+            return
+        row, created = CounterShard.objects.get_or_create(
+            name=name,
+            shard=shard,
+            defaults={"value": amount},
+        )
+        if not created:
+            CounterShard.objects.filter(pk=row.pk).update(value=F("value") + amount)
+
+    def pending(self, names: list[str]) -> dict[str, int]:
+        rows = (
+            CounterShard.objects.filter(name__in=names)
+            .values("name")
+            .annotate(pending=Sum("value"))
+        )
+        return {row["name"]: row["pending"] for row in rows}
+
+    def rollup(self) -> int:
+        """Suma los shards al total y los pone en cero, en una transacción."""
+        with transaction.atomic():
+            shards = list(
+                CounterShard.objects.select_for_update()
+                .filter(value__gt=0)
+                .order_by("name", "shard"),
+            )
+            totals = defaultdict(int)
+            for shard in shards:
+                totals[shard.name] += shard.value
+            CounterShard.objects.filter(pk__in=[s.pk for s in shards]).update(value=0)
+            _add_to_totals(totals)
+        return len(totals)
+
+
+class RedisCounterBackend:
+    """Shards como campos de un hash de Redis."""
+
+    def __init__(self, shards: int):
+        self.shards = shards
+
+    @property
+    def redis(self):
+        from django_redis import get_redis_connection  # noqa: PLC0415
+
+        return get_redis_connection("default")
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        shard = random.randrange(self.shards)  # noqa: S311
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hincrby(REDIS_COUNTER_KEY.format(name=name), shard, amount)
+        pipe.sadd(REDIS_DIRTY_KEY, name)
+        pipe.execute()
+
+    def pending(self, names: list[str]) -> dict[str, int]:
+        pipe = self.redis.pipeline(transaction=False)
+        for name in names:
+            pipe.hvals(REDIS_COUNTER_KEY.format(name=name))
+        values = pipe.execute()
+        return {
+            name: sum(int(v) for v in shard_values)
+            for name, shard_values in zip(names, values, strict=True)
+        }
+
+    def rollup(self, batch_size: int = 1000) -> int:
+        """
+        Consolida los contadores con incrementos pendientes. Lo leído se
+        descuenta del hash con ``HINCRBY`` negativo recién después de
+        escribirlo en la base, así no se pierden los incrementos concurrentes.
+        """
+        rolled = 0
+        while popped := self.redis.spop(REDIS_DIRTY_KEY, batch_size):
+            names = [name.decode() for name in popped]
+            pipe = self.redis.pipeline(transaction=False)
+            for name in names:
+                pipe.hgetall(REDIS_COUNTER_KEY.format(name=name))
+            hashes = dict(zip(names, pipe.execute(), strict=True))
+            totals = {
+                name: sum(int(v) for v in fields.values())
+                for name, fields in hashes.items()
+            }
+            try:
+                with transaction.atomic():
+                    _add_to_totals({n: v for n, v in totals.items() if v})
+            except Exception:
+                self.redis.sadd(REDIS_DIRTY_KEY, *names)
+                raise
+            pipe = self.redis.pipeline(transaction=False)
+            for name, fields in hashes.items():
+                key = REDIS_COUNTER_KEY.format(name=name)
+                for shard, value in fields.items():
+                    pipe.hincrby(key, shard, -int(value))
+            pipe.execute()
+            rolled += len(names)
+        return rolled
+
+
+class ShardedCounters:
+    """Fachada: incrementos en shards y lecturas cacheadas o exactas."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        self.backend.increment(name, amount)
+
+    def increment_many(self, amounts: dict[str, int]) -> None:
+        for name, amount in amounts.items():
+            self.backend.increment(name, amount)
+
+    def get_exact_counts(self, names: list[str]) -> dict[str, int]:
+        totals = dict(
+            Counter.objects.filter(name__in=names).values_list("name", "total"),
+        )
+        pending = self.backend.pending(names)
+        return {name: totals.get(name, 0) + (pending.get(name) or 0) for name in names}
+
+    def get_exact_count(self, name: str) -> int:
+        return self.get_exact_counts([name])[name]
+
+    def get_counts(self, names: list[str]) -> dict[str, int]:
+        """Conteos aproximados, recalculados cada ``QR_COUNTER_CACHE_SECONDS``."""
+        keys = {COUNT_KEY.format(name=name): name for name in names}
+        cached = cache.get_many(list(keys))
+        counts = {keys[key]: value for key, value in cached.items()}
+        missing = [name for name in names if name not in counts]
+        if missing:
+            exact = self.get_exact_counts(missing)
+            cache.set_many(
+                {COUNT_KEY.format(name=name): value for name, value in exact.items()},
+                timeout=getattr(settings, "QR_COUNTER_CACHE_SECONDS", 30),
+            )
+            counts.update(exact)
+        return counts
+
+    def get_count(self, name: str) -> int:
+        return self.get_counts([name])[name]
+
+    def rollup(self) -> int:
+        return self.backend.rollup()
+
+
+_counters: ShardedCounters | None = None
+_counters_lock = threading.Lock()
+
+
+def get_counters() -> ShardedCounters:
+    """Contadores del proceso actual según ``QR_COUNTER_BACKEND``."""
+    global _counters  # noqa: PLW0603
+    if _counters is None:
+        with _counters_lock:
+            if _counters is None:
+                _counters = ShardedCounters(_create_backend())
+    return _counters
+
+
+def _create_backend():
+    backend = getattr(settings, "QR_COUNTER_BACKEND", "db")
+    shards = getattr(settings, "QR_COUNTER_SHARDS", 16)
+    if backend == "redis":
+        return RedisCounterBackend(shards)
+    if backend == "db":
+        return DatabaseCounterBackend(shards)
+    msg = f"QR_COUNTER_BACKEND desconocido: {backend!r}"
+    raise ValueError(msg)
@@ -0,0 +1,179 @@
+"""
+Decodificación de códigos QR en el servidor, para los webviews que no pueden
+escanear desde el navegador.
+
+La imagen se reduce y se pasa a escala de grises con Pillow y se decodifica
+con zxing-cpp dentro de un pool de procesos acotado, para que el trabajo de
+CPU nunca bloquee a los workers que atienden requests. El resultado se
+guarda en el caché y el cliente lo consulta por ``job_id``.
+"""
+
+import io
+import logging
+import multiprocessing
+import threading
+import uuid
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import zxingcpp
+from django.conf import settings
+from django.core.cache import cache
+from PIL import Image
+from PIL import ImageOps
+from PIL import UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+JOB_KEY = "qr:decode:{job_id}"
+
+
+class DecodeQueueFull(Exception):  # noqa: N818
+    """Hay demasiadas decodificaciones en curso; el cliente debe reintentar."""
+
+
+class DecoderRestarting(DecodeQueueFull):
+    """
+    Murió un proceso del pool (OOM, crash del decoder) y el pool quedó roto;
+    se recrea en el próximo pedido.
+    """
+
+
+class InvalidImage(ValueError):  # noqa: N818
+    """El archivo subido no es una imagen válida o es demasiado grande."""
+
+
+def preprocess(data: bytes, max_side: int, max_pixels: int) -> Image.Image:
+    """Abre la imagen, la orienta según EXIF, la pasa a grises y la reduce."""
+    try:
+        image = Image.open(io.BytesIO(data))
+    except (UnidentifiedImageError, OSError) as exc:
+        msg = "Formato de imagen no soportado"
+        raise InvalidImage(msg) from exc
+    width, height = image.size
+    if width * height > max_pixels:
+        msg = f"Imagen demasiado grande ({width}x{height})"
+        raise InvalidImage(msg)
+    # En JPEG, draft() decodifica directamente a menor escala y en grises.
+    image.draft("L", (max_side, max_side))
+    image = ImageOps.exif_transpose(image).convert("L")
+    image.thumbnail((max_side, max_side), Image.Resampling.BILINEAR)
+    return image
+
+
+def decode_image(data: bytes, max_side: int, max_pixels: int) -> list[str]:
+    """Se ejecuta en el pool de procesos: devuelve los textos de los QR hallados."""
+    image = preprocess(data, max_side, max_pixels)
+    results = zxingcpp.read_barcodes(image, formats=zxingcpp.BarcodeFormat.QRCode)
+    return [result.text for result in results if result.valid]
+
+
+class DecodePool:
+    """Pool de procesos con un límite de trabajos en vuelo."""
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # forkserver: no heredamos hilos ni conexiones del worker ASGI.
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("forkserver"),
+                    )
+        return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        """
+        Suelta un pool roto para que el próximo pedido cree otro. El pool roto
+        ya terminó sus procesos y su hilo de control.
+        """
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+
+    def submit(self, data: bytes, *, user_id: int | None = None) -> tuple[str, Future]:
+        if not self._slots.acquire(blocking=False):
+            raise DecodeQueueFull
+        job_id = str(uuid.uuid4())
+        _store(job_id, {"status": "pending", "user_id": user_id})
+        executor = self.executor
+        try:
+            future = executor.submit(
+                decode_image,
+                data,
+                getattr(settings, "QR_DECODE_MAX_SIDE", 1024),
+                getattr(settings, "QR_DECODE_MAX_PIXELS", 40_000_000),
+            )
+        except BrokenProcessPool as exc:
+            self._slots.release()
+            logger.warning("Pool de decodificación QR roto; se recrea")
+            self._discard(executor)
+            raise DecoderRestarting from exc
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(
+            lambda f: self._on_done(job_id, user_id, f, executor),
+        )
+        return job_id, future
+
+    def _on_done(
+        self,
+        job_id: str,
+        user_id: int | None,
+        future: Future,
+        executor: ProcessPoolExecutor,
+    ) -> None:
+        self._slots.release()
+        try:
+            results = future.result()
+        except InvalidImage as exc:
+            job = {"status": "error", "error": str(exc)}
+        except BrokenProcessPool:
+            logger.exception("Se rompió el pool en la decodificación %s", job_id)
+            self._discard(executor)
+            job = {"status": "error", "error": "No se pudo procesar la imagen"}
+        except Exception:
+            logger.exception("Falló la decodificación QR %s", job_id)
+            job = {"status": "error", "error": "No se pudo procesar la imagen"}
+        else:
+            job = {"status": "done", "results": results}
+        _store(job_id, {**job, "user_id": user_id})
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+
+def _store(job_id: str, job: dict) -> None:
+    timeout = getattr(settings, "QR_DECODE_RESULT_TTL", 300)
+    cache.set(JOB_KEY.format(job_id=job_id), job, timeout=timeout)
+
+
+def get_job(job_id: str) -> dict | None:
+    return cache.get(JOB_KEY.format(job_id=job_id))
+
+
+_pool: DecodePool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_decode_pool() -> DecodePool:
+    global _pool  # noqa: PLW0603
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = DecodePool(
+                    max_workers=getattr(settings, "QR_DECODE_WORKERS", 2),
+                    max_pending=getattr(settings, "QR_DECODE_MAX_PENDING", 16),
+                )
+    return _pool
@@ -0,0 +1,68 @@
+"""
+Management command que vuelca a PostgreSQL las lecturas QR del stream de Redis.
+
+Uso:
+    python manage.py flush_scan_events [--once]
+
+Sólo aplica con ``QR_SCAN_BUFFER_BACKEND = "redis"``; con el backend en memoria
+cada worker vuelca su propio buffer.
+"""
+
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import DatabaseError
+from django.db import close_old_connections
+
+from apps.qr.scans import RedisStreamScanBuffer
+from apps.qr.scans import get_scan_buffer
+
+
+class Command(BaseCommand):
+    help = "Consume el stream de lecturas QR y las escribe en lote"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Vuelca lo pendiente y termina",
+        )
+        parser.add_argument(
+            "--stats-every",
+            type=int,
+            default=60,
+            help="Segundos entre reportes de métricas (0 para desactivar)",
+        )
+
+    def handle(self, *args, **options):
+        buffer = get_scan_buffer()
+        if not isinstance(buffer, RedisStreamScanBuffer):
+            msg = "flush_scan_events requiere QR_SCAN_BUFFER_BACKEND='redis'"
+            raise CommandError(msg)
+
+        if options["once"]:
+            flushed = buffer.flush()
+            self.stdout.write(self.style.SUCCESS(f"✅ {flushed} lecturas volcadas"))
+            self._write_stats(buffer)
+            return
+
+        self.stdout.write(f"📥 Consumiendo lecturas QR como {buffer.consumer}")
+        reported_at = time.monotonic()
+        while True:
+            close_old_connections()
+            try:
+                buffer.consume()
+            except DatabaseError as exc:
+                # Sin XACK: los eventos se reintentan en la próxima vuelta.
+                buffer.stats.failures += 1
+                self.stderr.write(f"❌ Error escribiendo el lote: {exc}")
+                time.sleep(1)
+            every = options["stats_every"]
+            if every and time.monotonic() - reported_at >= every:
+                self._write_stats(buffer)
+                reported_at = time.monotonic()
+
+    def _write_stats(self, buffer):
+        self.stdout.write(json.dumps(buffer.stats.as_dict()))
@@ -0,0 +1,31 @@
+"""
+Management command para revocar (o rehabilitar) códigos QR.
+
+Uso:
+    python manage.py revoke_qr_code <codigo> [<codigo> ...] [--undo]
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.qr.revocation import revocations
+
+
+class Command(BaseCommand):
+    help = "Revoca códigos QR firmados en todos los workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument("codes", nargs="+", help="Códigos a revocar")
+        parser.add_argument(
+            "--undo",
+            action="store_true",
+            help="Rehabilita los códigos en lugar de revocarlos",
+        )
+
+    def handle(self, *args, **options):
+        for code in options["codes"]:
+            if options["undo"]:
+                revocations.unrevoke(code)
+                self.stdout.write(self.style.SUCCESS(f"✅ {code} rehabilitado"))
+            else:
+                revocations.revoke(code)
+                self.stdout.write(self.style.SUCCESS(f"🚫 {code} revocado"))
@@ -0,0 +1,57 @@
+"""
+Management command que consolida los contadores repartidos en shards.
+
+Uso:
+    python manage.py rollup_counters [--once] [--interval 30]
+
+Suma los incrementos pendientes (filas ``CounterShard`` o hashes de Redis,
+según ``QR_COUNTER_BACKEND``) al total de cada ``Counter``.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError
+from django.db import close_old_connections
+
+from apps.qr.counters import get_counters
+
+
+class Command(BaseCommand):
+    help = "Consolida los contadores de lecturas QR"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Consolida una vez y termina",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=30,
+            help="Segundos entre consolidaciones",
+        )
+
+    def handle(self, *args, **options):
+        counters = get_counters()
+        if options["once"]:
+            rolled = counters.rollup()
+            self.stdout.write(
+                self.style.SUCCESS(f"✅ {rolled} contadores consolidados"),
+            )
+            return
+
+        while True:
+            close_old_connections()
+            started = time.monotonic()
+            try:
+                rolled = counters.rollup()
+            except DatabaseError as exc:
+                self.stderr.write(f"❌ Error consolidando contadores: {exc}")
+            else:
+                elapsed = (time.monotonic() - started) * 1000
+                self.stdout.write(
+                    f"{rolled} contadores consolidados en {elapsed:.1f} ms",
+                )
+            time.sleep(options["interval"])
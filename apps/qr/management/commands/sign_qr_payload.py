@@ -0,0 +1,36 @@
+"""
+Management command para generar el payload firmado de un código QR.
+
+Uso:
+    python manage.py sign_qr_payload <codigo> [--max-age SEGUNDOS]
+"""
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from apps.qr.signing import sign_payload
+
+
+class Command(BaseCommand):
+    help = "Genera el payload firmado (HMAC + kid) para imprimir en un código QR"
+
+    def add_arguments(self, parser):
+        parser.add_argument("code", help="Identificador del código")
+        parser.add_argument(
+            "--max-age",
+            type=int,
+            default=None,
+            help="Segundos de validez del payload (por defecto no expira)",
+        )
+        parser.add_argument("--key-id", default=None, help="kid de la clave a usar")
+
+    def handle(self, *args, **options):
+        try:
+            payload = sign_payload(
+                options["code"],
+                max_age=options["max_age"],
+                key_id=options["key_id"],
+            )
+        except (KeyError, ValueError) as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(payload)
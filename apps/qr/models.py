@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.db import models
+
+
+class ScanEvent(models.Model):
+    """
+    Lectura de un código QR. Se escriben en lote desde `apps.qr.scans`,
+    nunca una fila por request.
+    """
+
+    # Identificador idempotente: reintentar un lote no duplica filas.
+    event_id = models.CharField(max_length=64, unique=True)
+    code = models.CharField(max_length=255, db_index=True)
+    scanned_at = models.DateTimeField(db_index=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+    user_agent = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        ordering = ["-scanned_at"]
+
+    def __str__(self):
+        return f"{self.code} @ {self.scanned_at:%Y-%m-%d %H:%M:%S}"
+
+
+class ShortLink(models.Model):
+    """
+    URL corta impresa en un código QR: ``/s/<code>`` redirige a ``target``.
+    Se resuelve en `apps.qr.shortlinks`, antes de entrar a Django.
+    """
+
+    code = models.SlugField(max_length=64, unique=True)
+    target = models.URLField(max_length=2048)
+    is_active = models.BooleanField(default=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.code} -> {self.target}"
+
+
+class Counter(models.Model):
+    """
+    Total consolidado de un contador (p. ej. ``scan:<código>``). Los
+    incrementos van a `CounterShard` o a Redis y el job ``rollup_counters``
+    los suma acá (ver `apps.qr.counters`).
+    """
+
+    name = models.CharField(max_length=255, unique=True)
+    total = models.BigIntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.total}"
+
+
+class CounterShard(models.Model):
+    """Una de las N filas en las que se reparten los incrementos de un contador."""
+
+    name = models.CharField(max_length=255)
+    shard = models.PositiveSmallIntegerField()
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["name", "shard"],
+                name="qr_countershard_unique_name_shard",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name}[{self.shard}]: {self.value}"
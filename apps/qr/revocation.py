@@ -0,0 +1,161 @@
+"""
+Revocación de códigos QR con un filtro de Bloom en memoria.
+
+La lista de revocados vive en el caché compartido (Redis en producción):
+
+- ``qr:revoked:<código>``: marca exacta de cada código revocado.
+- ``qr:revocation:bloom``: filtro de Bloom serializado con todos los revocados.
+- ``qr:revocation:version``: cambia (uuid) en cada revocación.
+
+Cada proceso mantiene una copia del filtro y sólo la vuelve a descargar
+cuando cambia la versión (consultada como máximo cada
+``QR_REVOCATION_REFRESH_SECONDS``). Un código que no está en el filtro se
+acepta sin ir a la red; los positivos se confirman con la marca exacta.
+
+Todas las lecturas van directo al caché compartido (``shared_get``), nunca a
+un L1 de proceso: la copia local ya es el L1, y un filtro viejo leído al
+revocar pisaría las revocaciones de otro proceso.
+"""
+
+import hashlib
+import logging
+import math
+import struct
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.cache import shared_get
+
+logger = logging.getLogger(__name__)
+
+BLOOM_KEY = "qr:revocation:bloom"
+VERSION_KEY = "qr:revocation:version"
+LOCK_KEY = "qr:revocation:lock"
+REVOKED_KEY = "qr:revoked:{code}"
+
+_BLOOM_HEADER = struct.Struct(">II")
+
+
+class BloomFilter:
+    """Filtro de Bloom simple con doble hashing sobre blake2b."""
+
+    def __init__(self, size: int, hashes: int, bits: bytes | None = None):
+        self.size = size
+        self.hashes = hashes
+        self.bits = bytearray(bits) if bits else bytearray((size + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float = 0.001):
+        size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        hashes = max(1, round(size / capacity * math.log(2)))
+        return cls(size, hashes)
+
+    @classmethod
+    def from_bytes(cls, data: bytes):
+        size, hashes = _BLOOM_HEADER.unpack_from(data)
+        return cls(size, hashes, data[_BLOOM_HEADER.size :])
+
+    def to_bytes(self) -> bytes:
+        return _BLOOM_HEADER.pack(self.size, self.hashes) + bytes(self.bits)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item)
+        )
+
+
+class RevocationList:
+    """Copia local del filtro de revocados, refrescada desde el caché compartido."""
+
+    def __init__(self):
+        self._bloom: BloomFilter | None = None
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _empty_bloom(self) -> BloomFilter:
+        return BloomFilter.for_capacity(
+            getattr(settings, "QR_REVOCATION_CAPACITY", 100_000),
+            getattr(settings, "QR_REVOCATION_ERROR_RATE", 0.001),
+        )
+
+    def refresh(self, *, force: bool = False) -> None:
+        """Descarga el filtro si la versión en el caché cambió."""
+        interval = getattr(settings, "QR_REVOCATION_REFRESH_SECONDS", 5)
+        now = time.monotonic()
+        if not force and now - self._checked_at < interval:
+            return
+        with self._lock:
+            self._checked_at = now
+            version = shared_get(cache, VERSION_KEY)
+            if version == self._version and self._bloom is not None:
+                return
+            data = shared_get(cache, BLOOM_KEY)
+            self._bloom = BloomFilter.from_bytes(data) if data else None
+            self._version = version
+
+    def is_revoked(self, code: str) -> bool:
+        self.refresh()
+        if self._bloom is None or code not in self._bloom:
+            return False
+        # Posible falso positivo: confirmamos con la marca exacta.
+        return bool(shared_get(cache, REVOKED_KEY.format(code=code)))
+
+    def revoke(self, code: str) -> None:
+        """Revoca ``code`` para todos los procesos."""
+        cache.set(REVOKED_KEY.format(code=code), 1, timeout=None)
+        with _CacheLock(LOCK_KEY):
+            data = shared_get(cache, BLOOM_KEY)
+            bloom = BloomFilter.from_bytes(data) if data else self._empty_bloom()
+            bloom.add(code)
+            cache.set(BLOOM_KEY, bloom.to_bytes(), timeout=None)
+            cache.set(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        self.refresh(force=True)
+
+    def unrevoke(self, code: str) -> None:
+        """
+        Quita la marca exacta. El filtro no admite borrados, así que el código
+        seguirá dando positivo en el filtro pero se aceptará tras confirmarlo.
+        """
+        cache.delete(REVOKED_KEY.format(code=code))
+
+
+class _CacheLock:
+    """Lock entre procesos basado en ``cache.add`` (sirve con Redis y locmem)."""
+
+    def __init__(self, key: str, timeout: int = 10):
+        self.key = key
+        self.timeout = timeout
+        self.acquired = False
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.timeout
+        while not cache.add(self.key, 1, timeout=self.timeout):
+            if time.monotonic() > deadline:
+                logger.warning("Siguiendo sin el lock %s por timeout", self.key)
+                return self
+            time.sleep(0.01)
+        self.acquired = True
+        return self
+
+    def __exit__(self, *exc_info):
+        # Sin el lock, la clave es de otro proceso: no la soltamos.
+        if self.acquired:
+            cache.delete(self.key)
+
+
+revocations = RevocationList()
@@ -0,0 +1,500 @@
+"""
+Registro write-behind de lecturas de códigos QR.
+
+Las lecturas no se insertan una por una dentro de la transacción del request:
+se agregan a un buffer y se vuelcan a PostgreSQL con ``bulk_create`` cuando
+se alcanza ``QR_SCAN_BUFFER_SIZE`` eventos o pasan ``QR_SCAN_FLUSH_INTERVAL``
+segundos. Hay dos backends (``QR_SCAN_BUFFER_BACKEND``):
+
+- ``memory``: buffer por worker con un hilo que vuelca en segundo plano.
+  Semántica *at-most-once*: si el proceso muere sin apagarse ordenadamente se
+  pierden los eventos pendientes (en un apagado normal se vuelcan con atexit).
+- ``redis``: cada lectura es un ``XADD`` a un stream de Redis y el comando
+  ``flush_scan_events`` lo consume con un consumer group. Un evento sólo se
+  confirma (``XACK``) y se borra del stream después de que el lote se
+  escribió; si el consumidor muere antes, otro lo reclama. Semántica
+  *at-least-once*: los reintentos no duplican filas porque ``event_id`` es
+  único. Con ``QR_SCAN_MAX_PENDING`` eventos sin confirmar, las lecturas
+  nuevas se descartan (y se cuentan) en vez de recortar el stream. Si Redis
+  no responde, la lectura también se descarta y se cuenta: el buffer nunca
+  hace fallar el escaneo.
+
+Si la base rechaza un lote (p. ej. el usuario de una lectura se borró antes
+del volcado), se reescribe fila por fila y sólo se apartan las filas que
+siguen fallando. Un lote que falla ``QR_SCAN_MAX_ATTEMPTS`` veces deja de
+reintentarse: en memoria se descarta, en Redis pasa a ``qr:scans:dead``.
+"""
+
+import atexit
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from dataclasses import field
+from dataclasses import replace
+from datetime import UTC
+from datetime import datetime
+from functools import cached_property
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError
+from django.db import IntegrityError
+from django.db import close_old_connections
+from django.db import transaction
+
+from apps.qr.counters import get_counters
+from apps.qr.counters import scan_counter
+from apps.qr.models import ScanEvent
+
+logger = logging.getLogger(__name__)
+
+STREAM_KEY = "qr:scans"
+STREAM_GROUP = "scan-flushers"
+DEAD_LETTER_KEY = "qr:scans:dead"
+
+# XADD sólo si el stream no llegó al tope: nunca se recortan eventos sin
+# confirmar.
+APPEND_SCRIPT = """
+if redis.call("XLEN", KEYS[1]) >= tonumber(ARGV[1]) then
+    return false
+end
+return redis.call("XADD", KEYS[1], "*", unpack(ARGV, 2))
+"""
+
+
+@dataclass(slots=True)
+class Scan:
+    code: str
+    scanned_at: float = field(default_factory=time.time)
+    user_id: int | None = None
+    user_agent: str = ""
+    event_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    attempts: int = 0
+
+    def to_model(self) -> ScanEvent:
+        return ScanEvent(
+            event_id=self.event_id,
+            code=self.code,
+            scanned_at=datetime.fromtimestamp(self.scanned_at, tz=UTC),
+            user_id=self.user_id,
+            user_agent=self.user_agent[:255],
+        )
+
+    def to_fields(self) -> dict[str, str]:
+        """Campos de la entrada en el stream de Redis."""
+        return {
+            "code": self.code,
+            "scanned_at": repr(self.scanned_at),
+            "user_id": "" if self.user_id is None else str(self.user_id),
+            "user_agent": self.user_agent[:255],
+        }
+
+
+@dataclass
+class FlushStats:
+    """Métricas de volcado: cantidad, duración y antigüedad de los eventos."""
+
+    flushes: int = 0
+    events: int = 0
+    failures: int = 0
+    dropped: int = 0
+    # Filas que la base rechazó aun escritas de a una.
+    rejected: int = 0
+    last_batch: int = 0
+    last_duration_ms: float = 0.0
+    max_duration_ms: float = 0.0
+    total_duration_ms: float = 0.0
+    # Tiempo entre la lectura más vieja del lote y su escritura en la base.
+    last_lag_ms: float = 0.0
+    max_lag_ms: float = 0.0
+
+    def record(self, batch: list[Scan], duration: float) -> None:
+        duration_ms = duration * 1000
+        lag_ms = (time.time() - min(s.scanned_at for s in batch)) * 1000
+        self.flushes += 1
+        self.events += len(batch)
+        self.last_batch = len(batch)
+        self.last_duration_ms = duration_ms
+        self.max_duration_ms = max(self.max_duration_ms, duration_ms)
+        self.total_duration_ms += duration_ms
+        self.last_lag_ms = lag_ms
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+
+    def as_dict(self) -> dict:
+        avg = self.total_duration_ms / self.flushes if self.flushes else 0.0
+        return {
+            "flushes": self.flushes,
+            "events": self.events,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "last_batch": self.last_batch,
+            "last_duration_ms": round(self.last_duration_ms, 2),
+            "avg_duration_ms": round(avg, 2),
+            "max_duration_ms": round(self.max_duration_ms, 2),
+            "last_lag_ms": round(self.last_lag_ms, 2),
+            "max_lag_ms": round(self.max_lag_ms, 2),
+        }
+
+
+def write_batch(batch: list[Scan], stats: FlushStats) -> list[Scan]:
+    """
+    Escribe un lote en una sola sentencia; idempotente por ``event_id``.
+    Devuelve las lecturas que la base rechazó (ver ``_write_rows``).
+    """
+    started = time.perf_counter()
+    try:
+        ScanEvent.objects.bulk_create(
+            [scan.to_model() for scan in batch],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+        rejected = []
+    except IntegrityError:
+        # ignore_conflicts no cubre las FK, que se chequean al commit.
+        rejected = _write_rows(batch)
+    written = [scan for scan in batch if scan not in rejected]
+    stats.rejected += len(rejected)
+    if written:
+        stats.record(written, time.perf_counter() - started)
+        logger.debug("Volcadas %s lecturas QR: %s", len(written), stats.as_dict())
+        _count_scans(written)
+    return rejected
+
+
+def _write_rows(batch: list[Scan]) -> list[Scan]:
+    """
+    Reescribe un lote rechazado de a una fila. Las lecturas de usuarios que ya
+    no existen quedan sin usuario, como haría ``on_delete=SET_NULL``; devuelve
+    las que la base siga rechazando.
+    """
+    user_ids = {scan.user_id for scan in batch if scan.user_id is not None}
+    existing = set(
+        get_user_model().objects.filter(pk__in=user_ids).values_list("pk", flat=True),
+    )
+    rejected = []
+    for scan in batch:
+        row = scan
+        if scan.user_id is not None and scan.user_id not in existing:
+            row = replace(scan, user_id=None)
+        try:
+            with transaction.atomic():
+                ScanEvent.objects.bulk_create([row.to_model()], ignore_conflicts=True)
+        except IntegrityError:
+            logger.exception("La base rechazó la lectura QR %s", scan.event_id)
+            rejected.append(scan)
+    return rejected
+
+
+def _count_scans(batch: list[Scan]) -> None:
+    """
+    Suma las lecturas del lote a los contadores por código: un incremento por
+    código y por lote, no uno por lectura. Si un lote se reintenta, el
+    contador puede contarlo dos veces; el conteo exacto sale de ``ScanEvent``.
+    """
+    amounts: dict[str, int] = {}
+    for scan in batch:
+        name = scan_counter(scan.code)
+        amounts[name] = amounts.get(name, 0) + 1
+    try:
+        get_counters().increment_many(amounts)
+    except Exception:
+        logger.exception("No se pudieron actualizar los contadores de lecturas")
+
+
+class MemoryScanBuffer:
+    """Buffer en memoria por worker, volcado por tamaño o por tiempo."""
+
+    def __init__(
+        self,
+        max_size: int,
+        flush_interval: float,
+        max_pending: int,
+        max_attempts: int = 5,
+    ):
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.stats = FlushStats()
+        self._events: deque[Scan] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __len__(self):
+        return len(self._events)
+
+    def append(self, scan: Scan) -> None:
+        with self._lock:
+            self._events.append(scan)
+            full = len(self._events) >= self.max_size
+        if not self.flush_interval:
+            # Sin hilo de fondo (tests, scripts): se vuelca en línea.
+            if full:
+                self.flush()
+            return
+        self._ensure_thread()
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Vuelca todo lo pendiente. Si la base falla, los eventos vuelven al buffer."""
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self._events)
+                self._events.clear()
+            if not batch:
+                return 0
+            try:
+                rejected = write_batch(batch, self.stats)
+            except DatabaseError:
+                logger.exception("No se pudieron volcar %s lecturas QR", len(batch))
+                self.stats.failures += 1
+                self._requeue(batch)
+                return 0
+            return len(batch) - len(rejected)
+
+    def _requeue(self, batch: list[Scan]) -> None:
+        retry = [
+            replace(scan, attempts=scan.attempts + 1)
+            for scan in batch
+            if scan.attempts + 1 < self.max_attempts
+        ]
+        if len(retry) < len(batch):
+            logger.error(
+                "Se descartan %s lecturas QR tras %s intentos",
+                len(batch) - len(retry),
+                self.max_attempts,
+            )
+            self.stats.dropped += len(batch) - len(retry)
+        with self._lock:
+            self._events.extendleft(reversed(retry))
+            overflow = len(self._events) - self.max_pending
+            for _ in range(max(overflow, 0)):
+                self._events.popleft()
+                self.stats.dropped += 1
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="qr-scan-flusher",
+                    daemon=True,
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Error inesperado volcando lecturas QR")
+
+
+class RedisStreamScanBuffer:
+    """Stream de Redis con consumer group y confirmación tras escribir."""
+
+    def __init__(
+        self,
+        max_size: int,
+        max_pending: int,
+        claim_idle_ms: int = 60_000,
+        max_attempts: int = 5,
+    ):
+        self.max_size = max_size
+        self.max_pending = max_pending
+        self.claim_idle_ms = claim_idle_ms
+        self.max_attempts = max_attempts
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self.stats = FlushStats()
+
+    @property
+    def redis(self):
+        from django_redis import get_redis_connection  # noqa: PLC0415
+
+        return get_redis_connection("default")
+
+    @cached_property
+    def _append_script(self):
+        return self.redis.register_script(APPEND_SCRIPT)
+
+    def append(self, scan: Scan) -> None:
+        from redis.exceptions import RedisError  # noqa: PLC0415
+
+        fields = [item for pair in scan.to_fields().items() for item in pair]
+        try:
+            added = self._append_script(
+                keys=[STREAM_KEY],
+                args=[self.max_pending, *fields],
+            )
+        except (RedisError, OSError):
+            self.stats.dropped += 1
+            logger.exception("Redis no guardó la lectura QR %s; se descarta", scan.code)
+            return
+        if added is None:
+            self.stats.dropped += 1
+            logger.warning("Stream de lecturas QR lleno; se descarta %s", scan.code)
+
+    def _ensure_group(self) -> None:
+        import redis  # noqa: PLC0415
+
+        try:
+            self.redis.xgroup_create(STREAM_KEY, STREAM_GROUP, id="0", mkstream=True)
+        except redis.ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    @staticmethod
+    def _decode(entries) -> list[Scan]:
+        scans = []
+        for entry_id, data in entries:
+            values = {k.decode(): v.decode() for k, v in data.items()}
+            scans.append(
+                Scan(
+                    # El id del stream hace idempotente el reintento.
+                    event_id=entry_id.decode(),
+                    code=values["code"],
+                    scanned_at=float(values["scanned_at"]),
+                    user_id=int(values["user_id"]) if values["user_id"] else None,
+                    user_agent=values.get("user_agent", ""),
+                ),
+            )
+        return scans
+
+    def consume(self, block_ms: int | None = 2000) -> int:
+        """
+        Lee un lote (primero reclama los pendientes de consumidores caídos),
+        lo escribe y recién entonces lo confirma con ``XACK``.
+        """
+        self._ensure_group()
+        _, entries, *_ = self.redis.xautoclaim(
+            STREAM_KEY,
+            STREAM_GROUP,
+            self.consumer,
+            min_idle_time=self.claim_idle_ms,
+            count=self.max_size,
+        )
+        if not entries:
+            response = self.redis.xreadgroup(
+                STREAM_GROUP,
+                self.consumer,
+                {STREAM_KEY: ">"},
+                count=self.max_size,
+                block=block_ms,
+            )
+            entries = response[0][1] if response else []
+        else:
+            entries = self._dead_letter_exhausted(entries)
+        entries = [(entry_id, data) for entry_id, data in entries if data]
+        if not entries:
+            return 0
+        rejected = write_batch(self._decode(entries), self.stats)
+        self._dead_letter(rejected)
+        self._ack([entry_id for entry_id, _ in entries])
+        return len(entries) - len(rejected)
+
+    def _ack(self, entry_ids) -> None:
+        # Confirmados y borrados: XLEN cuenta sólo lo que falta volcar.
+        pipe = self.redis.pipeline()
+        pipe.xack(STREAM_KEY, STREAM_GROUP, *entry_ids)
+        pipe.xdel(STREAM_KEY, *entry_ids)
+        pipe.execute()
+
+    def _dead_letter(self, scans: list[Scan]) -> None:
+        if not scans:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for scan in scans:
+            pipe.xadd(DEAD_LETTER_KEY, {"event_id": scan.event_id, **scan.to_fields()})
+        pipe.execute()
+
+    def _dead_letter_exhausted(self, entries):
+        """Aparta las entradas reclamadas que ya fallaron ``max_attempts`` veces."""
+        ids = [entry_id for entry_id, _ in entries]
+        pending = self.redis.xpending_range(
+            STREAM_KEY,
+            STREAM_GROUP,
+            min=ids[0],
+            max=ids[-1],
+            count=len(ids),
+            consumername=self.consumer,
+        )
+        exhausted = {
+            item["message_id"]
+            for item in pending
+            if item["times_delivered"] > self.max_attempts
+        }
+        if not exhausted:
+            return entries
+        dead = [entry for entry in entries if entry[0] in exhausted and entry[1]]
+        logger.error("%s lecturas QR pasan a %s", len(dead), DEAD_LETTER_KEY)
+        self._dead_letter(self._decode(dead))
+        self._ack(list(exhausted))
+        self.stats.dropped += len(dead)
+        return [entry for entry in entries if entry[0] not in exhausted]
+
+    def flush(self) -> int:
+        flushed = 0
+        while count := self.consume(block_ms=None):
+            flushed += count
+        return flushed
+
+    def __len__(self):
+        return self.redis.xlen(STREAM_KEY)
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_scan_buffer():
+    """Buffer del proceso actual según ``QR_SCAN_BUFFER_BACKEND``."""
+    global _buffer  # noqa: PLW0603
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = _create_buffer()
+    return _buffer
+
+
+def _create_buffer():
+    backend = getattr(settings, "QR_SCAN_BUFFER_BACKEND", "memory")
+    max_size = getattr(settings, "QR_SCAN_BUFFER_SIZE", 500)
+    max_pending = getattr(settings, "QR_SCAN_MAX_PENDING", 100_000)
+    max_attempts = getattr(settings, "QR_SCAN_MAX_ATTEMPTS", 5)
+    if backend == "redis":
+        return RedisStreamScanBuffer(
+            max_size=max_size,
+            max_pending=max_pending,
+            max_attempts=max_attempts,
+        )
+    if backend == "memory":
+        buffer = MemoryScanBuffer(
+            max_size=max_size,
+            flush_interval=getattr(settings, "QR_SCAN_FLUSH_INTERVAL", 2.0),
+            max_pending=max_pending,
+            max_attempts=max_attempts,
+        )
+        atexit.register(buffer.flush)
+        return buffer
+    msg = f"QR_SCAN_BUFFER_BACKEND desconocido: {backend!r}"
+    raise ValueError(msg)
+
+
+def record_scan(code: str, *, user=None, user_agent: str = "") -> None:
+    """Registra una lectura sin escribir en la base dentro del request."""
+    user_id = user.pk if user is not None and user.is_authenticated else None
+    get_scan_buffer().append(Scan(code=code, user_id=user_id, user_agent=user_agent))
@@ -0,0 +1,183 @@
+"""
+Resolución de URLs cortas (``/s/<código>``) sin pasar por Django.
+
+Cada lectura de un QR impreso es un redirect, así que ``ShortLinkResolver``
+se monta en ``config.asgi.application`` delante de Django: no hay sesión,
+CSRF, locale, allauth ni transacción. La búsqueda código → destino pasa por
+tres niveles:
+
+1. LRU en memoria del proceso (``QR_SHORTLINK_LOCAL_SIZE`` entradas, válidas
+   ``QR_SHORTLINK_LOCAL_TTL`` segundos).
+2. Caché compartido (Redis en producción), clave ``qr:link:<código>``.
+3. Base de datos, con una sola consulta por código aunque lleguen muchas
+   lecturas a la vez.
+
+Los códigos inexistentes también se cachean (``QR_SHORTLINK_NEGATIVE_TTL``).
+Al guardar o borrar un ``ShortLink`` se invalida el caché compartido; los
+demás procesos ven el cambio cuando vence su copia local.
+La lectura se registra después de enviar la respuesta (`apps.qr.scans`).
+"""
+
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signals
+from django.core.cache import cache
+from django.utils.encoding import iri_to_uri
+
+from apps.core.cache import LRUCache
+from apps.qr.models import ShortLink
+from apps.qr.scans import record_scan
+
+logger = logging.getLogger(__name__)
+
+LINK_KEY = "qr:link:{code}"
+# Marca de "código inexistente" en los cachés (None significa "no cacheado").
+MISSING = ""
+
+
+def _load_target(code: str) -> str:
+    # Igual que en un request de Django: se cierran las conexiones vencidas
+    # (CONN_MAX_AGE) o se devuelven al pool, antes y después de usar la base.
+    signals.request_started.send(sender=ShortLinkResolver)
+    try:
+        target = (
+            ShortLink.objects.filter(code=code, is_active=True)
+            .values_list("target", flat=True)
+            .first()
+        )
+    finally:
+        signals.request_finished.send(sender=ShortLinkResolver)
+    return target or MISSING
+
+
+class LinkStore:
+    """Búsqueda código → destino en LRU local, caché compartido y base de datos."""
+
+    def __init__(self):
+        self.local = LRUCache(
+            max_size=getattr(settings, "QR_SHORTLINK_LOCAL_SIZE", 10_000),
+            ttl=getattr(settings, "QR_SHORTLINK_LOCAL_TTL", 60),
+        )
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def resolve(self, code: str) -> str | None:
+        """Destino de ``code`` o ``None`` si no existe o está inactivo."""
+        target = self.local.get(code)
+        if target is None:
+            target = await self._fetch(code)
+        return target or None
+
+    async def _fetch(self, code: str) -> str:
+        # Las lecturas simultáneas de un mismo código esperan a una sola búsqueda.
+        pending = self._inflight.get(code)
+        if pending is not None and pending.get_loop() is asyncio.get_running_loop():
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[code] = future
+        try:
+            target = await self._fetch_shared(code)
+        except Exception as exc:
+            future.set_exception(exc)
+            # Evita el aviso de "excepción nunca recuperada" si nadie esperaba.
+            future.exception()
+            raise
+        else:
+            future.set_result(target)
+        finally:
+            self._inflight.pop(code, None)
+        return target
+
+    async def _fetch_shared(self, code: str) -> str:
+        key = LINK_KEY.format(code=code)
+        target = await cache.aget(key)
+        if target is None:
+            target = await sync_to_async(_load_target)(code)
+            await cache.aset(key, target, timeout=self._ttl_for(target))
+        self.local.set(code, target, ttl=self._local_ttl_for(target))
+        return target
+
+    @staticmethod
+    def _ttl_for(target: str) -> int | None:
+        if target == MISSING:
+            return getattr(settings, "QR_SHORTLINK_NEGATIVE_TTL", 30)
+        return getattr(settings, "QR_SHORTLINK_SHARED_TTL", 24 * 60 * 60)
+
+    def _local_ttl_for(self, target: str) -> float:
+        if target == MISSING:
+            return min(self.local.ttl, self._ttl_for(target))
+        return self.local.ttl
+
+    def invalidate(self, code: str) -> None:
+        self.local.delete(code)
+        cache.delete(LINK_KEY.format(code=code))
+
+
+links = LinkStore()
+
+
+def invalidate_link(code: str) -> None:
+    """Olvida el destino cacheado de ``code`` (al editar o borrar el link)."""
+    links.invalidate(code)
+
+
+class ShortLinkResolver:
+    """
+    Aplicación ASGI que responde ``GET``/``HEAD`` a ``QR_SHORTLINK_PREFIX``
+    con un 302 y delega todo lo demás en ``app``.
+    """
+
+    def __init__(self, app, store: LinkStore | None = None):
+        self.app = app
+        self.store = store or links
+        self.prefix = getattr(settings, "QR_SHORTLINK_PREFIX", "/s/")
+
+    async def __call__(self, scope, receive, send):
+        code = self._match(scope)
+        if code is None:
+            await self.app(scope, receive, send)
+            return
+
+        target = await self.store.resolve(code)
+        if target is None:
+            await _send(send, 404, [(b"content-type", b"text/plain")], b"Not Found")
+            return
+
+        headers = [
+            (b"location", iri_to_uri(target).encode("latin-1")),
+            (b"cache-control", b"no-store"),
+        ]
+        await _send(send, 302, headers)
+        if scope["method"] == "GET":
+            await self._record(code, scope)
+
+    def _match(self, scope) -> str | None:
+        if scope["type"] != "http" or scope["method"] not in {"GET", "HEAD"}:
+            return None
+        path = scope["path"]
+        if not path.startswith(self.prefix):
+            return None
+        code = path[len(self.prefix) :].rstrip("/")
+        if not code or "/" in code:
+            return None
+        return code
+
+    @staticmethod
+    async def _record(code: str, scope) -> None:
+        user_agent = dict(scope["headers"]).get(b"user-agent", b"")
+        try:
+            # Con el backend de Redis es un XADD: no ocupa el event loop.
+            await sync_to_async(record_scan, thread_sensitive=False)(
+                code,
+                user_agent=user_agent.decode("latin-1"),
+            )
+        except Exception:
+            logger.exception("No se pudo registrar la lectura de %s", code)
+
+
+async def _send(send, status: int, headers: list, body: bytes = b"") -> None:
+    headers = [*headers, (b"content-length", str(len(body)).encode())]
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.qr.models import ShortLink
+from apps.qr.shortlinks import invalidate_link
+
+
+@receiver(post_save, sender=ShortLink)
+@receiver(post_delete, sender=ShortLink)
+def short_link_changed(sender, instance, **kwargs):
+    invalidate_link(instance.code)
@@ -0,0 +1,139 @@
+"""
+Formato compacto y firmado para los payloads de los códigos QR.
+
+Un payload tiene la forma ``<kid>.<cuerpo>.<mac>``:
+
+- ``kid``: identificador de la clave HMAC usada para firmar (permite rotarlas).
+- ``cuerpo``: base64url de ``versión (1 byte) + expiración (uint32) + código``.
+- ``mac``: base64url de los primeros 16 bytes de HMAC-SHA256 sobre ``kid.cuerpo``.
+
+La verificación se hace en memoria y en tiempo constante, sin consultar la
+base de datos. La revocación se consulta en `apps.qr.revocation`.
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import struct
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signing import BadSignature
+from django.core.signing import SignatureExpired
+
+from apps.qr.revocation import revocations
+
+PAYLOAD_VERSION = 1
+MAC_LENGTH = 16
+_HEADER = struct.Struct(">BI")
+
+
+class RevokedPayload(BadSignature):
+    """El payload tiene una firma válida pero el código fue revocado."""
+
+
+@dataclass(frozen=True, slots=True)
+class QRPayload:
+    code: str
+    key_id: str
+    expires_at: int | None = None
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+@lru_cache(maxsize=32)
+def _derive_key(secret: str) -> bytes:
+    # Derivamos la clave para no reutilizar el secreto tal cual en otro contexto.
+    return hashlib.sha256(b"apps.qr.signing:" + secret.encode()).digest()
+
+
+def _get_keys() -> dict[str, str]:
+    """
+    Claves configuradas en ``QR_SIGNING_KEYS`` (``{kid: secreto}``).
+    Si no hay ninguna, se usa una clave derivada de ``SECRET_KEY`` con kid ``0``.
+    """
+    return getattr(settings, "QR_SIGNING_KEYS", None) or {"0": settings.SECRET_KEY}
+
+
+def _get_current_key_id() -> str:
+    keys = _get_keys()
+    key_id = getattr(settings, "QR_SIGNING_KEY_ID", "") or next(iter(keys))
+    if key_id not in keys:
+        msg = f"QR_SIGNING_KEY_ID {key_id!r} no está en QR_SIGNING_KEYS"
+        raise ValueError(msg)
+    return key_id
+
+
+def _mac(key_id: str, body: str) -> bytes:
+    key = _derive_key(_get_keys()[key_id])
+    message = f"{key_id}.{body}".encode("ascii")
+    return hmac.new(key, message, hashlib.sha256).digest()[:MAC_LENGTH]
+
+
+def sign_payload(
+    code: str,
+    *,
+    max_age: int | None = None,
+    key_id: str | None = None,
+) -> str:
+    """
+    Genera el payload firmado para ``code``.
+    ``max_age`` (segundos) agrega una expiración; ``None`` no expira.
+    """
+    if not code or "." in code:
+        msg = "El código no puede estar vacío ni contener '.'"
+        raise ValueError(msg)
+    key_id = key_id or _get_current_key_id()
+    expires_at = int(time.time()) + max_age if max_age else 0
+    body = _b64encode(_HEADER.pack(PAYLOAD_VERSION, expires_at) + code.encode())
+    return f"{key_id}.{body}.{_b64encode(_mac(key_id, body))}"
+
+
+def verify_payload(token: str, *, check_revocation: bool = True) -> QRPayload:
+    """
+    Verifica la firma (en tiempo constante), la expiración y, opcionalmente,
+    la revocación del payload. Lanza `BadSignature` o una subclase si falla.
+    """
+    try:
+        if not token.isascii():
+            raise ValueError  # noqa: TRY301
+        key_id, body, mac = token.strip().split(".")
+        expected = _b64decode(mac)
+        raw = _b64decode(body)
+    except (ValueError, binascii.Error) as exc:
+        msg = "Payload mal formado"
+        raise BadSignature(msg) from exc
+
+    if key_id not in _get_keys():
+        msg = "Clave de firma desconocida"
+        raise BadSignature(msg)
+    if not hmac.compare_digest(expected, _mac(key_id, body)):
+        msg = "Firma inválida"
+        raise BadSignature(msg)
+
+    if len(raw) <= _HEADER.size:
+        msg = "Payload mal formado"
+        raise BadSignature(msg)
+    version, expires_at = _HEADER.unpack_from(raw)
+    if version != PAYLOAD_VERSION:
+        msg = f"Versión de payload no soportada: {version}"
+        raise BadSignature(msg)
+    if expires_at and expires_at < time.time():
+        msg = "Payload expirado"
+        raise SignatureExpired(msg)
+
+    code = raw[_HEADER.size :].decode("utf-8", errors="strict")
+    if check_revocation and revocations.is_revoked(code):
+        msg = "Código revocado"
+        raise RevokedPayload(msg)
+
+    return QRPayload(code=code, key_id=key_id, expires_at=expires_at or None)
@@ -0,0 +1,65 @@
+import pytest
+from django.core.cache import cache
+
+from apps.qr.counters import DatabaseCounterBackend
+from apps.qr.counters import ShardedCounters
+from apps.qr.counters import get_counters
+from apps.qr.counters import scan_counter
+from apps.qr.models import Counter
+from apps.qr.models import CounterShard
+from apps.qr.scans import FlushStats
+from apps.qr.scans import Scan
+from apps.qr.scans import write_batch
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def counters() -> ShardedCounters:
+    return ShardedCounters(DatabaseCounterBackend(shards=4))
+
+
+class TestShardedCounters:
+    def test_increments_spread_over_shards(self, counters):
+        for _ in range(40):
+            counters.increment("scan:a")
+        assert CounterShard.objects.filter(name="scan:a").count() > 1
+        assert CounterShard.objects.count() <= 4  # noqa: PLR2004
+        assert counters.get_exact_count("scan:a") == 40  # noqa: PLR2004
+
+    def test_rollup_moves_shards_to_total(self, counters):
+        counters.increment_many({"scan:a": 3, "scan:b": 2})
+        assert counters.rollup() == 2  # noqa: PLR2004
+        assert Counter.objects.get(name="scan:a").total == 3  # noqa: PLR2004
+        assert not CounterShard.objects.filter(value__gt=0).exists()
+
+        counters.increment("scan:a")
+        counters.rollup()
+        assert Counter.objects.get(name="scan:a").total == 4  # noqa: PLR2004
+        assert counters.get_exact_counts(["scan:a", "scan:b", "scan:c"]) == {
+            "scan:a": 4,
+            "scan:b": 2,
+            "scan:c": 0,
+        }
+
+    def test_approximate_count_is_cached(self, counters, django_assert_num_queries):
+        counters.increment("scan:a", 5)
+        assert counters.get_count("scan:a") == 5  # noqa: PLR2004
+        counters.increment("scan:a")
+        with django_assert_num_queries(0):
+            assert counters.get_count("scan:a") == 5  # noqa: PLR2004
+        assert counters.get_exact_count("scan:a") == 6  # noqa: PLR2004
+
+
+def test_scan_batches_increment_counters():
+    write_batch([Scan(code="a"), Scan(code="a"), Scan(code="b")], FlushStats())
+    counters = get_counters()
+    assert counters.get_exact_count(scan_counter("a")) == 2  # noqa: PLR2004
+    assert counters.get_exact_count(scan_counter("b")) == 1
@@ -0,0 +1,177 @@
+import io
+import time
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from unittest.mock import Mock
+
+import pytest
+import qrcode
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from PIL import Image
+
+from apps.qr import decoding
+from apps.qr.decoding import DecodePool
+from apps.qr.decoding import DecodeQueueFull
+from apps.qr.decoding import DecoderRestarting
+from apps.qr.decoding import InvalidImage
+from apps.qr.decoding import decode_image
+from apps.qr.decoding import get_job
+from apps.qr.decoding import preprocess
+
+MAX_PIXELS = 40_000_000
+
+
+def qr_png(text: str, box_size: int = 10) -> bytes:
+    image = qrcode.make(text, box_size=box_size)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def wait_for_job(job_id: str, timeout: float = 30) -> dict:
+    deadline = time.monotonic() + timeout
+    while (job := get_job(job_id))["status"] == "pending":
+        assert time.monotonic() < deadline, "la decodificación no terminó"
+        time.sleep(0.05)
+    return job
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = DecodePool(max_workers=1, max_pending=2)
+    monkeypatch.setattr(decoding, "_pool", pool)
+    yield pool
+    pool.shutdown()
+
+
+class TestPreprocess:
+    def test_downscales_and_grayscales(self):
+        image = preprocess(qr_png("evento-42", box_size=40), 256, MAX_PIXELS)
+        assert image.mode == "L"
+        assert max(image.size) == 256  # noqa: PLR2004
+
+    def test_rejects_non_images(self):
+        with pytest.raises(InvalidImage):
+            preprocess(b"not an image", 256, MAX_PIXELS)
+
+    def test_rejects_huge_images(self):
+        buffer = io.BytesIO()
+        Image.new("L", (100, 100)).save(buffer, format="PNG")
+        with pytest.raises(InvalidImage):
+            preprocess(buffer.getvalue(), 256, 5_000)
+
+
+class TestDecodeImage:
+    def test_decodes_qr(self):
+        assert decode_image(qr_png("evento-42"), 1024, MAX_PIXELS) == ["evento-42"]
+
+    def test_no_qr(self):
+        buffer = io.BytesIO()
+        Image.new("RGB", (200, 200), "white").save(buffer, format="JPEG")
+        assert decode_image(buffer.getvalue(), 1024, MAX_PIXELS) == []
+
+
+class TestDecodePool:
+    def test_decodes_in_worker_process(self, pool):
+        job_id, future = pool.submit(qr_png("evento-42"), user_id=7)
+        assert future.result(timeout=30) == ["evento-42"]
+        job = wait_for_job(job_id)
+        assert job == {"status": "done", "results": ["evento-42"], "user_id": 7}
+
+    def test_invalid_image_is_reported(self, pool):
+        job_id, _ = pool.submit(b"not an image")
+        job = wait_for_job(job_id)
+        assert job["status"] == "error"
+
+    def test_rebuilds_after_a_worker_dies(self, pool):
+        assert pool.submit(qr_png("evento-42"))[1].result(timeout=30)
+        broken = pool.executor
+        for process in list(broken._processes.values()):  # noqa: SLF001
+            process.kill()
+        deadline = time.monotonic() + 30
+        while not broken._broken:  # noqa: SLF001
+            assert time.monotonic() < deadline, "el pool no se marcó roto"
+            time.sleep(0.05)
+        with pytest.raises(DecoderRestarting):
+            pool.submit(qr_png("evento-42"))
+        job_id, future = pool.submit(qr_png("evento-42"))
+        assert pool.executor is not broken
+        assert future.result(timeout=30) == ["evento-42"]
+        assert wait_for_job(job_id)["status"] == "done"
+
+    def test_queue_is_bounded(self):
+        pool = DecodePool(max_workers=1, max_pending=1)
+        pool._slots.acquire()  # noqa: SLF001
+        with pytest.raises(DecodeQueueFull):
+            pool.submit(qr_png("evento-42"))
+
+
+@pytest.mark.django_db
+class TestDecodeViews:
+    def upload(self, client, data: bytes):
+        image = SimpleUploadedFile("qr.png", data, content_type="image/png")
+        return client.post(reverse("qr_decode"), {"image": image})
+
+    def test_requires_login(self, client):
+        response = self.upload(client, qr_png("evento-42"))
+        assert response.status_code == HTTPStatus.FOUND
+
+    def test_upload_and_poll(self, client, user, pool):
+        client.force_login(user)
+        response = self.upload(client, qr_png("evento-42"))
+        assert response.status_code == HTTPStatus.ACCEPTED
+        job_id = response.json()["job_id"]
+        wait_for_job(job_id)
+
+        response = client.get(response.json()["status_url"])
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {
+            "job_id": job_id,
+            "status": "done",
+            "results": ["evento-42"],
+        }
+
+    def test_other_users_cannot_see_job(self, client, user, pool):
+        job_id, _ = pool.submit(qr_png("evento-42"), user_id=user.pk + 1)
+        client.force_login(user)
+        url = reverse("qr_decode_status", kwargs={"job_id": job_id})
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+    def test_missing_image(self, client, user):
+        client.force_login(user)
+        response = client.post(reverse("qr_decode"))
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_too_large(self, client, user, settings):
+        settings.QR_DECODE_MAX_UPLOAD_BYTES = 10
+        client.force_login(user)
+        response = self.upload(client, qr_png("evento-42"))
+        assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+    def test_broken_pool(self, client, user, pool, monkeypatch):
+        executor = Mock(submit=Mock(side_effect=BrokenProcessPool))
+        monkeypatch.setattr(pool, "_executor", executor)
+        client.force_login(user)
+        response = self.upload(client, qr_png("evento-42"))
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert pool._executor is None  # noqa: SLF001
+        assert self.upload(client, qr_png("evento-42")).status_code == (
+            HTTPStatus.ACCEPTED
+        )
+
+    def test_busy(self, client, user, pool):
+        pool._slots.acquire()  # noqa: SLF001
+        pool._slots.acquire()  # noqa: SLF001
+        client.force_login(user)
+        response = self.upload(client, qr_png("evento-42"))
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert response["Retry-After"] == "2"
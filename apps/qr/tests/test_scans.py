@@ -0,0 +1,166 @@
+import uuid
+
+import pytest
+from django.db import DatabaseError
+from redis import Redis
+from redis.exceptions import RedisError
+
+from apps.qr import scans
+from apps.qr.models import ScanEvent
+from apps.qr.scans import MemoryScanBuffer
+from apps.qr.scans import RedisStreamScanBuffer
+from apps.qr.scans import Scan
+from apps.qr.scans import write_batch
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def buffer() -> MemoryScanBuffer:
+    return MemoryScanBuffer(max_size=3, flush_interval=0, max_pending=5)
+
+
+class TestMemoryScanBuffer:
+    def test_flushes_at_size_threshold(
+        self,
+        buffer,
+        django_assert_num_queries,
+        monkeypatch,
+    ):
+        # Los contadores por código se prueban en test_counters.
+        monkeypatch.setattr("apps.qr.scans._count_scans", lambda batch: None)
+        buffer.append(Scan(code="a"))
+        buffer.append(Scan(code="b"))
+        assert ScanEvent.objects.count() == 0
+
+        with django_assert_num_queries(1):
+            buffer.append(Scan(code="c"))
+
+        assert len(buffer) == 0
+        assert sorted(ScanEvent.objects.values_list("code", flat=True)) == [
+            "a",
+            "b",
+            "c",
+        ]
+        assert buffer.stats.flushes == 1
+        assert buffer.stats.last_batch == 3  # noqa: PLR2004
+
+    def test_flush_is_idempotent(self, buffer, user):
+        scan = Scan(code="a", user_id=user.pk, user_agent="test")
+        write_batch([scan], buffer.stats)
+        write_batch([scan], buffer.stats)
+        event = ScanEvent.objects.get()
+        assert event.event_id == scan.event_id
+        assert event.user == user
+
+    def test_failed_flush_requeues(self, buffer, monkeypatch):
+        def fail(*args, **kwargs):
+            raise DatabaseError
+
+        buffer.append(Scan(code="a"))
+        monkeypatch.setattr("apps.qr.scans.write_batch", fail)
+        assert buffer.flush() == 0
+        assert len(buffer) == 1
+        assert buffer.stats.failures == 1
+
+        monkeypatch.undo()
+        assert buffer.flush() == 1
+        assert ScanEvent.objects.filter(code="a").exists()
+
+    def test_requeue_drops_oldest_over_limit(self, buffer):
+        buffer._requeue([Scan(code=str(i)) for i in range(7)])  # noqa: SLF001
+        assert len(buffer) == buffer.max_pending
+        assert buffer.stats.dropped == 2  # noqa: PLR2004
+
+    def test_retries_are_bounded(self, buffer, monkeypatch):
+        def fail(*args, **kwargs):
+            raise DatabaseError
+
+        monkeypatch.setattr("apps.qr.scans.write_batch", fail)
+        buffer.append(Scan(code="a"))
+        for _ in range(buffer.max_attempts):
+            buffer.flush()
+        assert len(buffer) == 0
+        assert buffer.stats.dropped == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_scan_of_a_deleted_user(user):
+    buffer = MemoryScanBuffer(max_size=2, flush_interval=0, max_pending=5)
+    buffer.append(Scan(code="a", user_id=user.pk))
+    user.delete()
+    buffer.append(Scan(code="b"))
+    # La FK falla al commit: el lote se reescribe de a una fila.
+    assert len(buffer) == 0
+    assert ScanEvent.objects.get(code="a").user is None
+    assert ScanEvent.objects.filter(code="b").exists()
+    assert buffer.stats.rejected == 0
+
+
+@pytest.fixture
+def stream(settings, monkeypatch):
+    """``RedisStreamScanBuffer`` sobre claves propias del Redis de ``REDIS_URL``."""
+    client = Redis.from_url(settings.REDIS_URL, socket_connect_timeout=0.5)
+    try:
+        client.ping()
+    except (RedisError, OSError):
+        pytest.skip("Redis no disponible en REDIS_URL")
+    prefix = f"test-{uuid.uuid4().hex}"
+    monkeypatch.setattr(scans, "STREAM_KEY", f"{prefix}:scans")
+    monkeypatch.setattr(scans, "DEAD_LETTER_KEY", f"{prefix}:dead")
+    monkeypatch.setattr(RedisStreamScanBuffer, "redis", client)
+    buffer = RedisStreamScanBuffer(
+        max_size=10,
+        max_pending=2,
+        claim_idle_ms=0,
+        max_attempts=1,
+    )
+    yield buffer
+    client.delete(scans.STREAM_KEY, scans.DEAD_LETTER_KEY)
+
+
+class TestRedisStreamScanBuffer:
+    def test_redis_down_drops_the_scan(self, monkeypatch):
+        down = Redis.from_url("redis://127.0.0.1:1/0", socket_connect_timeout=0.1)
+        monkeypatch.setattr(RedisStreamScanBuffer, "redis", down)
+        buffer = RedisStreamScanBuffer(max_size=10, max_pending=10)
+        monkeypatch.setattr(scans, "_buffer", buffer)
+        scans.record_scan("a")
+        assert buffer.stats.dropped == 1
+
+    def test_registers_the_script_once(self, stream, monkeypatch):
+        stream.append(Scan(code="a"))
+        monkeypatch.setattr(
+            stream.redis,
+            "register_script",
+            lambda *args: pytest.fail("register_script otra vez"),
+        )
+        stream.append(Scan(code="b"))
+        assert len(stream) == 2  # noqa: PLR2004
+
+    def test_consume_acks_and_deletes(self, stream):
+        stream.append(Scan(code="a"))
+        assert stream.consume(block_ms=None) == 1
+        assert len(stream) == 0
+        assert ScanEvent.objects.filter(code="a").exists()
+
+    def test_full_stream_drops_new_scans(self, stream):
+        for code in "abc":
+            stream.append(Scan(code=code))
+        assert len(stream) == stream.max_pending
+        assert stream.stats.dropped == 1
+        stream.flush()
+        assert sorted(ScanEvent.objects.values_list("code", flat=True)) == ["a", "b"]
+
+    def test_exhausted_scans_go_to_dead_letter(self, stream, monkeypatch):
+        def fail(*args, **kwargs):
+            raise DatabaseError
+
+        stream.append(Scan(code="a"))
+        monkeypatch.setattr("apps.qr.scans.write_batch", fail)
+        with pytest.raises(DatabaseError):
+            stream.consume(block_ms=None)
+        assert stream.consume(block_ms=None) == 0
+        assert len(stream) == 0
+        assert stream.redis.xlen(scans.DEAD_LETTER_KEY) == 1
+        assert stream.stats.dropped == 1
@@ -0,0 +1,124 @@
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core import signals
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from apps.qr import shortlinks
+from apps.qr.models import ShortLink
+from apps.qr.shortlinks import LinkStore
+from apps.qr.shortlinks import ShortLinkResolver
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    shortlinks.links.local.clear()
+    yield
+    cache.clear()
+    shortlinks.links.local.clear()
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    scans = []
+    monkeypatch.setattr(
+        shortlinks,
+        "record_scan",
+        lambda code, **kwargs: scans.append((code, kwargs)),
+    )
+    return scans
+
+
+async def django_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"django"})
+
+
+def call(path: str, method: str = "GET", store: LinkStore | None = None):
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": [(b"user-agent", b"pytest")],
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    async def run():
+        await ShortLinkResolver(django_app, store=store)(scope, receive, send)
+
+    # Como el cliente de tests de Django: no cerrar la conexión de la transacción.
+    signals.request_started.disconnect(close_old_connections)
+    signals.request_finished.disconnect(close_old_connections)
+    try:
+        async_to_sync(run)()
+    finally:
+        signals.request_started.connect(close_old_connections)
+        signals.request_finished.connect(close_old_connections)
+    start, body = messages
+    return start["status"], dict(start["headers"]), body["body"]
+
+
+class TestShortLinkResolver:
+    def test_redirects_and_records_scan(self, recorded):
+        ShortLink.objects.create(code="promo", target="https://example.com/landing")
+        status, headers, _ = call("/s/promo")
+        assert status == HTTPStatus.FOUND
+        assert headers[b"location"] == b"https://example.com/landing"
+        assert headers[b"cache-control"] == b"no-store"
+        assert recorded == [("promo", {"user_agent": "pytest"})]
+
+    def test_served_from_local_cache(self, recorded, django_assert_num_queries):
+        ShortLink.objects.create(code="promo", target="https://example.com/")
+        call("/s/promo")
+        with django_assert_num_queries(0):
+            status, _, _ = call("/s/promo/")
+        assert status == HTTPStatus.FOUND
+        assert shortlinks.links.local.hits == 1
+
+    def test_served_from_shared_cache(self, recorded, django_assert_num_queries):
+        ShortLink.objects.create(code="promo", target="https://example.com/")
+        call("/s/promo")
+        other_process = LinkStore()
+        with django_assert_num_queries(0):
+            status, _, _ = call("/s/promo", store=other_process)
+        assert status == HTTPStatus.FOUND
+
+    def test_unknown_or_inactive_code(self, recorded):
+        ShortLink.objects.create(
+            code="old",
+            target="https://example.com/",
+            is_active=False,
+        )
+        assert call("/s/old")[0] == HTTPStatus.NOT_FOUND
+        assert call("/s/missing")[0] == HTTPStatus.NOT_FOUND
+        assert recorded == []
+
+    def test_save_invalidates_cache(self, recorded):
+        link = ShortLink.objects.create(code="promo", target="https://example.com/a")
+        call("/s/promo")
+        link.target = "https://example.com/b"
+        link.save()
+        assert call("/s/promo")[1][b"location"] == b"https://example.com/b"
+
+    def test_head_does_not_record(self, recorded):
+        ShortLink.objects.create(code="promo", target="https://example.com/")
+        assert call("/s/promo", method="HEAD")[0] == HTTPStatus.FOUND
+        assert recorded == []
+
+    @pytest.mark.parametrize(
+        ("path", "method"),
+        [("/qr/", "GET"), ("/s/", "GET"), ("/s/a/b", "GET"), ("/s/promo", "POST")],
+    )
+    def test_delegates_to_django(self, path, method):
+        assert call(path, method=method) == (HTTPStatus.OK, {}, b"django")
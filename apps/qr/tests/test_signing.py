@@ -0,0 +1,144 @@
+import time
+import uuid
+
+import pytest
+from django.core.cache import cache
+from django.core.signing import BadSignature
+from django.core.signing import SignatureExpired
+from redis.exceptions import RedisError
+
+from apps.core.cache import TieredRedisCache
+from apps.qr import revocation
+from apps.qr.revocation import BLOOM_KEY
+from apps.qr.revocation import LOCK_KEY
+from apps.qr.revocation import BloomFilter
+from apps.qr.revocation import RevocationList
+from apps.qr.revocation import _CacheLock
+from apps.qr.revocation import revocations
+from apps.qr.signing import RevokedPayload
+from apps.qr.signing import sign_payload
+from apps.qr.signing import verify_payload
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    revocations.refresh(force=True)
+    yield
+    cache.clear()
+
+
+class TestSignPayload:
+    def test_roundtrip(self):
+        payload = verify_payload(sign_payload("evento-42"))
+        assert payload.code == "evento-42"
+        assert payload.key_id == "0"
+        assert payload.expires_at is None
+
+    def test_is_compact(self):
+        assert len(sign_payload("evento-42")) < 50  # noqa: PLR2004
+
+    def test_tampered_body(self):
+        kid, _, mac = sign_payload("evento-42").split(".")
+        other_body = sign_payload("evento-43").split(".")[1]
+        with pytest.raises(BadSignature):
+            verify_payload(f"{kid}.{other_body}.{mac}")
+
+    @pytest.mark.parametrize("token", ["", "a.b", "0.!!.??", "0.ñ.x", "x.y.z.w"])
+    def test_malformed(self, token):
+        with pytest.raises(BadSignature):
+            verify_payload(token)
+
+    def test_expired(self):
+        token = sign_payload("evento-42", max_age=1)
+        assert verify_payload(token).expires_at is not None
+        later = time.time() + 5
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr("apps.qr.signing.time.time", lambda: later)
+            with pytest.raises(SignatureExpired):
+                verify_payload(token)
+
+    def test_key_rotation(self, settings):
+        settings.QR_SIGNING_KEYS = {"k1": "primera", "k2": "segunda"}
+        settings.QR_SIGNING_KEY_ID = "k2"
+        old = sign_payload("evento-42", key_id="k1")
+        new = sign_payload("evento-42")
+        assert new.startswith("k2.")
+        assert verify_payload(old).key_id == "k1"
+        assert verify_payload(new).key_id == "k2"
+
+        settings.QR_SIGNING_KEYS = {"k2": "segunda"}
+        with pytest.raises(BadSignature):
+            verify_payload(old)
+
+    def test_invalid_code(self):
+        with pytest.raises(ValueError, match=r"'\.'"):
+            sign_payload("a.b")
+
+
+class TestRevocation:
+    def test_revoked(self):
+        token = sign_payload("evento-42")
+        revocations.revoke("evento-42")
+        with pytest.raises(RevokedPayload):
+            verify_payload(token)
+        assert verify_payload(token, check_revocation=False).code == "evento-42"
+        assert verify_payload(sign_payload("evento-43")).code == "evento-43"
+
+    def test_unrevoke(self):
+        revocations.revoke("evento-42")
+        revocations.unrevoke("evento-42")
+        assert verify_payload(sign_payload("evento-42")).code == "evento-42"
+
+    def test_not_revoked_skips_cache(self, monkeypatch):
+        # Sin marca django_db: cualquier consulta a la base haría fallar el test.
+        revocations.revoke("evento-42")
+        calls = []
+        monkeypatch.setattr(cache, "get", lambda *a, **kw: calls.append(a))
+        verify_payload(sign_payload("evento-43"))
+        assert calls == []
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter.for_capacity(1000)
+        for i in range(1000):
+            bloom.add(f"code-{i}")
+        restored = BloomFilter.from_bytes(bloom.to_bytes())
+        assert all(f"code-{i}" in restored for i in range(1000))
+        false_positives = sum(f"other-{i}" in restored for i in range(10_000))
+        assert false_positives < 50  # noqa: PLR2004
+
+    def test_lock_timeout_keeps_the_other_holder(self):
+        cache.add(LOCK_KEY, "otro")
+        with _CacheLock(LOCK_KEY, timeout=0) as lock:
+            assert not lock.acquired
+        assert cache.get(LOCK_KEY) == "otro"
+
+
+def test_revoke_ignores_a_stale_l1(settings, monkeypatch):
+    # Dos workers con las claves de revocación en el L1; el segundo perdió la
+    # invalidación del filtro que escribió el primero.
+    params = {
+        "KEY_PREFIX": f"test-{uuid.uuid4().hex}",
+        "OPTIONS": {"SOCKET_CONNECT_TIMEOUT": 0.5, "L1_KEY_PREFIXES": ["qr:"]},
+    }
+    first, second = (TieredRedisCache(settings.REDIS_URL, params) for _ in range(2))
+    try:
+        first.client.get_client().ping()
+    except (RedisError, OSError):
+        pytest.skip("Redis no disponible en REDIS_URL")
+    try:
+        stale = second.get(BLOOM_KEY)  # arranca el listener del L1
+        assert second._subscribed.wait(2)  # noqa: SLF001
+        monkeypatch.setattr(revocation, "cache", first)
+        RevocationList().revoke("evento-1")
+        second.l1.set(second.make_key(BLOOM_KEY), (False, stale))
+
+        monkeypatch.setattr(revocation, "cache", second)
+        worker = RevocationList()
+        worker.revoke("evento-2")
+        assert worker.is_revoked("evento-1")
+        assert worker.is_revoked("evento-2")
+    finally:
+        first.delete_pattern("*")
+        first.stop_listener()
+        second.stop_listener()
@@ -0,0 +1,63 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from apps.qr.models import ScanEvent
+from apps.qr.revocation import revocations
+from apps.qr.signing import sign_payload
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class TestVerifyScan:
+    def post(self, client, data):
+        return client.post(
+            reverse("qr_verify"),
+            data=json.dumps(data),
+            content_type="application/json",
+        )
+
+    def test_requires_login(self, client):
+        response = self.post(client, {"payload": sign_payload("evento-42")})
+        assert response.status_code == HTTPStatus.FOUND
+
+    def test_valid(self, client, user):
+        client.force_login(user)
+        response = self.post(client, {"payload": sign_payload("evento-42")})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {
+            "valid": True,
+            "code": "evento-42",
+            "expires_at": None,
+        }
+        assert ScanEvent.objects.get().user == user
+
+    def test_invalid(self, client, user):
+        client.force_login(user)
+        response = self.post(client, {"payload": "0.abc.def"})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {"valid": False, "reason": "invalid"}
+        assert not ScanEvent.objects.exists()
+
+    def test_revoked(self, client, user):
+        client.force_login(user)
+        token = sign_payload("evento-42")
+        revocations.revoke("evento-42")
+        response = self.post(client, {"payload": token})
+        assert response.status_code == HTTPStatus.GONE
+        assert response.json()["reason"] == "revoked"
+
+    def test_missing_payload(self, client, user):
+        client.force_login(user)
+        response = self.post(client, {})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,11 @@
+from django.urls import path
+
+from apps.qr.views import decode_status
+from apps.qr.views import decode_upload
+from apps.qr.views import verify_scan
+
+urlpatterns = [
+    path("api/qr/verify/", verify_scan, name="qr_verify"),
+    path("api/qr/decode/", decode_upload, name="qr_decode"),
+    path("api/qr/decode/<uuid:job_id>/", decode_status, name="qr_decode_status"),
+]
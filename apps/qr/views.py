@@ -0,0 +1,104 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.core.signing import BadSignature
+from django.core.signing import SignatureExpired
+from django.http import JsonResponse
+from django.urls import reverse
+from django.views.decorators.http import require_http_methods
+
+from apps.core.transactions import READ_ONLY
+from apps.core.transactions import transaction_policy
+from apps.qr.decoding import DecodeQueueFull
+from apps.qr.decoding import get_decode_pool
+from apps.qr.decoding import get_job
+from apps.qr.scans import record_scan
+from apps.qr.signing import RevokedPayload
+from apps.qr.signing import verify_payload
+
+
+@login_required
+@require_http_methods(["POST"])
+def verify_scan(request):
+    """
+    Valida el payload firmado leído desde pages/qr.html.
+    No consulta la base de datos: firma, expiración y revocación se
+    resuelven en memoria (ver `apps.qr.signing` y `apps.qr.revocation`).
+    La lectura se registra en el buffer write-behind de `apps.qr.scans`.
+    """
+    try:
+        data = json.loads(request.body)
+        token = data.get("payload")
+    except (json.JSONDecodeError, AttributeError):
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+
+    if not token or not isinstance(token, str):
+        return JsonResponse({"error": "No payload provided"}, status=400)
+
+    try:
+        payload = verify_payload(token)
+    except RevokedPayload:
+        return JsonResponse({"valid": False, "reason": "revoked"}, status=410)
+    except SignatureExpired:
+        return JsonResponse({"valid": False, "reason": "expired"}, status=410)
+    except BadSignature:
+        return JsonResponse({"valid": False, "reason": "invalid"}, status=400)
+
+    record_scan(
+        payload.code,
+        user=request.user,
+        user_agent=request.headers.get("User-Agent", ""),
+    )
+    return JsonResponse(
+        {
+            "valid": True,
+            "code": payload.code,
+            "expires_at": payload.expires_at,
+        },
+    )
+
+
+@login_required
+@require_http_methods(["POST"])
+def decode_upload(request):
+    """
+    Recibe una foto (campo ``image``) y encola su decodificación en el pool
+    de procesos. Responde enseguida con 202 y la URL para consultar el
+    resultado: el worker del request nunca decodifica.
+    """
+    upload = request.FILES.get("image")
+    if upload is None:
+        return JsonResponse({"error": "No image provided"}, status=400)
+    if upload.size > settings.QR_DECODE_MAX_UPLOAD_BYTES:
+        return JsonResponse({"error": "Image too large"}, status=413)
+
+    try:
+        job_id, _ = get_decode_pool().submit(upload.read(), user_id=request.user.pk)
+    except DecodeQueueFull:
+        response = JsonResponse({"error": "Decoder busy, retry later"}, status=503)
+        response["Retry-After"] = "2"
+        return response
+
+    return JsonResponse(
+        {
+            "job_id": job_id,
+            "status": "pending",
+            "status_url": reverse("qr_decode_status", kwargs={"job_id": job_id}),
+        },
+        status=202,
+    )
+
+
+@transaction_policy(READ_ONLY)
+@login_required
+@require_http_methods(["GET"])
+def decode_status(request, job_id):
+    """
+    Devuelve el estado de una decodificación: ``pending``, ``done`` (con
+    ``results``) o ``error``. Cada usuario sólo ve sus propios trabajos.
+    """
+    job = get_job(str(job_id))
+    if job is None or job.pop("user_id", None) != request.user.pk:
+        return JsonResponse({"error": "Job not found"}, status=404)
+    return JsonResponse({"job_id": str(job_id), **job})
@@ -139,6 +139,85 @@ function onScanSuccess(decodedText) {
         }
         detenerEscaneo();
         mostrarResultado(detectedURL);
+        if (SIGNED_PAYLOAD_PATTERN.test(detectedURL)) {
+            verificarPayload(detectedURL);
+        }
+    }
+}
+
+// Payloads firmados por el servidor: <kid>.<cuerpo>.<mac> (ver apps/qr/signing.py)
+const SIGNED_PAYLOAD_PATTERN = /^[\w-]+\.[\w-]+\.[\w-]+$/;
+
+/**
+ * Verificar en el servidor un payload firmado (sin consulta a la base de datos)
+ * @param {string} payload - El contenido firmado del código QR
+ */
+async function verificarPayload(payload) {
+    const csrfToken = document.querySelector('[name=csrfmiddlewaretoken]')?.value;
+    try {
+        const response = await fetch('/api/qr/verify/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': csrfToken
+            },
+            body: JSON.stringify({ payload })
+        });
+        const data = await response.json();
+        if (data.valid) {
+            mostrarMensaje('✅ Código válido', 'success');
+        } else {
+            mostrarMensaje(`❌ Código no válido (${data.reason || 'error'})`, 'error');
+        }
+    } catch (error) {
+        console.error('Error al verificar el código:', error);
+    }
+}
+
+/**
+ * Decodificar en el servidor una foto del código QR (webviews sin cámara en el navegador)
+ * @param {HTMLInputElement} input - El input de archivo con la foto
+ */
+async function subirFotoQR(input) {
+    const file = input.files?.[0];
+    if (!file) return;
+    const csrfToken = document.querySelector('[name=csrfmiddlewaretoken]')?.value;
+    const formData = new FormData();
+    formData.append('image', file);
+    input.value = '';
+    mostrarMensaje('⏳ Procesando la foto...', 'info');
+    try {
+        const response = await fetch('/api/qr/decode/', {
+            method: 'POST',
+            headers: { 'X-CSRFToken': csrfToken },
+            body: formData
+        });
+        const job = await response.json();
+        if (!response.ok) {
+            mostrarMensaje(`❌ ${job.error || 'No se pudo procesar la foto'}`, 'error');
+            return;
+        }
+        // La decodificación es asíncrona: consultamos el estado hasta que termine.
+        for (let intento = 0; intento < 30; intento++) {
+            await new Promise(resolve => setTimeout(resolve, 500));
+            const status = await (await fetch(job.status_url)).json();
+            if (status.status === 'pending') continue;
+            if (status.status === 'done' && status.results.length) {
+                detectedURL = status.results[0];
+                ocultarMensaje();
+                mostrarResultado(detectedURL);
+                if (SIGNED_PAYLOAD_PATTERN.test(detectedURL)) {
+                    verificarPayload(detectedURL);
+                }
+            } else {
+                mostrarMensaje('❌ No se encontró ningún código en la foto', 'error');
+            }
+            return;
+        }
+        mostrarMensaje('❌ La foto tardó demasiado en procesarse', 'error');
+    } catch (error) {
+        console.error('Error al subir la foto:', error);
+        mostrarMensaje('❌ No se pudo subir la foto', 'error');
     }
 }
 
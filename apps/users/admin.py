@@ -2,8 +2,14 @@ from allauth.account.decorators import secure_admin_login
 from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth import admin as auth_admin
+from django.db import transaction
 from django.utils.translation import gettext_lazy as _
+from rest_framework.authtoken.models import Token
 
+from apps.core.admin import ScalableAdminMixin
+
+from .api.authentication import invalidate_token
+from .api.caching import invalidate_user
 from .forms import UserAdminChangeForm
 from .forms import UserAdminCreationForm
 from .models import User
@@ -15,8 +21,26 @@ if settings.DJANGO_ADMIN_FORCE_ALLAUTH:
     admin.site.login = secure_admin_login(admin.site.login)  # type: ignore[method-assign]
 
 
+def deactivate_users(queryset):
+    """
+    Deactivate one chunk. ``update()`` skips post_save, so clear the caches
+    here, after the chunk commits, like ``apps.users.signals``.
+    """
+    pks = list(queryset.values_list("pk", flat=True))
+    queryset.update(is_active=False)
+    keys = list(Token.objects.filter(user_id__in=pks).values_list("key", flat=True))
+
+    def invalidate():
+        for pk in pks:
+            invalidate_user(pk)
+        for key in keys:
+            invalidate_token(key)
+
+    transaction.on_commit(invalidate)
+
+
 @admin.register(User)
-class UserAdmin(auth_admin.UserAdmin):
+class UserAdmin(ScalableAdminMixin, auth_admin.UserAdmin):
     form = UserAdminChangeForm
     add_form = UserAdminCreationForm
     fieldsets = (
@@ -37,8 +61,11 @@ class UserAdmin(auth_admin.UserAdmin):
         (_("Important dates"), {"fields": ("last_login", "date_joined")}),
     )
     list_display = ["email", "name", "is_superuser"]
-    search_fields = ["name"]
+    # Trigram indexes for longer terms, a prefix index for short ones.
+    search_fields = ["email", "name"]
+    prefix_search_fields = ("email",)
     ordering = ["id"]
+    actions = ["deactivate_selected"]
     add_fieldsets = (
         (
             None,
@@ -48,3 +75,12 @@ class UserAdmin(auth_admin.UserAdmin):
             },
         ),
     )
+
+    @admin.action(description=_("Deactivate selected users"))
+    def deactivate_selected(self, request, queryset):
+        self.run_in_background(
+            request,
+            queryset,
+            deactivate_users,
+            _("Deactivate users"),
+        )
@@ -0,0 +1,104 @@
+"""
+Token authentication with a two-tier cache.
+
+``CachedTokenAuthentication`` keeps the authenticated token (with its user)
+in a small in-process TTL cache in front of the shared cache (Redis in
+production). A cached request costs no queries. Entries are dropped when the
+token is deleted or its user is saved, including deactivation, see
+``apps.users.signals``. Other processes may keep their local copy for up to
+``AUTH_TOKEN_LOCAL_TTL`` seconds, so the user may be that old: anything
+cached from it must be built from a fresh row (see
+``apps.users.api.views.me_response``). Both tiers are keyed by a hash of the
+token, never the token itself.
+
+``aauthenticate`` does the same for plain async views (session first, then
+token, like ``REST_FRAMEWORK["DEFAULT_AUTHENTICATION_CLASSES"]``). A token
+found in the local tier needs no thread hop.
+"""
+
+import hashlib
+import pickle
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authentication import get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+from apps.core.cache import LRUCache
+
+CACHE_KEY = "users:auth:token:{digest}"
+
+_local = LRUCache(
+    max_size=getattr(settings, "AUTH_TOKEN_LOCAL_SIZE", 10_000),
+    ttl=getattr(settings, "AUTH_TOKEN_LOCAL_TTL", 10),
+)
+
+
+def _digest(key: str) -> str:
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def invalidate_token(key: str) -> None:
+    digest = _digest(key)
+    _local.delete(digest)
+    cache.delete(CACHE_KEY.format(digest=digest))
+
+
+def _from_local(key: str):
+    data = _local.get(_digest(key))
+    if data is None:
+        return None
+    # Every request gets its own instances, never a shared object.
+    token = pickle.loads(data)  # noqa: S301
+    return token.user, token
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        if (credentials := _from_local(key)) is not None:
+            return credentials
+        digest = _digest(key)
+        data = cache.get(CACHE_KEY.format(digest=digest))
+        if data is not None:
+            _local.set(digest, data)
+            token = pickle.loads(data)  # noqa: S301
+            return token.user, token
+
+        user, token = super().authenticate_credentials(key)
+        data = pickle.dumps(token)
+        cache.set(
+            CACHE_KEY.format(digest=digest),
+            data,
+            timeout=getattr(settings, "AUTH_TOKEN_CACHE_TIMEOUT", 5 * 60),
+        )
+        _local.set(digest, data)
+        return user, token
+
+    async def aauthenticate_credentials(self, key):
+        if (credentials := _from_local(key)) is not None:
+            return credentials
+        return await sync_to_async(self.authenticate_credentials)(key)
+
+
+async def aauthenticate(request):
+    """
+    The authenticated user of a plain (non-DRF) async view, or ``None``.
+    Raises ``AuthenticationFailed`` for a bad token, like DRF.
+    """
+    user = await request.auser()
+    if user.is_authenticated:
+        return user
+    auth = get_authorization_header(request).split()
+    if not auth or auth[0].lower() != b"token":
+        return None
+    if len(auth) != 2:  # noqa: PLR2004
+        raise AuthenticationFailed(_("Invalid token header."))
+    try:
+        key = auth[1].decode()
+    except UnicodeError as exc:
+        raise AuthenticationFailed(_("Invalid token header.")) from exc
+    user, _token = await CachedTokenAuthentication().aauthenticate_credentials(key)
+    return user
@@ -0,0 +1,83 @@
+"""
+Per-user response cache for the ``me`` endpoint.
+
+Each user has a version key (``users:me:version:<pk>``). Cached responses are
+stored under a key that includes that version, so invalidating a user is a
+single delete of the version key (see ``apps.users.signals``). The version is
+also the ETag, which lets a revalidation be answered with one cache GET.
+
+The delete runs on commit, but a request that loaded the user earlier can
+still read the new version afterwards. So a response stored under a version
+must be built from a row read after that version (see
+``apps.users.api.views.me_response``): a later write then deletes the version
+it was stored under.
+
+The ``a*`` variants use the async cache API, for ``user_me_view``.
+"""
+
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+VERSION_KEY = "users:me:version:{pk}"
+RESPONSE_KEY = "users:me:{pk}:{version}:{origin}"
+
+
+def get_version(pk: int) -> str:
+    """Current cache version for a user, created on first use."""
+    key = VERSION_KEY.format(pk=pk)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        # Another request may have won the race; use the stored value.
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(pk: int) -> str:
+    key = VERSION_KEY.format(pk=pk)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, uuid.uuid4().hex, timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def invalidate_user(pk: int) -> None:
+    """Drop every cached ``me`` response of a user."""
+    cache.delete(VERSION_KEY.format(pk=pk))
+
+
+def _digest(origin: str) -> str:
+    return hashlib.blake2b(origin.encode(), digest_size=4).hexdigest()
+
+
+def make_etag(version: str, origin: str) -> str:
+    # The payload embeds absolute URLs, so the origin is part of the tag.
+    return f'"{version}-{_digest(origin)}"'
+
+
+def response_key(pk: int, version: str, origin: str) -> str:
+    return RESPONSE_KEY.format(pk=pk, version=version, origin=_digest(origin))
+
+
+def get_response(pk: int, version: str, origin: str) -> dict | None:
+    return cache.get(response_key(pk, version, origin))
+
+
+async def aget_response(pk: int, version: str, origin: str) -> dict | None:
+    return await cache.aget(response_key(pk, version, origin))
+
+
+def _timeout() -> int:
+    return getattr(settings, "USERS_ME_CACHE_TIMEOUT", 60 * 60)
+
+
+def set_response(pk: int, version: str, origin: str, data: dict) -> None:
+    cache.set(response_key(pk, version, origin), data, timeout=_timeout())
+
+
+async def aset_response(pk: int, version: str, origin: str, data: dict) -> None:
+    await cache.aset(response_key(pk, version, origin), data, timeout=_timeout())
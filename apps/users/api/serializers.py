@@ -1,9 +1,10 @@
 from rest_framework import serializers
 
+from apps.core.serializers import CompiledHyperlinksMixin
 from apps.users.models import User
 
 
-class UserSerializer(serializers.ModelSerializer[User]):
+class UserSerializer(CompiledHyperlinksMixin, serializers.ModelSerializer[User]):
     class Meta:
         model = User
         fields = ["name", "url"]
@@ -1,17 +1,92 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpResponse
+from django.views.decorators.http import require_safe
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import APIException
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.exceptions import NotAuthenticated
 from rest_framework.mixins import ListModelMixin
 from rest_framework.mixins import RetrieveModelMixin
 from rest_framework.mixins import UpdateModelMixin
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from apps.core.compression import etag_matches
+from apps.core.transactions import READ_ONLY
+from apps.core.transactions import TransactionPolicyMixin
+from apps.core.transactions import transaction_policy
 from apps.users.models import User
 
+from . import caching
+from .authentication import aauthenticate
 from .serializers import UserSerializer
 
 
-class UserViewSet(RetrieveModelMixin, ListModelMixin, UpdateModelMixin, GenericViewSet):
+def _me_headers(request, version: str) -> dict[str, str]:
+    etag = caching.make_etag(version, request.build_absolute_uri("/"))
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def _serialize(request, user: User) -> dict:
+    return dict(UserSerializer(user, context={"request": request}).data)
+
+
+def me_response(request, user: User) -> tuple[int, dict | None, dict[str, str]]:
+    """
+    Serialized ``user``, cached per user and origin, as (status, data, headers).
+    Supports ``If-None-Match``: a fresh client costs one cache GET.
+    """
+    origin = request.build_absolute_uri("/")
+    version = caching.get_version(user.pk)
+    headers = _me_headers(request, version)
+
+    if etag_matches(request.headers.get("If-None-Match", ""), headers["ETag"]):
+        return status.HTTP_304_NOT_MODIFIED, None, headers
+
+    data = caching.get_response(user.pk, version, origin)
+    if data is None:
+        # ``user`` was loaded before ``version`` was read and may predate the
+        # last invalidation: serialize the row as the primary has it now.
+        fresh = User.objects.using(DEFAULT_DB_ALIAS).filter(pk=user.pk).first()
+        data = _serialize(request, fresh or user)
+        if fresh is not None:
+            caching.set_response(user.pk, version, origin, data)
+    return status.HTTP_200_OK, data, headers
+
+
+async def ame_response(
+    request,
+    user: User,
+) -> tuple[int, dict | None, dict[str, str]]:
+    """``me_response`` with the async cache and ORM APIs."""
+    origin = request.build_absolute_uri("/")
+    version = await caching.aget_version(user.pk)
+    headers = _me_headers(request, version)
+
+    if etag_matches(request.headers.get("If-None-Match", ""), headers["ETag"]):
+        return status.HTTP_304_NOT_MODIFIED, None, headers
+
+    data = await caching.aget_response(user.pk, version, origin)
+    if data is None:
+        # Same as in ``me_response``: never cache a row read before ``version``.
+        fresh = await User.objects.using(DEFAULT_DB_ALIAS).filter(pk=user.pk).afirst()
+        data = _serialize(request, fresh or user)
+        if fresh is not None:
+            await caching.aset_response(user.pk, version, origin, data)
+    return status.HTTP_200_OK, data, headers
+
+
+class UserViewSet(
+    TransactionPolicyMixin,
+    RetrieveModelMixin,
+    ListModelMixin,
+    UpdateModelMixin,
+    GenericViewSet,
+):
+    # Reads run in autocommit; PUT/PATCH keep their transaction.
+    transaction_policy = READ_ONLY
     serializer_class = UserSerializer
     queryset = User.objects.all()
     lookup_field = "pk"
@@ -22,5 +97,45 @@ class UserViewSet(RetrieveModelMixin, ListModelMixin, UpdateModelMixin, GenericV
 
     @action(detail=False)
     def me(self, request):
-        serializer = UserSerializer(request.user, context={"request": request})
-        return Response(status=status.HTTP_200_OK, data=serializer.data)
+        """
+        Serialized ``request.user``, cached per user and origin.
+        Supports ``If-None-Match``: a fresh client costs one cache GET.
+
+        ``/api/users/me/`` is served by ``user_me_view``; this action keeps
+        the endpoint in the OpenAPI schema.
+        """
+        status_code, data, headers = me_response(request, request.user)
+        return Response(status=status_code, data=data, headers=headers)
+
+
+def _json(status_code: int, data: dict | None, headers: dict[str, str]):
+    content = b"" if data is None else JSONRenderer().render(data)
+    return HttpResponse(
+        content,
+        status=status_code,
+        headers=headers,
+        content_type="application/json",
+    )
+
+
+def _forbidden(exc: APIException):
+    # SessionAuthentication comes first and sends no WWW-Authenticate, so DRF
+    # answers 403 rather than 401.
+    return _json(status.HTTP_403_FORBIDDEN, {"detail": exc.detail}, {})
+
+
+@transaction_policy(READ_ONLY)
+@require_safe
+async def user_me_view(request):
+    """
+    Async ``me`` for the ASGI workers: same payload, ETag and errors as
+    ``UserViewSet.me``. Authentication takes at most one short thread hop;
+    the cache and the database are awaited through their async APIs.
+    """
+    try:
+        user = await aauthenticate(request)
+    except AuthenticationFailed as exc:
+        return _forbidden(exc)
+    if user is None:
+        return _forbidden(NotAuthenticated())
+    return _json(*await ame_response(request, user))
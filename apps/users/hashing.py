@@ -0,0 +1,145 @@
+"""
+Password hashing off the calling thread.
+
+- `PasswordHasherPool`: processes for bulk hashing (``import_users``).
+- `PasswordCheckPool`: a small bounded thread pool for the hashes of a login
+  attempt. At most ``LOGIN_HASH_WORKERS`` hashes run at once per process, and
+  at most ``LOGIN_HASH_MAX_PENDING`` more may wait. Past that,
+  `PasswordCheckBusy` is raised right away, so a credential-stuffing burst
+  cannot queue unbounded CPU work. The hashers (argon2-cffi, hashlib) release
+  the GIL while they run. Only code inside `login_hashing` (entered by
+  `apps.users.middleware.LoginGuardMiddleware`) uses it; signup, password
+  changes and commands hash on their own thread and never get
+  `PasswordCheckBusy`.
+
+Kept free of model imports: worker processes import this module before
+``django.setup()`` runs in their initializer.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.hashers import verify_password
+
+
+def _init_worker() -> None:
+    # Workers are started fresh (forkserver), so they need their own setup to
+    # read PASSWORD_HASHERS.
+    import django  # noqa: PLC0415
+
+    django.setup()
+
+
+def hash_passwords(passwords: list[str]) -> list[str]:
+    return [make_password(password) for password in passwords]
+
+
+class PasswordHasherPool:
+    """
+    Hashes passwords in ``workers`` processes, or in the calling process when
+    ``workers`` is 0.
+    """
+
+    def __init__(self, workers: int, batch_size: int = 64):
+        self.batch_size = batch_size
+        self.executor = None
+        if workers:
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+                initializer=_init_worker,
+            )
+
+    def submit(self, passwords: list[str]) -> list[Future]:
+        """Hash in batches of ``batch_size``; one future per batch."""
+        futures = []
+        for i in range(0, len(passwords), self.batch_size):
+            batch = passwords[i : i + self.batch_size]
+            if self.executor is None:
+                future = Future()
+                future.set_result(hash_passwords(batch))
+            else:
+                future = self.executor.submit(hash_passwords, batch)
+            futures.append(future)
+        return futures
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+class PasswordCheckBusy(Exception):  # noqa: N818
+    """Too many password hashes are running or waiting in this process."""
+
+
+class PasswordCheckPool:
+    def __init__(self, workers: int, max_pending: int):
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="password-hash",
+        )
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+
+    def run(self, func, *args):
+        """Run ``func`` in the pool and wait for it."""
+        if not self._slots.acquire(blocking=False):
+            msg = "Password hashing queue is full"
+            raise PasswordCheckBusy(msg)
+        try:
+            future = self.executor.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def verify(self, password: str | None, encoded: str) -> tuple[bool, bool]:
+        """``(is_correct, must_update)``, as ``verify_password``."""
+        return self.run(verify_password, password, encoded)
+
+    def make(self, password: str | None) -> str:
+        return self.run(make_password, password)
+
+
+_check_pool: PasswordCheckPool | None = None
+_check_pool_lock = threading.Lock()
+_login: ContextVar[bool] = ContextVar("login_hashing", default=False)
+
+
+@contextmanager
+def login_hashing():
+    """Hash the passwords of the block in the bounded pool."""
+    token = _login.set(True)
+    try:
+        yield
+    finally:
+        _login.reset(token)
+
+
+def in_login() -> bool:
+    return _login.get()
+
+
+def get_check_pool() -> PasswordCheckPool:
+    global _check_pool  # noqa: PLW0603
+    if _check_pool is None:
+        with _check_pool_lock:
+            if _check_pool is None:
+                _check_pool = PasswordCheckPool(
+                    workers=getattr(settings, "LOGIN_HASH_WORKERS", 2),
+                    max_pending=getattr(settings, "LOGIN_HASH_MAX_PENDING", 8),
+                )
+    return _check_pool
@@ -0,0 +1,227 @@
+"""
+Bulk user import.
+
+``import_users`` streams rows (``email``, ``name``, ``password`` and an
+optional ``verified`` flag) from CSV or NDJSON and creates users in chunks:
+
+- Emails are lowercased and validated; duplicates inside the file and emails
+  already present as a ``User`` or an allauth ``EmailAddress`` (compared
+  case-insensitively) are skipped with one query per table and chunk.
+- Passwords are hashed in a process pool (`apps.users.hashing`). The next
+  chunk is hashed while the current one is inserted.
+- Each chunk is one transaction: ``bulk_create`` for the users and for their
+  primary ``EmailAddress``. If someone signs up with one of the chunk's
+  emails after the check, the chunk is retried without the taken emails.
+
+Memory use is bounded by the chunk size plus the set of emails seen so far.
+"""
+
+import csv
+import json
+import time
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from dataclasses import dataclass
+from itertools import islice
+from typing import IO
+
+from allauth.account.models import EmailAddress
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from apps.users.hashing import PasswordHasherPool
+from apps.users.models import User
+
+FORMATS = ("csv", "ndjson")
+TRUE_VALUES = frozenset({"1", "true", "yes", "y", "t"})
+
+
+@dataclass
+class ImportRow:
+    email: str
+    name: str
+    password: str | None
+    verified: bool
+
+
+@dataclass
+class ImportStats:
+    read: int = 0
+    created: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+
+def _as_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in TRUE_VALUES
+
+
+def read_records(stream: IO[str], fmt: str) -> Iterator[dict]:
+    """Yield raw records from a CSV (with header) or NDJSON text stream."""
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    elif fmt == "ndjson":
+        for line in stream:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield {}
+    else:
+        msg = f"Unknown import format: {fmt!r}"
+        raise ValueError(msg)
+
+
+def parse_record(record: dict, *, verified: bool = False) -> ImportRow | None:
+    """
+    Normalize a raw record; ``None`` if the email is missing or invalid, or if
+    ``password`` is there but is not a string (NDJSON ``null``, a number...).
+    """
+    if not isinstance(record, dict):
+        return None
+    email = str(record.get("email") or "").strip().lower()
+    try:
+        validate_email(email)
+    except ValidationError:
+        return None
+    password = record.get("password", "")
+    if not isinstance(password, str):
+        return None
+    return ImportRow(
+        email=email,
+        name=str(record.get("name") or "").strip()[:255],
+        password=password or None,
+        verified=_as_bool(record.get("verified")) or verified,
+    )
+
+
+def _existing_emails(emails: list[str]) -> set[str]:
+    """The (lowercased) ``emails`` already taken, whatever their stored case."""
+    existing = set()
+    for model in (User, EmailAddress):
+        existing.update(
+            model.objects.annotate(email_lower=Lower("email"))
+            .filter(email_lower__in=emails)
+            .values_list("email_lower", flat=True),
+        )
+    return existing
+
+
+def _insert(rows: list[ImportRow], hashed: list[str]) -> tuple[int, int]:
+    """
+    Insert ``rows`` as ``(created, taken)``: rows whose email was taken
+    between ``_existing_emails`` and the insert (a concurrent signup) are
+    skipped and the chunk is retried.
+    """
+    taken = 0
+    while rows:
+        try:
+            return _create(rows, hashed), taken
+        except IntegrityError:
+            existing = _existing_emails([row.email for row in rows])
+            if not existing:
+                raise
+        taken += len(existing)
+        kept = [
+            (row, password)
+            for row, password in zip(rows, hashed, strict=True)
+            if row.email not in existing
+        ]
+        rows = [row for row, _ in kept]
+        hashed = [password for _, password in kept]
+    return 0, taken
+
+
+def _create(rows: list[ImportRow], hashed: list[str]) -> int:
+    users = [
+        User(email=row.email, name=row.name, password=password)
+        for row, password in zip(rows, hashed, strict=True)
+    ]
+    with transaction.atomic():
+        User.objects.bulk_create(users)
+        EmailAddress.objects.bulk_create(
+            [
+                EmailAddress(
+                    user_id=user.pk,
+                    email=user.email,
+                    verified=row.verified,
+                    primary=True,
+                )
+                for user, row in zip(users, rows, strict=True)
+            ],
+        )
+    return len(users)
+
+
+def import_users(
+    records: Iterable[dict],
+    *,
+    workers: int = 0,
+    chunk_size: int = 1000,
+    verified: bool = False,
+    progress: Callable[[ImportStats], None] | None = None,
+) -> ImportStats:
+    """Import ``records``; ``progress`` is called after every chunk."""
+    stats = ImportStats()
+    started = time.perf_counter()
+    seen: set[str] = set()
+    records = iter(records)
+
+    def next_chunk():
+        """Read, dedupe and start hashing the next chunk."""
+        raw = list(islice(records, chunk_size))
+        if not raw:
+            return None
+        counts = {"read": len(raw), "duplicates": 0, "invalid": 0}
+        rows = []
+        for record in raw:
+            row = parse_record(record, verified=verified)
+            if row is None:
+                counts["invalid"] += 1
+            elif row.email in seen:
+                counts["duplicates"] += 1
+            else:
+                seen.add(row.email)
+                rows.append(row)
+        existing = _existing_emails([row.email for row in rows]) if rows else set()
+        counts["duplicates"] += len(existing)
+        rows = [row for row in rows if row.email not in existing]
+        # Rows without a password get an unusable one; that needs no hashing.
+        to_hash = [row.password for row in rows if row.password]
+        return rows, counts, pool.submit(to_hash)
+
+    with PasswordHasherPool(workers) as pool:
+        pending = next_chunk()
+        while pending is not None:
+            rows, counts, futures = pending
+            # Hash the following chunk while this one is written.
+            pending = next_chunk()
+            hashed = iter([h for future in futures for h in future.result()])
+            passwords = [
+                next(hashed) if row.password else make_password(None) for row in rows
+            ]
+            if rows:
+                created, taken = _insert(rows, passwords)
+                stats.created += created
+                counts["duplicates"] += taken
+            stats.read += counts["read"]
+            stats.duplicates += counts["duplicates"]
+            stats.invalid += counts["invalid"]
+            stats.elapsed = time.perf_counter() - started
+            if progress is not None:
+                progress(stats)
+
+    stats.elapsed = time.perf_counter() - started
+    return stats
@@ -0,0 +1,85 @@
+"""
+Management command that bulk-imports users from CSV or NDJSON.
+
+Usage:
+    python manage.py import_users users.csv [--format csv|ndjson]
+        [--workers 4] [--chunk-size 1000] [--verified]
+
+Each row has ``email``, ``name``, ``password`` and an optional ``verified``
+flag. Use ``-`` to read from stdin. See `apps.users.importing`.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from apps.users.importing import FORMATS
+from apps.users.importing import import_users
+from apps.users.importing import read_records
+
+
+class Command(BaseCommand):
+    help = "Bulk-imports users (and their allauth email addresses)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV/NDJSON file, or - for stdin")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            default=None,
+            help="Input format (default: from the file extension, else csv)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Password hashing processes (0 hashes in this process)",
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--verified",
+            action="store_true",
+            help="Mark every imported email address as verified",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"]
+        if fmt is None:
+            fmt = "ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv"
+
+        def progress(stats):
+            self.stdout.write(
+                f"{stats.read} rows, {stats.created} created, "
+                f"{stats.duplicates} duplicates, {stats.invalid} invalid "
+                f"({stats.rows_per_second:.0f} rows/s)",
+            )
+
+        try:
+            if path == "-":
+                stats = self._import(sys.stdin, fmt, options, progress)
+            else:
+                with Path(path).open(newline="", encoding="utf-8") as stream:
+                    stats = self._import(stream, fmt, options, progress)
+        except OSError as exc:
+            msg = f"Cannot read {path}: {exc}"
+            raise CommandError(msg) from exc
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ {stats.created} users imported in {stats.elapsed:.1f} s "
+                f"({stats.rows_per_second:.0f} rows/s)",
+            ),
+        )
+
+    def _import(self, stream, fmt, options, progress):
+        return import_users(
+            read_records(stream, fmt),
+            workers=options["workers"],
+            chunk_size=options["chunk_size"],
+            verified=options["verified"],
+            progress=progress,
+        )
@@ -0,0 +1,146 @@
+"""
+Cheap pre-rejection of login attempts.
+
+`LoginGuardMiddleware` sits before sessions, CSRF and the login views. For a
+``POST`` to the allauth login page or ``/api/auth-token/`` it checks two
+sliding windows (`apps.core.ratelimit`) before any password hash is computed:
+
+- Per client IP: every attempt counts (``LOGIN_GUARD_IP_RATE``).
+- Per account: only failed logins count (``LOGIN_GUARD_ACCOUNT_RATE``); they
+  are recorded from Django's ``user_login_failed`` signal.
+
+Over either limit the request is answered ``429`` with ``Retry-After``. An
+allowed attempt runs in `apps.users.hashing.login_hashing`, so its password
+hashes go through the bounded pool; when the pool is saturated
+(`apps.users.hashing.PasswordCheckBusy`) the login is answered ``503``. The
+middleware is async-capable, so under ASGI a rejected attempt never takes a
+thread.
+"""
+
+import functools
+import json
+from contextlib import suppress
+
+from allauth.account.adapter import get_adapter
+from asgiref.sync import iscoroutinefunction
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+from django.urls import NoReverseMatch
+from django.urls import reverse
+
+from apps.core.ratelimit import RateLimitResult
+from apps.core.ratelimit import SlidingWindowLimiter
+from apps.users.hashing import PasswordCheckBusy
+from apps.users.hashing import login_hashing
+
+ACCOUNT_FIELDS = ("login", "email", "username")
+
+
+@functools.cache
+def guarded_paths() -> frozenset[str]:
+    paths = set()
+    for name in ("account_login", "obtain_auth_token"):
+        with suppress(NoReverseMatch):
+            paths.add(reverse(name))
+    return frozenset(paths)
+
+
+def ip_limiter() -> SlidingWindowLimiter:
+    limit, window = getattr(settings, "LOGIN_GUARD_IP_RATE", (20, 60))
+    return SlidingWindowLimiter("login:ip", limit, window)
+
+
+def account_limiter() -> SlidingWindowLimiter:
+    limit, window = getattr(settings, "LOGIN_GUARD_ACCOUNT_RATE", (5, 300))
+    return SlidingWindowLimiter("login:account", limit, window)
+
+
+def normalize_account(value) -> str:
+    return str(value or "").strip().lower()
+
+
+def client_ip(request) -> str:
+    try:
+        return get_adapter(request).get_client_ip(request)
+    except PermissionDenied:
+        return request.META.get("REMOTE_ADDR", "")
+
+
+def _submitted_account(request) -> str:
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return ""
+        if not isinstance(data, dict):
+            return ""
+    else:
+        data = request.POST
+    for field in ACCOUNT_FIELDS:
+        if value := data.get(field):
+            return normalize_account(value)
+    return ""
+
+
+def login_attempt(request) -> tuple[str, str] | None:
+    """``(ip, account)`` for a login submission, else ``None``."""
+    if request.method != "POST" or request.path_info not in guarded_paths():
+        return None
+    return client_ip(request), _submitted_account(request)
+
+
+def record_failed_login(account: str) -> None:
+    if account:
+        account_limiter().hit(account)
+
+
+def too_many_attempts(result: RateLimitResult) -> HttpResponse:
+    response = HttpResponse("Too many login attempts.", status=429)
+    response["Retry-After"] = str(result.retry_after)
+    return response
+
+
+class LoginGuardMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if attempt := login_attempt(request):
+            ip, account = attempt
+            result = ip_limiter().hit(ip)
+            if result.allowed and account:
+                result = account_limiter().peek(account)
+            if not result.allowed:
+                return too_many_attempts(result)
+            with login_hashing():
+                return self.get_response(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if attempt := login_attempt(request):
+            ip, account = attempt
+            result = await ip_limiter().ahit(ip)
+            if result.allowed and account:
+                result = await account_limiter().apeek(account)
+            if not result.allowed:
+                return too_many_attempts(result)
+            with login_hashing():
+                return await self.get_response(request)
+        return await self.get_response(request)
+
+    def process_exception(self, request, exception):
+        if isinstance(exception, PasswordCheckBusy):
+            response = HttpResponse("Login is busy, try again.", status=503)
+            response["Retry-After"] = "1"
+            return response
+        return None
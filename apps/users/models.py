@@ -1,12 +1,18 @@
-
 from typing import ClassVar
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.indexes import OpClass
 from django.db.models import CharField
 from django.db.models import EmailField
+from django.db.models import Index
+from django.db.models.functions import Upper
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
+from .hashing import get_check_pool
+from .hashing import in_login
 from .managers import UserManager
 
 
@@ -29,6 +35,24 @@ class User(AbstractUser):
 
     objects: ClassVar[UserManager] = UserManager()
 
+    class Meta(AbstractUser.Meta):
+        # Admin search (see apps.core.admin.ScalableAdminMixin): ``icontains``
+        # and ``istartswith`` compare ``UPPER(column)``, so the indexes do too.
+        indexes = [
+            Index(
+                OpClass(Upper("email"), name="text_pattern_ops"),
+                name="users_user_email_prefix",
+            ),
+            GinIndex(
+                OpClass(Upper("email"), name="gin_trgm_ops"),
+                name="users_user_email_trgm",
+            ),
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="users_user_name_trgm",
+            ),
+        ]
+
     def get_absolute_url(self) -> str:
         """Get URL for user's detail view.
 
@@ -37,3 +61,28 @@ class User(AbstractUser):
 
         """
         return reverse("users:detail", kwargs={"pk": self.id})
+
+    def set_password(self, raw_password: str | None) -> None:
+        """During a login, hash in the bounded pool (see `apps.users.hashing`)."""
+        if raw_password is None or not in_login():
+            super().set_password(raw_password)
+            return
+        self.password = get_check_pool().make(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password: str | None) -> bool:
+        """During a login, verify in the bounded pool."""
+        if not in_login():
+            return super().check_password(raw_password)
+        # Hash upgrades are saved in this thread.
+        is_correct, must_update = get_check_pool().verify(raw_password, self.password)
+        if is_correct and must_update:
+            self.set_password(raw_password)
+            # Password hash upgrades shouldn't be considered password changes.
+            self._password = None
+            self.save(update_fields=["password"])
+        return is_correct
+
+    async def acheck_password(self, raw_password: str | None) -> bool:
+        # The base implementation hashes on the event loop.
+        return await sync_to_async(self.check_password)(raw_password)
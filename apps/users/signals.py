@@ -0,0 +1,40 @@
+from django.contrib.auth.signals import user_login_failed
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from apps.users.api.authentication import invalidate_token
+from apps.users.api.caching import invalidate_user
+from apps.users.middleware import ACCOUNT_FIELDS
+from apps.users.middleware import normalize_account
+from apps.users.middleware import record_failed_login
+from apps.users.models import User
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, **kwargs):
+    # Covers UserUpdateView, the API update actions and the admin. Deleting
+    # before the commit would let a concurrent request cache the old row
+    # under the new version; after the commit, me_response re-reads the row.
+    pk = instance.pk
+    transaction.on_commit(lambda: invalidate_user(pk))
+    # Cached tokens carry the user, so deactivations take effect at once.
+    for key in Token.objects.filter(user_id=pk).values_list("key", flat=True):
+        transaction.on_commit(lambda key=key: invalidate_token(key))
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    key = instance.key
+    transaction.on_commit(lambda: invalidate_token(key))
+
+
+@receiver(user_login_failed)
+def login_failed(sender, credentials, **kwargs):
+    # Feeds the per-account window checked by LoginGuardMiddleware.
+    for field in ACCOUNT_FIELDS:
+        if value := credentials.get(field):
+            record_failed_login(normalize_account(value))
+            return
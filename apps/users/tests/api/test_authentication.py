@@ -0,0 +1,103 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from apps.users.api import authentication
+from apps.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+URL = "/api/users/me/"
+
+
+def queries(context: CaptureQueriesContext) -> list[str]:
+    # ATOMIC_REQUESTS adds SAVEPOINTs around each request; they are not lookups.
+    return [q["sql"] for q in context if "SAVEPOINT" not in q["sql"]]
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    cache.clear()
+    authentication._local.clear()  # noqa: SLF001
+    yield
+    cache.clear()
+    authentication._local.clear()  # noqa: SLF001
+
+
+@pytest.fixture
+def token(user: User) -> Token:
+    return Token.objects.create(user=user)
+
+
+@pytest.fixture
+def api_client(token: Token) -> APIClient:
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+class TestCachedTokenAuthentication:
+    def test_cached_request_runs_no_queries(self, api_client: APIClient):
+        assert api_client.get(URL).status_code == status.HTTP_200_OK
+        with CaptureQueriesContext(connection) as context:
+            assert api_client.get(URL).status_code == status.HTTP_200_OK
+        assert queries(context) == []
+
+    def test_shared_cache_fills_local_tier(self, api_client: APIClient):
+        api_client.get(URL)
+        authentication._local.clear()  # noqa: SLF001
+        with CaptureQueriesContext(connection) as context:
+            assert api_client.get(URL).status_code == status.HTTP_200_OK
+        assert queries(context) == []
+        assert len(authentication._local) == 1  # noqa: SLF001
+
+    def test_invalid_token(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION="Token nope")
+        assert client.get(URL).status_code == status.HTTP_403_FORBIDDEN
+
+    def test_deleted_token(
+        self,
+        api_client: APIClient,
+        token: Token,
+        django_capture_on_commit_callbacks,
+    ):
+        api_client.get(URL)
+        with django_capture_on_commit_callbacks(execute=True):
+            token.delete()
+        assert api_client.get(URL).status_code == status.HTTP_403_FORBIDDEN
+
+    def test_deactivated_user(
+        self,
+        api_client: APIClient,
+        user: User,
+        django_capture_on_commit_callbacks,
+    ):
+        api_client.get(URL)
+        with django_capture_on_commit_callbacks(execute=True):
+            user.is_active = False
+            user.save()
+        assert api_client.get(URL).status_code == status.HTTP_403_FORBIDDEN
+
+    def test_keys_do_not_contain_the_token(self, api_client: APIClient, token: Token):
+        api_client.get(URL)
+        assert all(token.key not in key for key in cache._cache)  # noqa: SLF001
+
+    def test_stale_local_user_is_not_cached_as_me(
+        self,
+        api_client: APIClient,
+        user: User,
+        django_capture_on_commit_callbacks,
+    ):
+        api_client.get(URL)
+        stale = dict(authentication._local._data)  # noqa: SLF001
+        with django_capture_on_commit_callbacks(execute=True):
+            user.name = "Nuevo nombre"
+            user.save()
+        # Another worker still holds the token with the old user.
+        authentication._local._data.update(stale)  # noqa: SLF001
+        assert api_client.get(URL).json()["name"] == "Nuevo nombre"
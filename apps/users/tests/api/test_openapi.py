@@ -3,6 +3,17 @@ from http import HTTPStatus
 import pytest
 from django.urls import reverse
 
+from apps.core.schema import build_schema
+from apps.core.schema import clear_artifact
+
+
+@pytest.fixture(autouse=True)
+def openapi_schema(settings, tmp_path):
+    settings.OPENAPI_SCHEMA_DIR = str(tmp_path)
+    clear_artifact()
+    yield build_schema(tmp_path)
+    clear_artifact()
+
 
 def test_api_docs_accessible_by_admin(admin_client):
     url = reverse("api-docs")
@@ -21,3 +32,65 @@ def test_api_schema_generated_successfully(admin_client):
     url = reverse("api-schema")
     response = admin_client.get(url)
     assert response.status_code == HTTPStatus.OK
+
+
+class TestPrebuiltSchema:
+    def test_serves_yaml_with_etag(self, admin_client, openapi_schema):
+        response = admin_client.get(reverse("api-schema"))
+        assert response["Content-Type"].startswith("application/vnd.oai.openapi")
+        assert response.content.startswith(b"openapi:")
+        assert response["ETag"] == f'"{openapi_schema["hash"]}-yaml"'
+
+    def test_serves_json(self, admin_client):
+        response = admin_client.get(reverse("api-schema"), {"format": "json"})
+        assert response.status_code == HTTPStatus.OK
+        assert "/api/users/me/" in response.json()["paths"]
+
+    def test_not_modified(self, admin_client):
+        etag = admin_client.get(reverse("api-schema"))["ETag"]
+        response = admin_client.get(
+            reverse("api-schema"),
+            headers={"If-None-Match": etag},
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_compressed_not_modified(self, admin_client):
+        # JSON is compressible, so CompressionMiddleware brotlis it and
+        # weakens the ETag.
+        url = reverse("api-schema")
+        headers = {"Accept-Encoding": "br"}
+        response = admin_client.get(url, {"format": "json"}, headers=headers)
+        assert response["Content-Encoding"] == "br"
+        assert response["ETag"].startswith("W/")
+        response = admin_client.get(
+            url,
+            {"format": "json"},
+            headers={**headers, "If-None-Match": response["ETag"]},
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_gzip(self, admin_client):
+        response = admin_client.get(
+            reverse("api-schema"),
+            headers={"Accept-Encoding": "gzip, br"},
+        )
+        assert response["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response["Vary"]
+
+    def test_gzip_refused(self, admin_client):
+        response = admin_client.get(
+            reverse("api-schema"),
+            headers={"Accept-Encoding": "gzip;q=0, br"},
+        )
+        assert "Content-Encoding" not in response
+
+    def test_missing_artifact(self, admin_client, settings, tmp_path):
+        settings.OPENAPI_SCHEMA_DIR = str(tmp_path / "missing")
+        clear_artifact()
+        response = admin_client.get(reverse("api-schema"))
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+
+    @pytest.mark.django_db
+    def test_not_accessible_by_anonymous_users(self, client):
+        response = client.get(reverse("api-schema"))
+        assert response.status_code == HTTPStatus.FORBIDDEN
@@ -1,7 +1,15 @@
+from unittest.mock import patch
+
 import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.test import APIClient
 from rest_framework.test import APIRequestFactory
 
+from apps.users.api.serializers import UserSerializer
 from apps.users.api.views import UserViewSet
+from apps.users.api.views import ame_response
 from apps.users.models import User
 
 
@@ -32,3 +40,109 @@ class TestUserViewSet:
             "url": f"http://testserver/api/users/{user.pk}/",
             "name": user.name,
         }
+
+
+@pytest.mark.django_db
+class TestMeCache:
+    url = "/api/users/me/"
+
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    @pytest.fixture
+    def api_client(self, user: User) -> APIClient:
+        # ``/api/users/me/`` is a plain async view: authenticate with a session.
+        client = APIClient()
+        client.force_login(user)
+        return client
+
+    def test_etag_and_not_modified(self, api_client: APIClient, user: User):
+        response = api_client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["name"] == user.name
+        etag = response["ETag"]
+
+        response = api_client.get(self.url, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+
+    def test_compressed_not_modified(
+        self,
+        api_client: APIClient,
+        user: User,
+        settings,
+    ):
+        settings.RESPONSE_COMPRESSION_MIN_SIZE = 0
+        # A short payload may not shrink, and is then sent uncompressed.
+        user.name = "Nombre " * 20
+        user.save()
+        headers = {"Accept-Encoding": "br"}
+        response = api_client.get(self.url, headers=headers)
+        assert response["Content-Encoding"] == "br"
+        # CompressionMiddleware weakens the ETag; the client sends it back.
+        etag = response["ETag"]
+        assert etag.startswith("W/")
+
+        response = api_client.get(
+            self.url,
+            headers={**headers, "If-None-Match": etag},
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_cached_response(self, api_client: APIClient):
+        first = api_client.get(self.url).json()
+        with patch.object(UserSerializer, "to_representation") as serialize:
+            assert api_client.get(self.url).json() == first
+        serialize.assert_not_called()
+
+    def test_invalidated_on_save(
+        self,
+        api_client: APIClient,
+        user: User,
+        django_capture_on_commit_callbacks,
+    ):
+        etag = api_client.get(self.url)["ETag"]
+        with django_capture_on_commit_callbacks(execute=True):
+            user.name = "Nuevo nombre"
+            user.save()
+
+        response = api_client.get(self.url, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["name"] == "Nuevo nombre"
+        assert response["ETag"] != etag
+
+    def test_user_loaded_before_the_invalidation(
+        self,
+        api_client: APIClient,
+        user: User,
+        django_capture_on_commit_callbacks,
+    ):
+        # A request authenticated before the write reaches the cache after it.
+        stale = User.objects.get(pk=user.pk)
+        with django_capture_on_commit_callbacks(execute=True):
+            user.name = "Nuevo nombre"
+            user.save()
+        request = APIRequestFactory().get(self.url)
+        request.user = stale
+        UserViewSet().me(request)  # type: ignore[call-arg, arg-type, misc]
+
+        assert api_client.get(self.url).json()["name"] == "Nuevo nombre"
+
+    def test_user_loaded_before_the_invalidation_async(
+        self,
+        api_client: APIClient,
+        user: User,
+        django_capture_on_commit_callbacks,
+    ):
+        stale = User.objects.get(pk=user.pk)
+        with django_capture_on_commit_callbacks(execute=True):
+            user.name = "Nuevo nombre"
+            user.save()
+        request = APIRequestFactory().get(self.url)
+        _, data, _ = async_to_sync(ame_response)(request, stale)
+
+        assert data["name"] == "Nuevo nombre"
+        assert api_client.get(self.url).json()["name"] == "Nuevo nombre"
@@ -0,0 +1,123 @@
+import json
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from allauth.account.models import EmailAddress
+from django.core.management import call_command
+
+from apps.users import importing
+from apps.users.importing import import_users
+from apps.users.importing import read_records
+from apps.users.models import User
+from apps.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+CSV = """email,name,password,verified
+Ana@Example.com,Ana,s3cret-one,yes
+bob@example.com,Bob,,
+not-an-email,Nobody,x,
+ana@example.com,Ana again,s3cret-two,
+"""
+
+
+class TestImportUsers:
+    def test_creates_users_and_email_addresses(self):
+        stats = import_users(read_records(StringIO(CSV), "csv"), chunk_size=2)
+        assert (stats.read, stats.created, stats.duplicates, stats.invalid) == (
+            4,
+            2,
+            1,
+            1,
+        )
+        ana = User.objects.get(email="ana@example.com")
+        assert ana.name == "Ana"
+        assert ana.check_password("s3cret-one")
+        assert not User.objects.get(email="bob@example.com").has_usable_password()
+        addresses = dict(
+            EmailAddress.objects.filter(primary=True).values_list("email", "verified"),
+        )
+        assert addresses == {"ana@example.com": True, "bob@example.com": False}
+
+    def test_skips_existing_emails(self, user):
+        EmailAddress.objects.create(user=user, email="taken@example.com")
+        records = [
+            {"email": user.email.upper(), "password": "x"},
+            {"email": "taken@example.com", "password": "x"},
+            {"email": "new@example.com", "password": "x"},
+        ]
+        stats = import_users(records, verified=True)
+        assert (stats.created, stats.duplicates) == (1, 2)
+        assert EmailAddress.objects.get(email="new@example.com").verified
+
+    def test_existing_emails_in_mixed_case(self, user):
+        User.objects.filter(pk=user.pk).update(email="Mixed@Example.com")
+        EmailAddress.objects.create(user=user, email="Other@Example.com")
+        records = [{"email": "mixed@example.com"}, {"email": "OTHER@example.com"}]
+        stats = import_users(records)
+        assert (stats.created, stats.duplicates) == (0, 2)
+
+    def test_non_string_passwords_are_invalid(self):
+        records = [
+            {"email": "number@example.com", "password": 1234},
+            {"email": "null@example.com", "password": None},
+            {"email": "list@example.com", "password": ["x"]},
+            {"email": "ok@example.com", "password": "x"},
+            {"email": "none@example.com"},
+        ]
+        stats = import_users(records, workers=1)
+        assert (stats.created, stats.invalid) == (2, 3)
+        assert not User.objects.get(email="none@example.com").has_usable_password()
+
+    def test_signup_after_the_existence_check(self):
+        check = importing._existing_emails  # noqa: SLF001
+        calls = []
+
+        def signup_after_check(emails):
+            existing = check(emails)
+            if not calls:
+                UserFactory(email="late@example.com")
+            calls.append(emails)
+            return existing
+
+        records = [{"email": "late@example.com"}, {"email": "new@example.com"}]
+        with patch.object(importing, "_existing_emails", signup_after_check):
+            stats = import_users(records)
+        assert (stats.created, stats.duplicates) == (1, 1)
+        assert User.objects.get(email="new@example.com")
+        assert EmailAddress.objects.filter(email="new@example.com").exists()
+
+    def test_hashes_in_worker_processes(self):
+        records = [
+            {"email": f"user{i}@example.com", "password": f"pw-{i}"} for i in range(5)
+        ]
+        stats = import_users(records, workers=2, chunk_size=2)
+        assert stats.created == 5  # noqa: PLR2004
+        assert User.objects.get(email="user3@example.com").check_password("pw-3")
+
+    def test_progress_after_each_chunk(self):
+        records = [{"email": f"user{i}@example.com"} for i in range(5)]
+        seen = []
+        import_users(records, chunk_size=2, progress=lambda s: seen.append(s.read))
+        assert seen == [2, 4, 5]
+
+
+class TestImportUsersCommand:
+    def test_ndjson_file(self, tmp_path):
+        path = tmp_path / "users.ndjson"
+        path.write_text(
+            "\n".join(
+                [
+                    json.dumps({"email": "a@example.com", "password": "x"}),
+                    "{broken",
+                    "",
+                    json.dumps({"email": "b@example.com", "verified": True}),
+                ],
+            ),
+        )
+        out = StringIO()
+        call_command("import_users", str(path), "--workers=0", stdout=out)
+        assert "2 users imported" in out.getvalue()
+        assert "1 invalid" in out.getvalue()
+        assert User.objects.count() == 2  # noqa: PLR2004
@@ -0,0 +1,167 @@
+import threading
+from http import HTTPStatus
+from unittest.mock import patch
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import AsyncClient
+from django.urls import reverse
+
+from apps.users import hashing
+from apps.users.hashing import PasswordCheckBusy
+from apps.users.hashing import PasswordCheckPool
+from apps.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache(settings):
+    settings.LOGIN_GUARD_IP_RATE = (3, 60)
+    settings.LOGIN_GUARD_ACCOUNT_RATE = (2, 300)
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def verify():
+    with patch.object(
+        PasswordCheckPool,
+        "verify",
+        autospec=True,
+        return_value=(False, False),
+    ) as mocked:
+        yield mocked
+
+
+def login(client, email, ip="10.0.0.1"):
+    return client.post(
+        reverse("account_login"),
+        {"login": email, "password": "wrong"},
+        REMOTE_ADDR=ip,
+    )
+
+
+class TestLoginGuardMiddleware:
+    def test_rejects_ip_before_hashing(self, client, user, verify):
+        for i in range(3):
+            assert login(client, f"other{i}@example.com").status_code == HTTPStatus.OK
+        hashed = verify.call_count
+        response = login(client, user.email)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert int(response["Retry-After"]) > 0
+        assert verify.call_count == hashed
+        assert login(client, user.email, ip="10.0.0.2").status_code == HTTPStatus.OK
+
+    def test_cache_down_lets_logins_through(self, client, user, verify):
+        # django-redis with IGNORE_EXCEPTIONS: incr returns None without Redis.
+        with patch.object(cache, "incr", return_value=None):
+            for _ in range(5):
+                assert login(client, user.email).status_code == HTTPStatus.OK
+
+    def test_rejects_account_after_failures(self, client, user, verify):
+        login(client, user.email, ip="10.0.0.1")
+        login(client, user.email.upper(), ip="10.0.0.2")
+        hashed = verify.call_count
+        response = login(client, user.email, ip="10.0.0.3")
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert verify.call_count == hashed
+
+    def test_successful_logins_do_not_count_per_account(self, client, user):
+        user.set_password("s3cret-pass")
+        user.save()
+        for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+            response = client.post(
+                reverse("account_login"),
+                {"login": user.email, "password": "s3cret-pass"},
+                REMOTE_ADDR=ip,
+            )
+            assert response.status_code == HTTPStatus.FOUND
+
+    def test_api_token_json_login(self, client, user, verify):
+        url = reverse("obtain_auth_token")
+        for _ in range(2):
+            client.post(
+                url,
+                {"username": user.email, "password": "x"},
+                content_type="application/json",
+            )
+        response = client.post(
+            url,
+            {"username": user.email, "password": "x"},
+            content_type="application/json",
+            REMOTE_ADDR="10.0.0.9",
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+    def test_other_requests_pass(self, client):
+        for _ in range(5):
+            assert client.get(reverse("account_login")).status_code == HTTPStatus.OK
+
+    def test_async_mode(self, user, verify):
+        client = AsyncClient()
+
+        def post():
+            return async_to_sync(client.post)(
+                reverse("account_login"),
+                {"login": user.email, "password": "wrong"},
+            )
+
+        assert [post().status_code for _ in range(3)] == [
+            HTTPStatus.OK,
+            HTTPStatus.OK,
+            HTTPStatus.TOO_MANY_REQUESTS,
+        ]
+
+    def test_busy_pool_returns_503(self, client, user):
+        with patch.object(PasswordCheckPool, "verify", side_effect=PasswordCheckBusy):
+            response = login(client, user.email)
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert response["Retry-After"] == "1"
+
+
+class TestPasswordCheckPool:
+    def test_queue_limit(self):
+        pool = PasswordCheckPool(workers=1, max_pending=1)
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow():
+            started.set()
+            release.wait()
+
+        runners = [threading.Thread(target=pool.run, args=(slow,)) for _ in range(2)]
+        for runner in runners:
+            runner.start()
+        started.wait()
+        with pytest.raises(PasswordCheckBusy):
+            pool.run(lambda: None)
+        release.set()
+        for runner in runners:
+            runner.join()
+        assert pool.run(lambda: 42) == 42  # noqa: PLR2004
+
+    def test_login_passwords_use_pool(self):
+        user = User(email="a@example.com")
+        with (
+            patch(
+                "apps.users.models.get_check_pool",
+                wraps=hashing.get_check_pool,
+            ) as pool,
+            hashing.login_hashing(),
+        ):
+            user.set_password("s3cret")
+            assert user.check_password("s3cret")
+            assert not user.check_password("wrong")
+        assert pool.call_count == 3  # noqa: PLR2004
+
+    def test_other_passwords_skip_pool(self):
+        user = User(email="a@example.com")
+        with patch(
+            "apps.users.models.get_check_pool",
+            side_effect=PasswordCheckBusy,
+        ):
+            user.set_password("s3cret")
+            assert user.check_password("s3cret")
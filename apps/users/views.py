@@ -7,10 +7,14 @@ from django.views.generic import DetailView
 from django.views.generic import RedirectView
 from django.views.generic import UpdateView
 
+from apps.core.transactions import READ_ONLY
+from apps.core.transactions import WRITE
+from apps.core.transactions import TransactionPolicyMixin
 from apps.users.models import User
 
 
-class UserDetailView(LoginRequiredMixin, DetailView):
+class UserDetailView(TransactionPolicyMixin, LoginRequiredMixin, DetailView):
+    transaction_policy = READ_ONLY
     model = User
     slug_field = "id"
     slug_url_kwarg = "id"
@@ -19,7 +23,13 @@ class UserDetailView(LoginRequiredMixin, DetailView):
 user_detail_view = UserDetailView.as_view()
 
 
-class UserUpdateView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
+class UserUpdateView(
+    TransactionPolicyMixin,
+    LoginRequiredMixin,
+    SuccessMessageMixin,
+    UpdateView,
+):
+    transaction_policy = WRITE
     model = User
     fields = ["name"]
     success_message = _("Information successfully updated")
@@ -36,7 +46,8 @@ class UserUpdateView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
 user_update_view = UserUpdateView.as_view()
 
 
-class UserRedirectView(LoginRequiredMixin, RedirectView):
+class UserRedirectView(TransactionPolicyMixin, LoginRequiredMixin, RedirectView):
+    transaction_policy = READ_ONLY
     permanent = False
 
     def get_redirect_url(self) -> str:
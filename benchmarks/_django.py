@@ -0,0 +1,49 @@
+"""
+Inicialización de Django para los scripts de ``benchmarks/``.
+
+Los benchmarks se corren desde la raíz del repo::
+
+    python -m benchmarks.bench_hyperlinks
+
+Usan ``config.settings.test`` salvo que ``DJANGO_SETTINGS_MODULE`` diga otra
+cosa. Los que no tocan la base funcionan sin ``DATABASE_URL``.
+"""
+
+import os
+import statistics
+import time
+
+
+def setup_django() -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.test")
+    os.environ.setdefault("DATABASE_URL", "sqlite://:memory:")
+
+    import django  # noqa: PLC0415
+    from django.test.utils import setup_test_environment  # noqa: PLC0415
+
+    django.setup()
+    # Igual que pytest-django: ALLOWED_HOSTS con "testserver", email en memoria.
+    setup_test_environment()
+
+
+def measure(func, *, repeat: int = 5, number: int = 1) -> dict:
+    """Corre ``func`` ``number`` veces por ronda y devuelve ms por llamada."""
+    timings = []
+    func()  # calentamiento
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - started) * 1000 / number)
+    return {
+        "best_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+    }
+
+
+def report(title: str, results: dict[str, dict]) -> None:
+    print(title)  # noqa: T201
+    width = max(len(name) for name in results)
+    for name, result in results.items():
+        values = "  ".join(f"{k}={v}" for k, v in result.items())
+        print(f"  {name:<{width}}  {values}")  # noqa: T201
@@ -0,0 +1,324 @@
+"""
+Vistas sync vs async bajo ASGI: ``/api/users/me/`` y la prueba de Web Push.
+
+Uso:
+    python -m benchmarks.bench_async_views [--requests 200] [--concurrency 50]
+        [--push-delay 0.2] [--devices 3]
+
+Llama a ``ASGIHandler`` en proceso con ``--concurrency`` requests a la vez y
+compara:
+
+- "sync": las vistas anteriores (``UserViewSet.me`` y el envío con
+  ``WebPushDevice.send_message``) con ``WhiteNoiseMiddleware`` original;
+- "async": ``user_me_view`` y ``send_test_notification`` con
+  ``AsyncWhiteNoiseMiddleware``.
+
+Reporta requests por segundo, el pico de hilos ocupados a la vez y los
+segundos de hilo consumidos por request (el tiempo dentro de
+``sync_to_async``: con una vista sync es todo el request). El push service es un
+servidor aiohttp local (HTTP plano) que tarda ``--push-delay`` segundos en
+responder. Necesita ``DATABASE_URL`` apuntando a PostgreSQL.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import threading
+import time
+
+from benchmarks._django import report
+from benchmarks._django import setup_django
+
+SYNC_MIDDLEWARE = "whitenoise.middleware.WhiteNoiseMiddleware"
+ASYNC_MIDDLEWARE = "apps.core.middleware.AsyncWhiteNoiseMiddleware"
+
+
+def sync_push_test(request):
+    """``send_test_notification`` tal como era antes de pasar a async."""
+    from django.http import JsonResponse  # noqa: PLC0415
+    from push_notifications.models import WebPushDevice  # noqa: PLC0415
+
+    devices = WebPushDevice.objects.filter(user=request.user, active=True)
+    devices.send_message(message=json.dumps({"title": "bench"}))
+    return JsonResponse({"success": True, "devices_count": devices.count()})
+
+
+def urlpatterns_for_bench():
+    from django.contrib.auth.decorators import login_required  # noqa: PLC0415
+    from django.urls import include  # noqa: PLC0415
+    from django.urls import path  # noqa: PLC0415
+
+    from apps.pwa.views import send_test_notification  # noqa: PLC0415
+    from apps.users.api.views import UserViewSet  # noqa: PLC0415
+    from apps.users.api.views import user_me_view  # noqa: PLC0415
+
+    return [
+        path("sync/me/", UserViewSet.as_view({"get": "me"})),
+        path("async/me/", user_me_view),
+        path("sync/push/", login_required(sync_push_test)),
+        path("async/push/", send_test_notification),
+        path("", include("config.urls")),
+    ]
+
+
+def start_push_service(delay: float) -> int:
+    """Push service local: responde 201 después de ``delay`` segundos."""
+    from aiohttp import web  # noqa: PLC0415
+
+    async def push(request):
+        await request.read()
+        await asyncio.sleep(delay)
+        return web.Response(status=201)
+
+    ready = threading.Event()
+    port = 0
+
+    def run():
+        nonlocal port
+
+        async def serve():
+            nonlocal port
+            app = web.Application()
+            app.router.add_post("/{tail:.*}", push)
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]  # noqa: SLF001
+            ready.set()
+            await asyncio.Event().wait()
+
+        asyncio.run(serve())
+
+    threading.Thread(target=run, daemon=True, name="push-service").start()
+    ready.wait()
+    return port
+
+
+def subscription_keys() -> tuple[str, str]:
+    """``p256dh`` y ``auth`` válidos, como los genera un navegador."""
+    from cryptography.hazmat.primitives.asymmetric import ec  # noqa: PLC0415
+    from cryptography.hazmat.primitives.serialization import Encoding  # noqa: PLC0415
+    from cryptography.hazmat.primitives.serialization import (  # noqa: PLC0415
+        PublicFormat,
+    )
+
+    public = ec.generate_private_key(ec.SECP256R1()).public_key()
+    point = public.public_bytes(Encoding.X962, PublicFormat.UncompressedPoint)
+
+    def b64(data: bytes) -> str:
+        return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+    return b64(point), b64(os.urandom(16))
+
+
+async def call(app, path: str, method: str, headers: list) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": headers,
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+    status = 0
+    body_sent = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Django espera un posible disconnect hasta terminar la respuesta.
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif not message.get("more_body"):
+            finished.set()
+
+    await app(scope, receive, send)
+    return status
+
+
+class ThreadUsage:
+    """Cuenta hilos ocupados dentro de ``sync_to_async`` y su tiempo."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.busy = 0
+        self.peak = 0
+        self.seconds = 0.0
+
+    def install(self) -> None:
+        from asgiref.sync import SyncToAsync  # noqa: PLC0415
+
+        original = SyncToAsync.thread_handler
+        usage = self
+
+        def thread_handler(self, *args, **kwargs):
+            with usage.lock:
+                usage.busy += 1
+                usage.peak = max(usage.peak, usage.busy)
+            started = time.perf_counter()
+            try:
+                return original(self, *args, **kwargs)
+            finally:
+                with usage.lock:
+                    usage.busy -= 1
+                    usage.seconds += time.perf_counter() - started
+
+        SyncToAsync.thread_handler = thread_handler
+
+    def reset(self) -> None:
+        self.peak = self.busy
+        self.seconds = 0.0
+
+
+USAGE = ThreadUsage()
+
+
+async def load(app, request: tuple, *, requests, concurrency) -> dict:
+    """Manda ``requests`` veces ``request`` (path, method, headers)."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            return await call(app, *request)
+
+    USAGE.reset()
+    started = time.perf_counter()
+    statuses = await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    failed = sum(status >= 400 for status in statuses)  # noqa: PLR2004
+    return {
+        "rps": round(requests / elapsed, 1),
+        "peak_busy_threads": USAGE.peak,
+        "thread_ms_per_request": round(USAGE.seconds * 1000 / requests, 1),
+        "errors": failed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--push-delay", type=float, default=0.2)
+    parser.add_argument("--devices", type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.db import connections  # noqa: PLC0415
+    from django.test.utils import setup_databases  # noqa: PLC0415
+    from django.test.utils import teardown_databases  # noqa: PLC0415
+
+    databases = setup_databases(verbosity=0, interactive=False)
+    try:
+        run(args)
+    finally:
+        connections.close_all()
+        teardown_databases(databases, verbosity=0)
+
+
+def run(args) -> None:
+    import sys  # noqa: PLC0415
+
+    from django.conf import settings  # noqa: PLC0415
+    from django.core.handlers.asgi import ASGIHandler  # noqa: PLC0415
+    from django.test import Client  # noqa: PLC0415
+    from django.test import override_settings  # noqa: PLC0415
+    from push_notifications import webpush  # noqa: PLC0415
+    from push_notifications.models import WebPushDevice  # noqa: PLC0415
+    from py_vapid import Vapid  # noqa: PLC0415
+    from rest_framework.authtoken.models import Token  # noqa: PLC0415
+
+    from apps.pwa import push  # noqa: PLC0415
+    from apps.users.models import User  # noqa: PLC0415
+
+    USAGE.install()
+    port = start_push_service(args.push_delay)
+    vapid = Vapid()
+    vapid.generate_keys()
+    settings.PUSH_NOTIFICATIONS_SETTINGS["WP_PRIVATE_KEY"] = base64.urlsafe_b64encode(
+        vapid.private_key.private_numbers().private_value.to_bytes(32, "big"),
+    ).decode()
+    settings.PUSH_NOTIFICATIONS_SETTINGS["WP_CLAIMS"] = {"sub": "mailto:b@example.com"}
+    settings.PUSH_NOTIFICATIONS_SETTINGS["WP_ERROR_TIMEOUT"] = 30
+
+    # Los endpoints reales son https; el push service local es HTTP plano.
+    def subscription_info(application_id, uri, browser, auth, p256dh):
+        return {"endpoint": uri, "keys": {"auth": auth, "p256dh": p256dh}}
+
+    webpush.get_subscription_info = subscription_info
+    push.get_subscription_info = subscription_info
+
+    user = User.objects.create_user(email="bench@example.com", password="x")  # noqa: S106
+    token = Token.objects.create(user=user)
+    for i in range(args.devices):
+        p256dh, auth = subscription_keys()
+        WebPushDevice.objects.create(
+            user=user,
+            registration_id=f"http://127.0.0.1:{port}/push/{i}",
+            p256dh=p256dh,
+            auth=auth,
+            browser="CHROME",
+        )
+    client = Client()
+    client.force_login(user)
+    session = client.cookies[settings.SESSION_COOKIE_NAME].value
+    csrf = "b" * 32
+    push_headers = [
+        (b"cookie", f"sessionid={session}; csrftoken={csrf}".encode()),
+        (b"x-csrftoken", csrf.encode()),
+    ]
+    me_headers = [(b"authorization", f"Token {token.key}".encode())]
+
+    module = sys.modules[__name__]
+    module.urlpatterns = urlpatterns_for_bench()
+    middleware = list(settings.MIDDLEWARE)
+    index = middleware.index(ASYNC_MIDDLEWARE)
+
+    results = {}
+    for mode, whitenoise in (("sync", SYNC_MIDDLEWARE), ("async", ASYNC_MIDDLEWARE)):
+        middleware[index] = whitenoise
+        with override_settings(
+            ROOT_URLCONF=__name__,
+            MIDDLEWARE=middleware,
+            LOGIN_GUARD_IP_RATE=(10**9, 60),
+        ):
+            app = ASGIHandler()
+            for name, path, method, headers, count in (
+                ("me", f"/{mode}/me/", "GET", me_headers, args.requests * 5),
+                ("push", f"/{mode}/push/", "POST", push_headers, args.requests),
+            ):
+                asyncio.run(call(app, path, method, headers))  # calentamiento
+                results[f"{name} ({mode})"] = asyncio.run(
+                    load(
+                        app,
+                        (path, method, headers),
+                        requests=count,
+                        concurrency=args.concurrency,
+                    ),
+                )
+
+    report(
+        f"ASGI, {args.concurrency} requests concurrentes, push service "
+        f"{args.push_delay * 1000:.0f} ms, {args.devices} dispositivos",
+        dict(sorted(results.items())),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Lecturas de claves calientes: ``RedisCache`` contra ``TieredRedisCache``.
+
+Uso:
+    python -m benchmarks.bench_cache [--keys 50] [--reads 5000]
+
+Guarda ``--keys`` valores (un dict chico, como los de ``users:me:``) y los lee
+``--reads`` veces en orden aleatorio con django-redis solo y con el L1 delante.
+Reporta ms por lectura y, para el L1, el hit rate de cada nivel. Necesita
+Redis (``REDIS_URL``); usa un ``KEY_PREFIX`` propio y lo borra al final.
+"""
+
+import argparse
+import random
+import uuid
+
+from benchmarks._django import measure
+from benchmarks._django import report
+from benchmarks._django import setup_django
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keys", type=int, default=50)
+    parser.add_argument("--reads", type=int, default=5000)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.conf import settings  # noqa: PLC0415
+    from django_redis.cache import RedisCache  # noqa: PLC0415
+    from redis.exceptions import RedisError  # noqa: PLC0415
+
+    from apps.core.cache import TieredRedisCache  # noqa: PLC0415
+
+    params = {
+        "KEY_PREFIX": f"bench-{uuid.uuid4().hex}",
+        "OPTIONS": {"L1_KEY_PREFIXES": ["hot:"]},
+    }
+    backends = {
+        "redis": RedisCache(settings.REDIS_URL, params),
+        "l1+redis": TieredRedisCache(settings.REDIS_URL, params),
+    }
+    try:
+        backends["redis"].client.get_client().ping()
+    except (RedisError, OSError) as exc:
+        msg = "bench_cache necesita Redis (REDIS_URL)"
+        raise SystemExit(msg) from exc
+
+    keys = [f"hot:{n}" for n in range(args.keys)]
+    value = {"id": 1, "email": "bench@example.com", "name": "Bench", "is_staff": 0}
+    backends["redis"].set_many(dict.fromkeys(keys, value))
+    tiered = backends["l1+redis"]
+    tiered.get(keys[0])
+    tiered._subscribed.wait(2)  # noqa: SLF001
+    reads = random.choices(keys, k=args.reads)  # noqa: S311
+
+    def read_all(cache):
+        def run():
+            for key in reads:
+                cache.get(key)
+
+        return run
+
+    results = {}
+    try:
+        for name, cache in backends.items():
+            timing = measure(read_all(cache), repeat=3)
+            results[name] = {
+                "us_per_read": round(timing["median_ms"] * 1000 / args.reads, 2),
+            }
+        stats = tiered.tier_stats()
+        results["l1+redis"]["l1_hit_rate"] = stats["l1"]["hit_rate"]
+        results["l1+redis"]["l2_reads"] = stats["l2"]["hits"] + stats["l2"]["misses"]
+    finally:
+        backends["redis"].delete_pattern("*")
+        tiered.stop_listener()
+    report(f"{args.reads} lecturas de {args.keys} claves", results)
+
+
+if __name__ == "__main__":
+    main()
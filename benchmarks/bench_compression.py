@@ -0,0 +1,111 @@
+"""
+Costo de CPU contra bytes ahorrados al comprimir las respuestas dinámicas.
+
+Uso:
+    python -m benchmarks.bench_compression [--number 50] [--chunk 4096]
+
+Toma los cuerpos reales de ``/push/`` y ``/qr/`` (página entera y parcial de
+htmx) y de ``/api/users/me/`` con el test client, y los comprime con los
+encoders de ``CompressionMiddleware`` a distintos niveles. Reporta el tamaño
+comprimido, el porcentaje ahorrado y los ms de CPU por respuesta. La última
+fila comprime la página más grande en chunks de ``--chunk`` bytes (flush por
+chunk), como un ``StreamingHttpResponse``. Usa la base del test runner.
+"""
+
+import argparse
+
+from benchmarks._django import measure
+from benchmarks._django import report
+from benchmarks._django import setup_django
+
+CODECS = (
+    ("gzip", 1),
+    ("gzip", 6),
+    ("gzip", 9),
+    ("br", 1),
+    ("br", 4),
+    ("br", 6),
+    ("br", 11),
+)
+
+
+def encoder(name: str, level: int):
+    from apps.core.compression import BrotliEncoder  # noqa: PLC0415
+    from apps.core.compression import GzipEncoder  # noqa: PLC0415
+
+    return BrotliEncoder(level) if name == "br" else GzipEncoder(level)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=50)
+    parser.add_argument("--chunk", type=int, default=4096)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.db import connections  # noqa: PLC0415
+    from django.test.utils import setup_databases  # noqa: PLC0415
+    from django.test.utils import teardown_databases  # noqa: PLC0415
+
+    databases = setup_databases(verbosity=0, interactive=False)
+    try:
+        run(args)
+    finally:
+        connections.close_all()
+        teardown_databases(databases, verbosity=0)
+
+
+def bodies() -> dict[str, bytes]:
+    from django.test import Client  # noqa: PLC0415
+
+    from apps.users.models import User  # noqa: PLC0415
+
+    client = Client()
+    user = User.objects.create_user(email="b@example.com", password="x")  # noqa: S106
+    client.force_login(user)
+    htmx = {"HX-Request": "true", "HX-Target": "main-content"}
+    return {
+        "push.html": client.get("/push/").content,
+        "qr.html": client.get("/qr/").content,
+        "qr (htmx)": client.get("/qr/", headers=htmx).content,
+        "me.json": client.get("/api/users/me/").content,
+    }
+
+
+def run(args) -> None:
+    for name, body in bodies().items():
+        results = {}
+        for codec, level in CODECS:
+            size = len(encoder(codec, level).compress(body))
+            results[f"{codec} {level}"] = {
+                "bytes": size,
+                "saved": f"{100 - size * 100 / len(body):.0f}%",
+                **measure(
+                    lambda codec=codec, level=level, body=body: encoder(
+                        codec,
+                        level,
+                    ).compress(body),
+                    number=args.number,
+                ),
+            }
+        if name == "push.html":
+            chunks = [body[i : i + args.chunk] for i in range(0, len(body), args.chunk)]
+
+            def streaming(chunks=chunks):
+                compressor = encoder("br", 4)
+                parts = [compressor.process(chunk) for chunk in chunks]
+                parts.append(compressor.finish())
+                return b"".join(parts)
+
+            size = len(streaming())
+            results[f"br 4 en chunks de {args.chunk}"] = {
+                "bytes": size,
+                "saved": f"{100 - size * 100 / len(body):.0f}%",
+                **measure(streaming, number=args.number),
+            }
+        report(f"{name}: {len(body)} bytes sin comprimir", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Conexiones a PostgreSQL bajo ASGI: ``CONN_MAX_AGE`` contra el pool de psycopg.
+
+Uso:
+    python -m benchmarks.bench_db_pool [--requests 2000] [--concurrency 50]
+
+Llama en proceso a ``ASGIHandler`` con ``--concurrency`` requests a la vez a
+una vista que hace un ``SELECT`` dentro de la transacción de
+``ATOMIC_REQUESTS``, con ``CONN_MAX_AGE`` 0 y 60 y con el pool
+(``OPTIONS["pool"]``, como en producción). Reporta requests por segundo,
+latencia mediana y p99 en ms, las conexiones que se abrieron y los requests
+que fallaron (p. ej. ``too many clients``). Bajo ASGI cada
+request corre su código sync en un hilo y un contexto nuevos, así que
+``CONN_MAX_AGE`` no llega a reusar conexiones. Necesita PostgreSQL
+(``DATABASE_URL``); usa la base del test runner.
+"""
+
+import argparse
+import asyncio
+import gc
+from types import ModuleType
+
+from benchmarks._django import report
+from benchmarks._django import setup_django
+from benchmarks.bench_fast_lane import load
+
+PATH = "/bench/"
+
+
+def page(request):
+    from django.contrib.sites.models import Site  # noqa: PLC0415
+    from django.http import HttpResponse  # noqa: PLC0415
+
+    return HttpResponse(str(Site.objects.count()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--pool-size", type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.db import connections  # noqa: PLC0415
+    from django.test.utils import setup_databases  # noqa: PLC0415
+    from django.test.utils import teardown_databases  # noqa: PLC0415
+
+    databases = setup_databases(verbosity=0, interactive=False)
+    try:
+        asyncio.run(run(args))
+    finally:
+        connections.close_all()
+        teardown_databases(databases, verbosity=0)
+
+
+async def run(args) -> None:
+    from django.core.asgi import get_asgi_application  # noqa: PLC0415
+    from django.core.signals import got_request_exception  # noqa: PLC0415
+    from django.db import connections  # noqa: PLC0415
+    from django.db.backends.signals import connection_created  # noqa: PLC0415
+    from django.test import override_settings  # noqa: PLC0415
+    from django.urls import include  # noqa: PLC0415
+    from django.urls import path  # noqa: PLC0415
+
+    from apps.core.dbpool import pool_stats  # noqa: PLC0415
+
+    database = connections.settings["default"]
+    if database["ENGINE"] != "django.db.backends.postgresql":
+        msg = "bench_db_pool necesita PostgreSQL (DATABASE_URL)"
+        raise SystemExit(msg)
+
+    opened = errors = 0
+
+    def count_connection(**kwargs):
+        nonlocal opened
+        opened += 1
+
+    def count_error(**kwargs):
+        nonlocal errors
+        errors += 1
+
+    connection_created.connect(count_connection)
+    got_request_exception.connect(count_error)
+    application = get_asgi_application()
+    scenarios = {
+        "conn_max_age=0": {"CONN_MAX_AGE": 0},
+        "conn_max_age=60": {"CONN_MAX_AGE": 60},
+        "pool": {
+            "CONN_MAX_AGE": 0,
+            "CONN_HEALTH_CHECKS": True,
+            "pool": {"min_size": 2, "max_size": args.pool_size, "timeout": 30},
+        },
+    }
+    original = {**database, "OPTIONS": {**database["OPTIONS"]}}
+    results = {}
+    urlconf = ModuleType("bench_db_pool_urls")
+    urlconf.urlpatterns = [
+        path(PATH.lstrip("/"), page),
+        path("", include("config.urls")),
+    ]
+    with override_settings(ROOT_URLCONF=urlconf):
+        for name, options in scenarios.items():
+            pool = options.pop("pool", None)
+            database.update(options)
+            database["OPTIONS"].pop("pool", None)
+            if pool:
+                database["OPTIONS"]["pool"] = pool
+            opened = errors = 0
+            results[name] = await load(
+                application,
+                PATH,
+                requests=args.requests,
+                concurrency=args.concurrency,
+            )
+            if pool:
+                # Con pool, connection_created cuenta cada préstamo.
+                stats = pool_stats()["default"]
+                results[name]["connections"] = stats["connections_num"]
+                results[name]["wait_ms_avg"] = stats["requests_wait_ms_avg"]
+                connections["default"].close_pool()
+            else:
+                results[name]["connections"] = opened
+            results[name]["errors"] = errors
+            # Las conexiones de los contextos de requests ya terminados.
+            gc.collect()
+    database.clear()
+    database.update(original)
+    report(f"{PATH} ({args.concurrency} a la vez)", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Endpoints constantes de la PWA con y sin ``PwaFastLane``.
+
+Uso:
+    python -m benchmarks.bench_fast_lane [--requests 2000] [--concurrency 50]
+
+Llama en proceso a ``ASGIHandler`` (toda la cadena de middleware y la
+transacción de ``ATOMIC_REQUESTS``) y a ``PwaFastLane`` delante del mismo
+handler, con ``--concurrency`` requests a la vez a ``/sw.js``,
+``/manifest.json``, ``/offline.html`` y ``/.well-known/assetlinks.json``.
+Reporta requests por segundo y la latencia mediana y p99 en ms. Los pedidos
+mandan ``Accept-Encoding: br, gzip``, como un navegador. Usa la base del test
+runner (con PostgreSQL, ``DATABASE_URL``, el costo de la transacción es real).
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks._django import report
+from benchmarks._django import setup_django
+
+PATHS = ("/sw.js", "/manifest.json", "/offline.html", "/.well-known/assetlinks.json")
+
+
+async def call(app, path: str) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "https",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [
+            (b"host", b"testserver"),
+            (b"accept-encoding", b"br, gzip"),
+            (b"x-forwarded-proto", b"https"),
+        ],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 443),
+    }
+    body_sent = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and not message.get("more_body"):
+            finished.set()
+
+    started = time.perf_counter()
+    await app(scope, receive, send)
+    return (time.perf_counter() - started) * 1000
+
+
+async def load(app, path: str, *, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            return await call(app, path)
+
+    await call(app, path)  # calentamiento (y captura en el fast lane)
+    started = time.perf_counter()
+    latencies = sorted(await asyncio.gather(*(one() for _ in range(requests))))
+    elapsed = time.perf_counter() - started
+    return {
+        "rps": round(requests / elapsed),
+        "median_ms": round(statistics.median(latencies), 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.db import connections  # noqa: PLC0415
+    from django.test.utils import setup_databases  # noqa: PLC0415
+    from django.test.utils import teardown_databases  # noqa: PLC0415
+
+    databases = setup_databases(verbosity=0, interactive=False)
+    try:
+        asyncio.run(run(args))
+    finally:
+        connections.close_all()
+        teardown_databases(databases, verbosity=0)
+
+
+async def run(args) -> None:
+    from django.core.asgi import get_asgi_application  # noqa: PLC0415
+
+    from apps.pwa.fastlane import PwaFastLane  # noqa: PLC0415
+
+    django_application = get_asgi_application()
+    apps = {
+        "django": django_application,
+        "fast lane": PwaFastLane(django_application),
+    }
+    for path in PATHS:
+        results = {}
+        for name, app in apps.items():
+            results[name] = await load(
+                app,
+                path,
+                requests=args.requests,
+                concurrency=args.concurrency,
+            )
+        report(f"{path} ({args.concurrency} a la vez)", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Serialización de listas con ``url`` hiperlinkeada: DRF vs plantilla compilada.
+
+Uso:
+    python -m benchmarks.bench_hyperlinks [--rows 5000] [--repeat 5]
+
+No usa la base: serializa instancias de ``User`` en memoria.
+"""
+
+import argparse
+
+from benchmarks._django import measure
+from benchmarks._django import report
+from benchmarks._django import setup_django
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from rest_framework import serializers  # noqa: PLC0415
+    from rest_framework.test import APIRequestFactory  # noqa: PLC0415
+
+    from apps.users.api.serializers import UserSerializer  # noqa: PLC0415
+    from apps.users.models import User  # noqa: PLC0415
+
+    class DRFUserSerializer(serializers.ModelSerializer):
+        class Meta:
+            model = User
+            fields = UserSerializer.Meta.fields
+            extra_kwargs = UserSerializer.Meta.extra_kwargs
+
+    users = [User(pk=pk, name=f"user {pk}") for pk in range(1, args.rows + 1)]
+    request = APIRequestFactory().get("/api/users/")
+
+    def serialize(serializer_class):
+        def run():
+            context = {"request": request}
+            return serializer_class(users, many=True, context=context).data
+
+        return run
+
+    drf = measure(serialize(DRFUserSerializer), repeat=args.repeat)
+    compiled = measure(serialize(UserSerializer), repeat=args.repeat)
+    compiled["speedup"] = round(drf["best_ms"] / compiled["best_ms"], 2)
+    report(
+        f"{args.rows} filas",
+        {"HyperlinkedIdentityField": drf, "CompiledHyperlinkedIdentityField": compiled},
+    )
+
+
+if __name__ == "__main__":
+    main()
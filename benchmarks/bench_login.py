@@ -0,0 +1,90 @@
+"""
+Ráfaga de logins fallidos con y sin ``LoginGuardMiddleware``.
+
+Uso:
+    python -m benchmarks.bench_login [--attempts 200] [--limit 20]
+
+Usa ``benchmarks.settings`` (Argon2) y cache en memoria; no necesita base: la
+vista verifica la contraseña de un ``User`` en memoria. Mide:
+
+- la latencia que agrega el middleware a un intento permitido;
+- hashes, CPU y tiempo de una ráfaga de ``--attempts`` intentos desde una IP.
+"""
+
+import argparse
+import os
+import time
+
+from benchmarks._django import measure
+from benchmarks._django import report
+from benchmarks._django import setup_django
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--attempts", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+    setup_django()
+
+    from django.core.cache import cache  # noqa: PLC0415
+    from django.http import HttpResponse  # noqa: PLC0415
+    from django.test import RequestFactory  # noqa: PLC0415
+    from django.test import override_settings  # noqa: PLC0415
+    from django.urls import reverse  # noqa: PLC0415
+
+    from apps.users.middleware import LoginGuardMiddleware  # noqa: PLC0415
+    from apps.users.models import User  # noqa: PLC0415
+
+    user = User(email="victim@example.com")
+    user.set_password("correct horse battery staple")
+    factory = RequestFactory()
+    url = reverse("account_login")
+    hashes = 0
+
+    def login_view(request):
+        nonlocal hashes
+        hashes += 1
+        user.check_password(request.POST["password"])
+        return HttpResponse()
+
+    def noop_view(request):
+        return HttpResponse()
+
+    def attempt(handler, i=0):
+        request = factory.post(url, {"login": f"user{i}@example.com", "password": "x"})
+        return handler(request)
+
+    results = {}
+    with override_settings(LOGIN_GUARD_IP_RATE=(10**9, 60)):
+        guarded_noop = LoginGuardMiddleware(noop_view)
+        results["vista vacía"] = measure(lambda: attempt(noop_view), number=200)
+        results["vista vacía + guard"] = measure(
+            lambda: attempt(guarded_noop),
+            number=200,
+        )
+
+    def burst(handler):
+        nonlocal hashes
+        cache.clear()
+        hashes = 0
+        wall, cpu = time.perf_counter(), time.process_time()
+        statuses = [attempt(handler, i).status_code for i in range(args.attempts)]
+        return {
+            "hashes": hashes,
+            "rechazados": statuses.count(429),
+            "cpu_s": round(time.process_time() - cpu, 2),
+            "wall_s": round(time.perf_counter() - wall, 2),
+        }
+
+    with override_settings(LOGIN_GUARD_IP_RATE=(args.limit, 60)):
+        results["ráfaga sin guard"] = burst(login_view)
+        results["ráfaga con guard"] = burst(LoginGuardMiddleware(login_view))
+
+    report(f"Login: {args.attempts} intentos desde una IP (Argon2)", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Render de las páginas autenticadas con y sin el caché de páginas.
+
+Uso:
+    python -m benchmarks.bench_pages [--number 200]
+
+Pide ``/home/``, ``/push/``, ``/geo/`` y ``/qr/`` con el test client (todo el
+stack de middlewares) como un usuario logueado, primero con
+``PAGE_CACHE_TIMEOUT = 0`` (cada request renderiza ``base.html`` y la página) y
+después con el shell cacheado (sólo se renderizan los ``{% uncached %}``) y por
+último como los pide htmx al navegar con la barra inferior (``HX-Target:
+main-content``: sólo el contenido y la barra, cacheados). Reporta ms por
+request, bytes de la respuesta y, del header ``Server-Timing``, ms dentro de
+la vista para servirla. Usa el caché locmem y la base del test runner.
+"""
+
+import argparse
+import re
+
+from benchmarks._django import measure
+from benchmarks._django import report
+from benchmarks._django import setup_django
+
+PAGES = ("protected_home", "push", "geo", "qr")
+HTMX = {"HX-Request": "true", "HX-Target": "main-content"}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.db import connections  # noqa: PLC0415
+    from django.template import engines  # noqa: PLC0415
+    from django.test.utils import setup_databases  # noqa: PLC0415
+    from django.test.utils import teardown_databases  # noqa: PLC0415
+
+    # Como en producción: sin la información de depuración de los templates.
+    engines["django"].engine.debug = False
+    databases = setup_databases(verbosity=0, interactive=False)
+    try:
+        run(args)
+    finally:
+        connections.close_all()
+        teardown_databases(databases, verbosity=0)
+
+
+def run(args) -> None:
+    from django.test import Client  # noqa: PLC0415
+    from django.test import override_settings  # noqa: PLC0415
+    from django.urls import reverse  # noqa: PLC0415
+
+    from apps.users.models import User  # noqa: PLC0415
+
+    client = Client()
+    user = User.objects.create_user(email="b@example.com", password="x")  # noqa: S106
+    client.force_login(user)
+
+    results = {}
+    for mode, timeout, headers in (
+        ("sin caché", 0, {}),
+        ("shell cacheado", 600, {}),
+        ("htmx parcial", 600, HTMX),
+    ):
+        with override_settings(PAGE_CACHE_TIMEOUT=timeout):
+            for name in PAGES:
+                url = reverse(name)
+                view_ms = []
+                size = 0
+
+                def get(url=url, view_ms=view_ms, headers=headers):
+                    nonlocal size
+                    response = client.get(url, headers=headers)
+                    size = len(response.content)
+                    timing = response.get("Server-Timing", "")
+                    if match := re.search(r"dur=([\d.]+)", timing):
+                        view_ms.append(float(match[1]))
+
+                result = measure(get, number=args.number)
+                result["bytes"] = size
+                if view_ms:
+                    result["page_ms"] = round(sorted(view_ms)[len(view_ms) // 2], 3)
+                results[f"{name} ({mode})"] = result
+
+    report(f"Páginas autenticadas, {args.number} requests por ronda", results)
+
+
+if __name__ == "__main__":
+    main()
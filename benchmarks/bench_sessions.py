@@ -0,0 +1,100 @@
+"""
+Escrituras de sesión bajo carga: ``SESSION_SAVE_EVERY_REQUEST`` vs
+``ThrottledSessionMiddleware``.
+
+Uso:
+    python -m benchmarks.bench_sessions [--users 200] [--requests 500] [--hours 8]
+
+Simula ``--users`` usuarios logueados que hacen ``--requests`` requests cada
+uno repartidos en ``--hours`` horas (con reloj simulado) y cuenta cuántas
+veces se guarda la sesión con cada middleware. Usa el engine ``cache``
+(locmem), así que no necesita base de datos.
+"""
+
+import argparse
+import time
+from unittest.mock import patch
+
+from benchmarks._django import report
+from benchmarks._django import setup_django
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--hours", type=float, default=8)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.conf import settings  # noqa: PLC0415
+    from django.contrib.sessions.backends.cache import SessionStore  # noqa: PLC0415
+    from django.contrib.sessions.middleware import SessionMiddleware  # noqa: PLC0415
+    from django.http import HttpResponse  # noqa: PLC0415
+    from django.test import RequestFactory  # noqa: PLC0415
+    from django.test import override_settings  # noqa: PLC0415
+
+    from apps.core import middleware  # noqa: PLC0415
+
+    def view(request):
+        request.session.get("_auth_user_id")
+        return HttpResponse()
+
+    def run(middleware_class, *, save_every_request: bool) -> dict:
+        factory = RequestFactory()
+        step = args.hours * 3600 / args.requests
+        now = 1_000_000.0
+        saves = 0
+        original_save = SessionStore.save
+
+        def counting_save(self, *a, **kw):
+            nonlocal saves
+            saves += 1
+            return original_save(self, *a, **kw)
+
+        with (
+            override_settings(
+                SESSION_ENGINE="django.contrib.sessions.backends.cache",
+                SESSION_SAVE_EVERY_REQUEST=save_every_request,
+            ),
+            patch.object(SessionStore, "save", counting_save),
+            patch.object(middleware.time, "time", lambda: now),
+        ):
+            handler = middleware_class(view)
+            keys = []
+            for user in range(args.users):
+                store = SessionStore()
+                store["_auth_user_id"] = str(user)
+                store.create()
+                keys.append(store.session_key)
+            saves = 0
+            started = time.perf_counter()
+            for _ in range(args.requests):
+                now += step
+                for key in keys:
+                    request = factory.get("/")
+                    request.COOKIES[settings.SESSION_COOKIE_NAME] = key
+                    handler(request)
+            elapsed = time.perf_counter() - started
+        total = args.users * args.requests
+        return {
+            "requests": total,
+            "writes": saves,
+            "writes_per_1k": round(saves * 1000 / total, 1),
+            "req_per_s": round(total / elapsed),
+        }
+
+    before = run(SessionMiddleware, save_every_request=True)
+    after = run(middleware.ThrottledSessionMiddleware, save_every_request=False)
+    report(
+        f"{args.users} usuarios x {args.requests} requests en {args.hours} h",
+        {
+            "SESSION_SAVE_EVERY_REQUEST": before,
+            "ThrottledSessionMiddleware": after,
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Alta de usuario con envío de email en el request vs encolado en Redis.
+
+Uso:
+    python -m benchmarks.bench_signup_mail [--signups 20] [--connect-delay 0.3]
+        [--delay 0.05]
+
+El proveedor es ``benchmarks.smtp_sink`` con las demoras indicadas. Mide:
+
+- la latencia de ``POST /accounts/signup/`` (que manda la verificación) con el
+  backend SMTP y con ``QueuedEmailBackend``;
+- el envío de la cola: una conexión por mensaje (lo que hace ``send_mail``)
+  vs ``MailSender`` reutilizando la conexión.
+
+Necesita ``DATABASE_URL`` apuntando a PostgreSQL (crea y borra una base de
+test) y ``REDIS_URL``.
+"""
+
+import argparse
+import itertools
+import time
+
+from benchmarks._django import measure
+from benchmarks._django import report
+from benchmarks._django import setup_django
+from benchmarks.smtp_sink import SMTPSink
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--signups", type=int, default=20)
+    parser.add_argument("--connect-delay", type=float, default=0.3)
+    parser.add_argument("--delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.test.utils import setup_databases  # noqa: PLC0415
+    from django.test.utils import teardown_databases  # noqa: PLC0415
+
+    sink = SMTPSink(connect_delay=args.connect_delay, delay=args.delay)
+    port = sink.start()
+    databases = setup_databases(verbosity=0, interactive=False)
+    try:
+        run(args, sink, port)
+    finally:
+        teardown_databases(databases, verbosity=0)
+        sink.stop()
+
+
+def run(args, sink, port) -> None:
+    from django.conf import settings  # noqa: PLC0415
+    from django.core.mail import EmailMessage  # noqa: PLC0415
+    from django.test import Client  # noqa: PLC0415
+    from django.test import override_settings  # noqa: PLC0415
+    from django.urls import reverse  # noqa: PLC0415
+
+    from apps.core.mail import DEAD_KEY  # noqa: PLC0415
+    from apps.core.mail import RETRY_KEY  # noqa: PLC0415
+    from apps.core.mail import STREAM_KEY  # noqa: PLC0415
+    from apps.core.mail import MailQueue  # noqa: PLC0415
+    from apps.core.mail import MailSender  # noqa: PLC0415
+
+    smtp = "django.core.mail.backends.smtp.EmailBackend"
+    common = {
+        "EMAIL_HOST": "127.0.0.1",
+        "EMAIL_PORT": port,
+        "CACHES": {
+            "default": {
+                "BACKEND": "django_redis.cache.RedisCache",
+                "LOCATION": settings.REDIS_URL,
+            },
+        },
+        "ACCOUNT_RATE_LIMITS": False,
+        "LOGIN_GUARD_IP_RATE": (10**9, 60),
+    }
+    counter = itertools.count()
+    url = reverse("account_signup")
+
+    def signup():
+        i = next(counter)
+        response = Client().post(
+            url,
+            {
+                "email": f"signup{i}@example.com",
+                "password1": "correct horse battery staple",
+                "password2": "correct horse battery staple",
+            },
+        )
+        assert response.status_code == 302, response.status_code  # noqa: PLR2004
+
+    results = {}
+    number = max(args.signups // 5, 1)
+    with override_settings(EMAIL_BACKEND=smtp, **common):
+        results["signup (SMTP en el request)"] = measure(signup, number=number)
+    with override_settings(EMAIL_BACKEND="apps.core.mail.QueuedEmailBackend", **common):
+        from django_redis import get_redis_connection  # noqa: PLC0415
+
+        redis = get_redis_connection("default")
+        redis.delete(STREAM_KEY, RETRY_KEY, DEAD_KEY)
+        results["signup (QueuedEmailBackend)"] = measure(signup, number=number)
+        queued = redis.xlen(STREAM_KEY)
+        report("Latencia del alta por request", results)
+
+        messages = [
+            EmailMessage("hola", "cuerpo", to=[f"u{i}@example.com"])
+            for i in range(queued)
+        ]
+        with override_settings(EMAIL_BACKEND=smtp):
+            started = time.perf_counter()
+            for message in messages:
+                message.send()
+            per_message = time.perf_counter() - started
+
+            sender = MailSender(MailQueue(redis), smtp, batch_size=50)
+            sink.connections = 0
+            started = time.perf_counter()
+            sent = sender.drain()
+            batched = time.perf_counter() - started
+        redis.delete(STREAM_KEY, RETRY_KEY, DEAD_KEY)
+
+    report(
+        f"Envío de {queued} emails",
+        {
+            "una conexión por mensaje": {
+                "seconds": round(per_message, 2),
+                "msgs_per_s": round(queued / per_message, 1),
+            },
+            "MailSender (conexión reutilizada)": {
+                "seconds": round(batched, 2),
+                "msgs_per_s": round(sent / batched, 1),
+                "connections": sink.connections,
+            },
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Una vista de lectura con cada política de transacción.
+
+Uso:
+    python -m benchmarks.bench_transactions [--number 500]
+
+Llama con ``RequestFactory`` a ``BaseHandler`` (``make_view_atomic``) con
+una vista que hace dos ``SELECT``, como una página con sesión y usuario:
+sin política (``ATOMIC_REQUESTS``), ``READ_ONLY`` en autocommit y
+``READ_ONLY`` en una transacción ``READ ONLY``. Reporta ms por request y las
+sentencias que llegan a la base. Usa la base del test runner (con
+PostgreSQL, ``DATABASE_URL``, los round-trips son reales).
+"""
+
+import argparse
+
+from benchmarks._django import measure
+from benchmarks._django import report
+from benchmarks._django import setup_django
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.db import connections  # noqa: PLC0415
+    from django.test.utils import setup_databases  # noqa: PLC0415
+    from django.test.utils import teardown_databases  # noqa: PLC0415
+
+    databases = setup_databases(verbosity=0, interactive=False)
+    try:
+        run(args)
+    finally:
+        connections.close_all()
+        teardown_databases(databases, verbosity=0)
+
+
+def run(args) -> None:
+    from django.contrib.sites.models import Site  # noqa: PLC0415
+    from django.core.handlers.base import BaseHandler  # noqa: PLC0415
+    from django.db import connection  # noqa: PLC0415
+    from django.http import HttpResponse  # noqa: PLC0415
+    from django.test import RequestFactory  # noqa: PLC0415
+    from django.test import override_settings  # noqa: PLC0415
+    from django.test.utils import CaptureQueriesContext  # noqa: PLC0415
+
+    from apps.core.transactions import READ_ONLY  # noqa: PLC0415
+    from apps.core.transactions import transaction_policy  # noqa: PLC0415
+
+    def page(request):
+        Site.objects.first()
+        Site.objects.count()
+        return HttpResponse("ok")
+
+    handler = BaseHandler()
+    request = RequestFactory().get("/")
+    views = {
+        "atomic": ("autocommit", handler.make_view_atomic(page)),
+        "read-only": (
+            "autocommit",
+            handler.make_view_atomic(transaction_policy(READ_ONLY)(page)),
+        ),
+        "read-only tx": (
+            "transaction",
+            handler.make_view_atomic(transaction_policy(READ_ONLY)(page)),
+        ),
+    }
+    results = {}
+    for name, (mode, view) in views.items():
+        with override_settings(
+            TRANSACTION_READ_ONLY_MODE=mode,
+            TRANSACTION_READ_ONLY_GUARD=False,
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                view(request)
+            results[name] = {
+                **measure(lambda view=view: view(request), number=args.number),
+                "statements": len(queries),
+            }
+    report(f"vista con dos SELECT ({connection.vendor})", results)
+
+
+if __name__ == "__main__":
+    main()
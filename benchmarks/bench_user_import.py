@@ -0,0 +1,73 @@
+"""
+Alta masiva de usuarios: ``create_user`` uno por uno vs ``import_users``.
+
+Uso:
+    python -m benchmarks.bench_user_import [--rows 400] [--workers 4]
+
+Usa ``benchmarks.settings`` (Argon2, como producción); los procesos del pool
+leen la misma configuración, así que también hashean con Argon2. Necesita
+``DATABASE_URL`` apuntando a PostgreSQL: crea y borra una base de test.
+"""
+
+import argparse
+import os
+import time
+
+from benchmarks._django import report
+from benchmarks._django import setup_django
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=100)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+    setup_django()
+
+    from django.test.utils import setup_databases  # noqa: PLC0415
+    from django.test.utils import teardown_databases  # noqa: PLC0415
+
+    from apps.users.importing import import_users  # noqa: PLC0415
+    from apps.users.models import User  # noqa: PLC0415
+
+    databases = setup_databases(verbosity=0, interactive=False)
+    try:
+        run(args, User, import_users)
+    finally:
+        teardown_databases(databases, verbosity=0)
+
+
+def run(args, User, import_users) -> None:  # noqa: N803
+    def records(prefix):
+        return (
+            {"email": f"{prefix}{i}@example.com", "password": f"pw-{prefix}-{i}"}
+            for i in range(args.rows)
+        )
+
+    def rate(elapsed):
+        return {
+            "seconds": round(elapsed, 2),
+            "rows_per_s": round(args.rows / elapsed, 1),
+        }
+
+    started = time.perf_counter()
+    for record in records("loop"):
+        User.objects.create_user(**record)
+    results = {"create_user": rate(time.perf_counter() - started)}
+
+    for workers in sorted({0, args.workers}):
+        stats = import_users(
+            records(f"bulk{workers}-"),
+            workers=workers,
+            chunk_size=args.chunk_size,
+        )
+        results[f"import_users(workers={workers})"] = rate(stats.elapsed)
+
+    report(f"{args.rows} usuarios (Argon2)", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+"""
+Configuración de tests con los hashers de producción (Argon2 primero).
+
+Para benchmarks que miden hashing de contraseñas, incluidos los procesos
+hijos que leen ``DJANGO_SETTINGS_MODULE``.
+"""
+
+from config.settings.test import *  # noqa: F403
+
+# isort: split
+# Después del import de test, para pisar su MD5PasswordHasher.
+from config.settings.base import PASSWORD_HASHERS  # noqa: F401
@@ -0,0 +1,114 @@
+"""
+Servidor SMTP local que acepta y descarta los mensajes.
+
+Uso:
+    python -m benchmarks.smtp_sink [--port 1025] [--connect-delay 0.3] [--delay 0.05]
+
+Reemplaza al proveedor en los benchmarks: ``--connect-delay`` simula el costo
+de abrir una conexión (saludo, TLS, autenticación) y ``--delay`` el de aceptar
+cada mensaje. Habla lo mínimo de SMTP que usa ``smtplib`` sin STARTTLS.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import threading
+
+
+class SMTPSink:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        connect_delay: float = 0.0,
+        delay: float = 0.0,
+    ):
+        self.host = host
+        self.port = port
+        self.connect_delay = connect_delay
+        self.delay = delay
+        self.connections = 0
+        self.messages = 0
+        self._loop = None
+        self._server = None
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        await asyncio.sleep(self.connect_delay)
+
+        def reply(line: str) -> None:
+            writer.write(f"{line}\r\n".encode())
+
+        reply("220 sink ESMTP")
+        await writer.drain()
+        while line := await reader.readline():
+            command = line.decode(errors="replace").strip().upper()
+            if command.startswith("EHLO"):
+                reply("250-sink")
+                reply("250 8BITMIME")
+            elif command.startswith("DATA"):
+                reply("354 End data with <CR><LF>.<CR><LF>")
+                await writer.drain()
+                while await reader.readline() not in (b".\r\n", b""):
+                    pass
+                await asyncio.sleep(self.delay)
+                self.messages += 1
+                reply("250 OK queued")
+            elif command.startswith("QUIT"):
+                reply("221 Bye")
+                await writer.drain()
+                break
+            else:
+                # HELO, MAIL, RCPT, RSET, NOOP.
+                reply("250 OK")
+            await writer.drain()
+        writer.close()
+
+    async def serve(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start(self) -> int:
+        """Arranca en un hilo y devuelve el puerto."""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.call_soon(ready.set)
+            with contextlib.suppress(asyncio.CancelledError):
+                self._loop.run_until_complete(self.serve())
+
+        threading.Thread(target=run, daemon=True, name="smtp-sink").start()
+        ready.wait()
+        while self._server is None or not self._server.sockets:
+            threading.Event().wait(0.01)
+        return self.port
+
+    def stop(self) -> None:
+        if self._loop is not None and self._server is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--connect-delay", type=float, default=0.0)
+    parser.add_argument("--delay", type=float, default=0.0)
+    args = parser.parse_args()
+    sink = SMTPSink(
+        args.host,
+        args.port,
+        connect_delay=args.connect_delay,
+        delay=args.delay,
+    )
+    print(f"SMTP sink en {args.host}:{args.port}")  # noqa: T201
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(sink.serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
 from django.conf import settings
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 from rest_framework.routers import SimpleRouter
 
 from apps.users.api.views import UserViewSet
+from apps.users.api.views import user_me_view
 
 router = DefaultRouter() if settings.DEBUG else SimpleRouter()
 
@@ -10,4 +12,8 @@ router.register("users", UserViewSet)
 
 
 app_name = "api"
-urlpatterns = router.urls
+urlpatterns = [
+    # Native async view; the viewset action still documents it in the schema.
+    path("users/me/", user_me_view, name="user-me"),
+    *router.urls,
+]
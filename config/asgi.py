@@ -26,12 +26,20 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
 django_application = get_asgi_application()
 
 # Import websocket application here, so apps from django_application are loaded first
+from apps.core.preload import EarlyHints  # noqa: E402
+from apps.pwa.fastlane import PwaFastLane  # noqa: E402
+from apps.qr.shortlinks import ShortLinkResolver  # noqa: E402
 from config.websocket import websocket_application  # noqa: E402
 
+# Constant PWA responses (sw.js, manifest, offline page, assetlinks) and QR
+# short links are answered before the Django middleware stack.
+# Known preload links go out as 103 Early Hints before Django starts.
+http_application = PwaFastLane(EarlyHints(ShortLinkResolver(django_application)))
+
 
 async def application(scope, receive, send):
     if scope["type"] == "http":
-        await django_application(scope, receive, send)
+        await http_application(scope, receive, send)
     elif scope["type"] == "websocket":
         await websocket_application(scope, receive, send)
     else:
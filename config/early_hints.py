@@ -0,0 +1,84 @@
+"""
+uvicorn (httptools) with 103 Early Hints.
+
+uvicorn does not implement the ASGI ``http.response.early_hint`` extension.
+This protocol advertises it in the scope and writes each early hint as an
+informational ``103`` response before the final one. ``config.workers``
+makes gunicorn's uvicorn worker use it; ``apps.core.preload.EarlyHints``
+sends the hints.
+
+It swaps the class of uvicorn's ``RequestResponseCycle``, which is not a
+public API. ``supported()`` checks the parts it relies on (uvicorn is pinned
+in ``pyproject.toml``). If they change, ``config.workers`` falls back to
+plain httptools (``http_protocol()``) and each request is served without the
+extension.
+"""
+
+import inspect
+import logging
+
+from uvicorn.protocols.http.httptools_impl import HttpToolsProtocol
+from uvicorn.protocols.http.httptools_impl import RequestResponseCycle
+
+logger = logging.getLogger(__name__)
+
+EARLY_HINT = "http.response.early_hint"
+# What EarlyHintsCycle reads from uvicorn's cycle.
+CYCLE_ATTRIBUTES = ("scope", "transport", "response_started", "disconnected")
+
+
+def supported() -> bool:
+    """Whether this uvicorn's cycle still looks like the one we extend."""
+    try:
+        parameters = inspect.signature(RequestResponseCycle.__init__).parameters
+    except (TypeError, ValueError):
+        return False
+    return (
+        callable(getattr(RequestResponseCycle, "send", None))
+        and callable(getattr(HttpToolsProtocol, "on_headers_complete", None))
+        and {"scope", "transport"} <= parameters.keys()
+    )
+
+
+def http_protocol() -> str:
+    """The uvicorn ``http`` setting: this protocol, or httptools if unsupported."""
+    if supported():
+        return f"{__name__}:EarlyHintsHttpToolsProtocol"
+    logger.warning("uvicorn changed; serving without 103 Early Hints")
+    return "httptools"
+
+
+class EarlyHintsCycle(RequestResponseCycle):
+    async def send(self, message):
+        if message["type"] != EARLY_HINT:
+            await super().send(message)
+            return
+        # 1xx responses do not exist in HTTP/1.0, and come before the final one.
+        if (
+            self.response_started
+            or self.disconnected
+            or self.scope["http_version"] != "1.1"
+        ):
+            return
+        lines = [b"HTTP/1.1 103 Early Hints\r\n"]
+        lines.extend(
+            b"link: " + link + b"\r\n"
+            for link in message.get("links", [])
+            if b"\r" not in link and b"\n" not in link
+        )
+        lines.append(b"\r\n")
+        self.transport.write(b"".join(lines))
+
+
+class EarlyHintsHttpToolsProtocol(HttpToolsProtocol):
+    def on_headers_complete(self) -> None:
+        super().on_headers_complete()
+        # The ASGI task was created but has not run yet: the cycle shares
+        # ``self.scope``, so the extension is only advertised if the swap
+        # happened.
+        cycle = getattr(self, "cycle", None)
+        if type(cycle) is RequestResponseCycle and all(
+            hasattr(cycle, name) for name in CYCLE_ATTRIBUTES
+        ):
+            cycle.__class__ = EarlyHintsCycle
+            cycle.scope.setdefault("extensions", {})[EARLY_HINT] = {}
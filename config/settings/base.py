@@ -50,6 +50,24 @@ LOCALE_PATHS = [str(BASE_DIR / "locale")]
 # https://docs.djangoproject.com/en/dev/ref/settings/#databases
 DATABASES = {"default": env.db("DATABASE_URL")}
 DATABASES["default"]["ATOMIC_REQUESTS"] = True
+# Views declare a policy with apps.core.transactions.transaction_policy.
+# Read-only views run safe methods in "autocommit" (no BEGIN/COMMIT) or in a
+# "transaction" set READ ONLY, so PostgreSQL rejects writes.
+TRANSACTION_READ_ONLY_MODE = env("TRANSACTION_READ_ONLY_MODE", default="autocommit")
+# Raise ReadOnlyViolation when a read-only view writes on a safe method.
+TRANSACTION_READ_ONLY_GUARD = env.bool("TRANSACTION_READ_ONLY_GUARD", default=DEBUG)
+# Read replicas of "default", comma separated. Reads from the safe methods of
+# read-only views go to a healthy replica (apps.core.replicas.ReplicaRouter).
+for _index, _url in enumerate(env.list("DATABASE_REPLICA_URLS", default=[]), 1):
+    DATABASES[f"replica{_index}"] = env.db_url_config(_url)
+    DATABASES[f"replica{_index}"]["TEST"] = {"MIRROR": "default"}
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["apps.core.replicas.ReplicaRouter"]
+# Replicas lagging more than this many seconds get no reads until the next check.
+REPLICA_MAX_LAG = env.float("REPLICA_MAX_LAG", default=2.0)
+REPLICA_LAG_CHECK_INTERVAL = env.float("REPLICA_LAG_CHECK_INTERVAL", default=5.0)
+# After a write, the user reads from "default" for this many seconds (cookie).
+REPLICA_PIN_SECONDS = env.int("REPLICA_PIN_SECONDS", default=10)
 # https://docs.djangoproject.com/en/stable/ref/settings/#std:setting-DEFAULT_AUTO_FIELD
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -70,6 +88,7 @@ DJANGO_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "django.contrib.humanize",  # Handy template tags
+    "django.contrib.postgres",  # Trigram/pattern indexes for admin search
     "django.contrib.admin",
     "django.forms",
 ]
@@ -88,8 +107,10 @@ THIRD_PARTY_APPS = [
 ]
 
 LOCAL_APPS = [
+    "apps.core",
     "apps.users",
     "apps.pwa",
+    "apps.qr",
     # Your stuff: custom apps go here
 ]
 # https://docs.djangoproject.com/en/dev/ref/settings/#installed-apps
@@ -140,8 +161,16 @@ AUTH_PASSWORD_VALIDATORS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    # WhiteNoise that keeps the middleware chain async under ASGI.
+    "apps.core.middleware.AsyncWhiteNoiseMiddleware",
+    # Brotli/gzip for dynamic HTML and JSON (WhiteNoise serves static files).
+    "apps.core.middleware.CompressionMiddleware",
+    # Link preload headers for the <head> assets, remembered for 103 Early Hints.
+    "apps.core.middleware.PreloadMiddleware",
+    "apps.users.middleware.LoginGuardMiddleware",
+    # Pins users to the primary database for a while after they write.
+    "apps.core.middleware.ReplicaRoutingMiddleware",
+    "apps.core.middleware.ThrottledSessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -164,6 +193,10 @@ STATICFILES_FINDERS = [
     "django.contrib.staticfiles.finders.FileSystemFinder",
     "django.contrib.staticfiles.finders.AppDirectoriesFinder",
 ]
+# Names with a 12-hex content hash (ManifestStaticFilesStorage, compressor and
+# build_pwa_images output) never change, so they are cached forever.
+# https://whitenoise.readthedocs.io/en/stable/django.html#WHITENOISE_IMMUTABLE_FILE_TEST
+WHITENOISE_IMMUTABLE_FILE_TEST = r"^.+\.[0-9a-f]{12}\.\w+$"
 
 # MEDIA
 # ------------------------------------------------------------------------------
@@ -223,8 +256,15 @@ SESSION_COOKIE_AGE = 60 * 60 * 24 * 14  # 14 days in seconds
 # Set to 'Lax' to allow session cookies in PWA context while maintaining security
 SESSION_COOKIE_SAMESITE = "Lax"
 # https://docs.djangoproject.com/en/dev/ref/settings/#session-save-every-request
-# Update session expiry on every request to keep active users logged in
-SESSION_SAVE_EVERY_REQUEST = True
+# Sliding expiry is handled by apps.core.middleware.ThrottledSessionMiddleware:
+# sessions are saved when modified or when the expiry would move by more than
+# SESSION_REFRESH_FRACTION of SESSION_COOKIE_AGE, not on every request.
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_REFRESH_FRACTION = env.float("SESSION_REFRESH_FRACTION", default=0.1)
+# https://docs.djangoproject.com/en/dev/ref/settings/#session-engine
+# Sessions are read from the cache (Redis in production) with the database as
+# fallback and durable store.
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
 # https://docs.djangoproject.com/en/dev/ref/settings/#csrf-cookie-httponly
 CSRF_COOKIE_HTTPONLY = True
 # https://docs.djangoproject.com/en/dev/ref/settings/#csrf-cookie-samesite
@@ -242,6 +282,16 @@ EMAIL_BACKEND = env(
 )
 # https://docs.djangoproject.com/en/dev/ref/settings/#email-timeout
 EMAIL_TIMEOUT = 5
+# With EMAIL_BACKEND = "apps.core.mail.QueuedEmailBackend" requests only enqueue
+# to Redis; `send_queued_mail` delivers through this backend in batches.
+MAIL_QUEUE_DELIVERY_BACKEND = env(
+    "DJANGO_MAIL_QUEUE_DELIVERY_BACKEND",
+    default="django.core.mail.backends.smtp.EmailBackend",
+)
+MAIL_QUEUE_BATCH_SIZE = env.int("DJANGO_MAIL_QUEUE_BATCH_SIZE", default=50)
+# Failed sends are retried after RETRY_DELAY * 2**n seconds, up to MAX_ATTEMPTS.
+MAIL_QUEUE_MAX_ATTEMPTS = env.int("DJANGO_MAIL_QUEUE_MAX_ATTEMPTS", default=5)
+MAIL_QUEUE_RETRY_DELAY = env.float("DJANGO_MAIL_QUEUE_RETRY_DELAY", default=30)
 
 # ADMIN
 # ------------------------------------------------------------------------------
@@ -254,6 +304,18 @@ MANAGERS = ADMINS
 # https://cookiecutter-django.readthedocs.io/en/latest/settings.html#other-environment-settings
 # Force the `admin` sign in process to go through the `django-allauth` workflow
 DJANGO_ADMIN_FORCE_ALLAUTH = env.bool("DJANGO_ADMIN_FORCE_ALLAUTH", default=False)
+# Large changelists (apps.core.admin.ScalableAdminMixin): unfiltered tables
+# with at least this many rows (per pg_class) show an estimated count...
+ADMIN_ESTIMATED_COUNT_THRESHOLD = env.int(
+    "ADMIN_ESTIMATED_COUNT_THRESHOLD",
+    default=100_000,
+)
+# ...and filtered counts stop at this many rows.
+ADMIN_COUNT_LIMIT = env.int("ADMIN_COUNT_LIMIT", default=10_000)
+# Background bulk actions (apps.core.bulk): threads per process (0 runs them
+# in the request after commit) and rows per chunk/transaction.
+ADMIN_BULK_WORKERS = env.int("ADMIN_BULK_WORKERS", default=1)
+ADMIN_BULK_CHUNK_SIZE = env.int("ADMIN_BULK_CHUNK_SIZE", default=1000)
 
 # LOGGING
 # ------------------------------------------------------------------------------
@@ -312,7 +374,7 @@ STATICFILES_FINDERS += ["compressor.finders.CompressorFinder"]
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework.authentication.SessionAuthentication",
-        "rest_framework.authentication.TokenAuthentication",
+        "apps.users.api.authentication.CachedTokenAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
@@ -330,6 +392,8 @@ SPECTACULAR_SETTINGS = {
     "SERVE_PERMISSIONS": ["rest_framework.permissions.IsAdminUser"],
     "SCHEMA_PATH_PREFIX": "/api/",
 }
+# Output of `manage.py build_openapi_schema`, served by /api/schema/ outside DEBUG.
+OPENAPI_SCHEMA_DIR = env("OPENAPI_SCHEMA_DIR", default=str(BASE_DIR / "openapi"))
 # Your stuff...
 # ------------------------------------------------------------------------------
 
@@ -344,3 +408,109 @@ PUSH_NOTIFICATIONS_SETTINGS = {
     "WP_CLAIMS": {"sub": WP_VAPID_SUBJECT},
     "WP_ERROR_TIMEOUT": env.int("WP_ERROR_TIMEOUT", default=1),
 }
+
+# QR payloads
+# ------------------------------------------------------------------------------
+# Signing keys as "kid=secret,kid2=secret2". Empty means a key derived from SECRET_KEY.
+QR_SIGNING_KEYS = env.dict("QR_SIGNING_KEYS", default={})
+# Key id used to sign new payloads (defaults to the first key).
+QR_SIGNING_KEY_ID = env("QR_SIGNING_KEY_ID", default="")
+# Seconds between checks of the shared revocation list version.
+QR_REVOCATION_REFRESH_SECONDS = env.int("QR_REVOCATION_REFRESH_SECONDS", default=5)
+QR_REVOCATION_CAPACITY = env.int("QR_REVOCATION_CAPACITY", default=100_000)
+# Scan events are buffered and written in batches: "memory" (per worker) or "redis" (stream).
+QR_SCAN_BUFFER_BACKEND = env("QR_SCAN_BUFFER_BACKEND", default="memory")
+# Flush when this many events are pending...
+QR_SCAN_BUFFER_SIZE = env.int("QR_SCAN_BUFFER_SIZE", default=500)
+# ...or after this many seconds (memory backend).
+QR_SCAN_FLUSH_INTERVAL = env.float("QR_SCAN_FLUSH_INTERVAL", default=2.0)
+# Upper bound of pending events kept in memory or in the Redis stream; new
+# events are dropped (and counted) beyond it, pending ones are never trimmed.
+QR_SCAN_MAX_PENDING = env.int("QR_SCAN_MAX_PENDING", default=100_000)
+# Failed writes of a batch before it is dropped (memory) or moved to the
+# qr:scans:dead stream (redis).
+QR_SCAN_MAX_ATTEMPTS = env.int("QR_SCAN_MAX_ATTEMPTS", default=5)
+# Server-side decoding of uploaded photos (process pool size and bounded queue).
+QR_DECODE_WORKERS = env.int("QR_DECODE_WORKERS", default=2)
+QR_DECODE_MAX_PENDING = env.int("QR_DECODE_MAX_PENDING", default=16)
+QR_DECODE_MAX_UPLOAD_BYTES = env.int(
+    "QR_DECODE_MAX_UPLOAD_BYTES",
+    default=8 * 1024 * 1024,
+)
+# Images are downscaled to this many pixels on the longest side before decoding.
+QR_DECODE_MAX_SIDE = env.int("QR_DECODE_MAX_SIDE", default=1024)
+# Seconds a decode result stays available for polling.
+QR_DECODE_RESULT_TTL = env.int("QR_DECODE_RESULT_TTL", default=300)
+# Short links (/s/<code>) resolved in config.asgi before Django.
+QR_SHORTLINK_PREFIX = env("QR_SHORTLINK_PREFIX", default="/s/")
+# Per-process LRU of code -> target (entries, seconds).
+QR_SHORTLINK_LOCAL_SIZE = env.int("QR_SHORTLINK_LOCAL_SIZE", default=10_000)
+QR_SHORTLINK_LOCAL_TTL = env.int("QR_SHORTLINK_LOCAL_TTL", default=60)
+# Seconds an unknown code is remembered as missing.
+QR_SHORTLINK_NEGATIVE_TTL = env.int("QR_SHORTLINK_NEGATIVE_TTL", default=30)
+# Sharded scan counters: "db" (CounterShard rows) or "redis" (hash fields).
+QR_COUNTER_BACKEND = env("QR_COUNTER_BACKEND", default="db")
+QR_COUNTER_SHARDS = env.int("QR_COUNTER_SHARDS", default=16)
+# Seconds an approximate count is served from the cache.
+QR_COUNTER_CACHE_SECONDS = env.int("QR_COUNTER_CACHE_SECONDS", default=30)
+
+# Users API
+# ------------------------------------------------------------------------------
+# Seconds a cached `GET /api/users/me/` response is kept (invalidated on save).
+USERS_ME_CACHE_TIMEOUT = env.int("USERS_ME_CACHE_TIMEOUT", default=60 * 60)
+# Token authentication cache: shared (Redis) timeout and per-process TTL LRU.
+AUTH_TOKEN_CACHE_TIMEOUT = env.int("AUTH_TOKEN_CACHE_TIMEOUT", default=5 * 60)
+AUTH_TOKEN_LOCAL_TTL = env.int("AUTH_TOKEN_LOCAL_TTL", default=10)
+AUTH_TOKEN_LOCAL_SIZE = env.int("AUTH_TOKEN_LOCAL_SIZE", default=10_000)
+# Login guard: (attempts, seconds) sliding windows checked before hashing.
+# Every attempt counts per IP; only failed logins count per account.
+LOGIN_GUARD_IP_RATE = (
+    env.int("LOGIN_GUARD_IP_LIMIT", default=20),
+    env.int("LOGIN_GUARD_IP_WINDOW", default=60),
+)
+LOGIN_GUARD_ACCOUNT_RATE = (
+    env.int("LOGIN_GUARD_ACCOUNT_LIMIT", default=5),
+    env.int("LOGIN_GUARD_ACCOUNT_WINDOW", default=5 * 60),
+)
+# Password hashes running at once per process, and how many more may wait
+# before a login is answered 503.
+LOGIN_HASH_WORKERS = env.int("LOGIN_HASH_WORKERS", default=2)
+LOGIN_HASH_MAX_PENDING = env.int("LOGIN_HASH_MAX_PENDING", default=8)
+
+# Pages
+# ------------------------------------------------------------------------------
+# Seconds the shell of the authenticated pages (config.views) is cached; 0 renders
+# every request. Per-user fragments are marked with {% uncached %} in templates.
+PAGE_CACHE_TIMEOUT = env.int("PAGE_CACHE_TIMEOUT", default=0 if DEBUG else 10 * 60)
+# Bump to drop every cached shell (the static manifest hash is already in the key).
+PAGE_CACHE_VERSION = env("PAGE_CACHE_VERSION", default="1")
+# Per-process LRU in front of the shared cache (entries, seconds).
+PAGE_CACHE_LOCAL_SIZE = env.int("PAGE_CACHE_LOCAL_SIZE", default=256)
+PAGE_CACHE_LOCAL_TTL = env.int("PAGE_CACHE_LOCAL_TTL", default=30)
+
+# Response compression
+# ------------------------------------------------------------------------------
+# Bodies smaller than this many bytes go out uncompressed.
+RESPONSE_COMPRESSION_MIN_SIZE = env.int("RESPONSE_COMPRESSION_MIN_SIZE", default=512)
+# brotli 4 compresses our pages like gzip 6 with ~30% less CPU (bench_compression).
+RESPONSE_COMPRESSION_BROTLI_QUALITY = env.int(
+    "RESPONSE_COMPRESSION_BROTLI_QUALITY",
+    default=4,
+)
+RESPONSE_COMPRESSION_GZIP_LEVEL = env.int("RESPONSE_COMPRESSION_GZIP_LEVEL", default=6)
+
+# Preload
+# ------------------------------------------------------------------------------
+# Paths whose <head> assets are remembered for 103 Early Hints, and for how long.
+PRELOAD_MAX_PATHS = env.int("PRELOAD_MAX_PATHS", default=1000)
+PRELOAD_TTL = env.int("PRELOAD_TTL", default=5 * 60)
+
+# PWA images
+# ------------------------------------------------------------------------------
+# Source icon and screenshots for `manage.py build_pwa_images`, and where in
+# STATICFILES_DIRS the content-hashed variants are written.
+PWA_IMAGES_SOURCE_DIR = APPS_DIR / "pwa" / "images"
+PWA_IMAGES_STATIC_PREFIX = "icons/pwa"
+# Serve /sw.js, /manifest.json, /offline.html and assetlinks.json from memory in
+# config.asgi, rendered once per process. Off with DEBUG so edits show up.
+PWA_FAST_LANE = env.bool("PWA_FAST_LANE", default=not DEBUG)
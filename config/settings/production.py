@@ -1,9 +1,12 @@
 # ruff: noqa: E501
+import os
+
 from .base import *  # noqa: F403
 from .base import DATABASES
 from .base import INSTALLED_APPS
 from .base import REDIS_URL
 from .base import SPECTACULAR_SETTINGS
+from .base import TEMPLATES
 from .base import env
 
 # GENERAL
@@ -15,19 +18,57 @@ ALLOWED_HOSTS = env.list("DJANGO_ALLOWED_HOSTS", default=["geoqr.dumanity.com"])
 
 # DATABASES
 # ------------------------------------------------------------------------------
-DATABASES["default"]["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=60)
+# https://docs.djangoproject.com/en/dev/ref/databases/#connection-pool
+# One psycopg pool per worker process and database, instead of CONN_MAX_AGE:
+# under uvicorn, sync code runs in executor threads and per-thread persistent
+# connections get opened and dropped at peak. Size it to those threads
+# (ASGI_THREADS) and keep workers * (max_size per database) under
+# PostgreSQL's max_connections. Pool stats: /api/db-pool/ (staff).
+if env.bool("DATABASE_POOL", default=True):
+    for _alias, _database in DATABASES.items():
+        _database.setdefault("OPTIONS", {})["pool"] = {
+            "name": _alias,
+            "min_size": env.int("DATABASE_POOL_MIN_SIZE", default=2),
+            "max_size": env.int(
+                "DATABASE_POOL_MAX_SIZE",
+                default=env.int(
+                    "ASGI_THREADS",
+                    default=min(32, (os.cpu_count() or 1) + 4),
+                ),
+            ),
+            # Seconds a request waits for a connection before failing.
+            "timeout": env.float("DATABASE_POOL_TIMEOUT", default=10),
+            "max_idle": env.float("DATABASE_POOL_MAX_IDLE", default=300),
+            "max_lifetime": env.float("DATABASE_POOL_MAX_LIFETIME", default=1800),
+        }
+        # With a pool, Django checks each connection on checkout
+        # (ConnectionPool.check_connection) and replaces broken ones.
+        _database["CONN_HEALTH_CHECKS"] = True
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=60)
 
 # CACHES
 # ------------------------------------------------------------------------------
 CACHES = {
     "default": {
-        "BACKEND": "django_redis.cache.RedisCache",
+        # django-redis with a per-process L1 in front, invalidated through
+        # Redis pub/sub (apps.core.cache.TieredRedisCache). Stats: /api/cache-stats/.
+        "BACKEND": "apps.core.cache.TieredRedisCache",
         "LOCATION": REDIS_URL,
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
             # Mimicking memcache behavior.
             # https://github.com/jazzband/django-redis#memcached-exceptions-behavior
             "IGNORE_EXCEPTIONS": True,
+            "L1_MAX_SIZE": env.int("CACHE_L1_MAX_SIZE", default=1024),
+            "L1_TTL": env.float("CACHE_L1_TTL", default=5),
+            # Small keys read on every request that only change through
+            # cache writes (which invalidate them everywhere). QR revocation
+            # keeps its own in-process copy and reads Redis directly.
+            "L1_KEY_PREFIXES": env.list(
+                "CACHE_L1_KEY_PREFIXES",
+                default=["users:me:"],
+            ),
         },
     },
 }
@@ -63,6 +104,21 @@ SECURE_CONTENT_TYPE_NOSNIFF = env.bool(
     default=True,
 )
 
+# TEMPLATES
+# ------------------------------------------------------------------------------
+# https://docs.djangoproject.com/en/dev/ref/templates/api/#django.template.loaders.cached.Loader
+# Compile each template once per process; never check for changes on disk.
+TEMPLATES[0]["APP_DIRS"] = False
+TEMPLATES[0]["OPTIONS"]["loaders"] = [  # type: ignore[index]
+    (
+        "django.template.loaders.cached.Loader",
+        [
+            "django.template.loaders.filesystem.Loader",
+            "django.template.loaders.app_directories.Loader",
+        ],
+    ),
+]
+
 # STATIC & MEDIA
 # ------------------------
 STORAGES = {
@@ -102,7 +158,15 @@ INSTALLED_APPS += ["anymail"]
 # https://docs.djangoproject.com/en/dev/ref/settings/#email-backend
 # https://anymail.readthedocs.io/en/stable/installation/#anymail-settings-reference
 # https://anymail.readthedocs.io/en/stable/esps/brevo/
-EMAIL_BACKEND = "anymail.backends.brevo.EmailBackend"
+# Requests enqueue mail in Redis; the `mailsender` service delivers it via Brevo.
+EMAIL_BACKEND = env(
+    "DJANGO_EMAIL_BACKEND",
+    default="apps.core.mail.QueuedEmailBackend",
+)
+MAIL_QUEUE_DELIVERY_BACKEND = env(
+    "DJANGO_MAIL_QUEUE_DELIVERY_BACKEND",
+    default="anymail.backends.brevo.EmailBackend",
+)
 ANYMAIL = {
     "BREVO_API_KEY": env("BREVO_API_KEY"),
 }
@@ -178,3 +242,7 @@ SPECTACULAR_SETTINGS["SERVERS"] = [
 ]
 # Your stuff...
 # ------------------------------------------------------------------------------
+# QR scan events go through a Redis stream consumed by `manage.py flush_scan_events`
+QR_SCAN_BUFFER_BACKEND = env("QR_SCAN_BUFFER_BACKEND", default="redis")
+# Scan counters are sharded in Redis and rolled up by `manage.py rollup_counters`
+QR_COUNTER_BACKEND = env("QR_COUNTER_BACKEND", default="redis")
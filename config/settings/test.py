@@ -3,6 +3,7 @@ With these settings, tests run faster.
 """
 
 from .base import *  # noqa: F403
+from .base import DATABASES
 from .base import TEMPLATES
 from .base import env
 
@@ -34,5 +35,24 @@ TEMPLATES[0]["OPTIONS"]["debug"] = True  # type: ignore[index]
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#media-url
 MEDIA_URL = "http://media.testserver/"
+
+# DATABASES
+# ------------------------------------------------------------------------------
+# A second connection to the test database, for the replica router tests.
+# Tests enable it with DATABASE_REPLICAS = ["replica"].
+DATABASES["replica"] = {**DATABASES["default"], "ATOMIC_REQUESTS": False}
+DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+DATABASE_REPLICAS: list[str] = []
+
+# TRANSACTIONS
+# ------------------------------------------------------------------------------
+# Fail tests whose read-only views write to the database
+TRANSACTION_READ_ONLY_GUARD = True
+
+# QR
+# ------------------------------------------------------------------------------
+# Write scan events inline, inside the test transaction
+QR_SCAN_FLUSH_INTERVAL = 0
+QR_SCAN_BUFFER_SIZE = 1
 # Your stuff...
 # ------------------------------------------------------------------------------
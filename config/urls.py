@@ -11,6 +11,11 @@ from drf_spectacular.views import SpectacularAPIView
 from drf_spectacular.views import SpectacularSwaggerView
 from rest_framework.authtoken.views import obtain_auth_token
 
+from apps.core.transactions import READ_ONLY
+from apps.core.transactions import transaction_policy
+from apps.core.views import CacheStatsView
+from apps.core.views import DatabasePoolStatsView
+from apps.core.views import PrebuiltSchemaView
 from config.views import GeoTemplateView
 from config.views import ProtectedHomeTemplateView
 from config.views import PushTemplateView
@@ -23,7 +28,9 @@ admin.site.login = secure_admin_login(admin.site.login)
 urlpatterns = [
     path(
         "",
-        TemplateView.as_view(template_name="pages/about.html"),
+        transaction_policy(READ_ONLY)(
+            TemplateView.as_view(template_name="pages/about.html"),
+        ),
         name="home",
     ),
     path("home/", ProtectedHomeTemplateView.as_view(), name="protected_home"),
@@ -37,6 +44,8 @@ urlpatterns = [
     path("accounts/", include("allauth.urls")),
     # PWA urls
     path("", include("apps.pwa.urls")),
+    # QR urls
+    path("", include("apps.qr.urls")),
     # Your stuff: custom urls includes go here
     # ...
     # Media files
@@ -52,7 +61,17 @@ urlpatterns += [
     path("api/", include("config.api_router")),
     # DRF auth token
     path("api/auth-token/", obtain_auth_token, name="obtain_auth_token"),
-    path("api/schema/", SpectacularAPIView.as_view(), name="api-schema"),
+    # Connection pool stats of the worker that answers (staff only)
+    path("api/db-pool/", DatabasePoolStatsView.as_view(), name="api-db-pool"),
+    # Per-tier hit rates of the cache, same worker caveat (staff only)
+    path("api/cache-stats/", CacheStatsView.as_view(), name="api-cache-stats"),
+    # The schema is generated at runtime only in DEBUG; otherwise it is served
+    # from the artifact built by `manage.py build_openapi_schema` on deploy.
+    path(
+        "api/schema/",
+        (SpectacularAPIView if settings.DEBUG else PrebuiltSchemaView).as_view(),
+        name="api-schema",
+    ),
     path(
         "api/docs/",
         SpectacularSwaggerView.as_view(url_name="api-schema"),
@@ -3,15 +3,29 @@ from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
 from django.views.generic import TemplateView
 
+from apps.core.htmx import HtmxPartialMixin
+from apps.core.transactions import READ_ONLY
+from apps.core.transactions import TransactionPolicyMixin
+
+
+class PageMixin(TransactionPolicyMixin, HtmxPartialMixin):
+    # The pages only read: no BEGIN/COMMIT around them.
+    transaction_policy = READ_ONLY
+    # Links with hx-target="#main-content" get the content plus the bottom
+    # navbar (it highlights the current page).
+    htmx_partials = {"main-content": "main_content"}
+    htmx_oob_blocks = ("bottom_nav",)
+
 
 @method_decorator(login_required, name="dispatch")
-class ProtectedHomeTemplateView(TemplateView):
+class ProtectedHomeTemplateView(PageMixin, TemplateView):
     template_name = "pages/home.html"
 
 
 @method_decorator(login_required, name="dispatch")
-class PushTemplateView(TemplateView):
+class PushTemplateView(PageMixin, TemplateView):
     template_name = "pages/push.html"
+    page_cache_vary_on = ("vapid_public_key",)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -20,8 +34,9 @@ class PushTemplateView(TemplateView):
 
 
 @method_decorator(login_required, name="dispatch")
-class GeoTemplateView(TemplateView):
+class GeoTemplateView(PageMixin, TemplateView):
     template_name = "pages/geo.html"
+    page_cache_vary_on = ("google_maps_js_api_key",)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -30,5 +45,5 @@ class GeoTemplateView(TemplateView):
 
 
 @method_decorator(login_required, name="dispatch")
-class QRTemplateView(TemplateView):
+class QRTemplateView(PageMixin, TemplateView):
     template_name = "pages/qr.html"
@@ -0,0 +1,12 @@
+from uvicorn_worker import UvicornWorker as BaseUvicornWorker
+
+from config import early_hints
+
+
+class UvicornWorker(BaseUvicornWorker):
+    """Gunicorn's uvicorn worker, with 103 Early Hints (``config.early_hints``)."""
+
+    CONFIG_KWARGS = {
+        **BaseUvicornWorker.CONFIG_KWARGS,
+        "http": early_hints.http_protocol(),
+    }